@@ -1,7 +1,33 @@
 import { Hono } from 'hono';
+import { SemanticCache, cachedAnswer, lookupAnswer } from './semantic-cache';
+import { sanitizeAnswer, formatForSlack } from './sanitize';
+import { QueryScheduler } from './query-scheduler';
 
 const app = new Hono();
 
+// Answer caches live for the lifetime of the isolate. /slack and /query clean
+// answers differently, so each route gets its own cache.
+const answerCaches = {
+	slack: new SemanticCache(),
+	query: new SemanticCache(),
+};
+
+// Slack questions share one scheduler per isolate: a bounded number of RAG
+// calls in flight, and repeats of a running question share its answer. The
+// limit is per isolate, not global: every isolate serving the bot allows its
+// own maxInFlight searches. Each request waits on its own timers, never on
+// another request's promise (see query-scheduler.js).
+const slackScheduler = new QueryScheduler();
+
+// CORPUS_HASH changes whenever the indexed chunk corpus is rebuilt, which
+// invalidates every cached answer. `npm run deploy` sets it from
+// test_scripts/semantic_cache.py corpus-hash (see wrangler.jsonc vars).
+function getAnswerCache(env, route) {
+	const cache = answerCaches[route];
+	cache.setCorpusHash(env.CORPUS_HASH || '');
+	return cache;
+}
+
 // Slack signature verification
 async function verifySlackRequest(request, signingSecret, rawBody) {
 	if (!signingSecret) {
@@ -47,79 +73,6 @@ async function verifySlackRequest(request, signingSecret, rawBody) {
 	return computedSignature === signature;
 }
 
-// Helper function to remove document references from response
-function removeDocumentReferences(text) {
-	if (!text) return text;
-	
-	// Remove phrases like "According to the document", "Based on the document", etc.
-	text = text.replace(/According to (the )?document[^.]*\.?\s*/gi, '');
-	text = text.replace(/Based on (the )?document[^.]*\.?\s*/gi, '');
-	text = text.replace(/According to (the )?[^"]*\.md[^.]*\.?\s*/gi, '');
-	text = text.replace(/Based on (the )?[^"]*\.md[^.]*\.?\s*/gi, '');
-	text = text.replace(/The document "[^"]*" (states|indicates|shows|mentions|contains|provides)[^.]*\.?\s*/gi, '');
-	text = text.replace(/In (the )?document "[^"]*"[^.]*\.?\s*/gi, '');
-	
-	// Clean up any double spaces or awkward spacing
-	text = text.replace(/\s{2,}/g, ' ');
-	text = text.replace(/\n\s*\n\s*\n/g, '\n\n');
-	
-	return text.trim();
-}
-
-// Helper function to remove code references from response
-function removeCodeReferences(text) {
-	if (!text) return text;
-	
-	// Remove function calls with parentheses (e.g., fetch_courier_partner_service_url(...))
-	text = text.replace(/[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)/g, '');
-	
-	// Remove method calls with dots (e.g., object.method(), Enum.VALUE)
-	text = text.replace(/[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)/g, '');
-	text = text.replace(/[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*/g, '');
-	
-	// Remove phrases that mention code construction
-	text = text.replace(/is constructed using[^.]*\.?\s*/gi, '');
-	text = text.replace(/is built using[^.]*\.?\s*/gi, '');
-	text = text.replace(/is created using[^.]*\.?\s*/gi, '');
-	text = text.replace(/using [a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)[^.]*\.?\s*/gi, '');
-	text = text.replace(/via [a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)[^.]*\.?\s*/gi, '');
-	
-	// Remove code snippets in backticks that look like function calls
-	text = text.replace(/`[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)`/g, '');
-	text = text.replace(/`[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*`/g, '');
-	
-	// Remove phrases like "using fetch_courier_partner_service_url" or "via fetch_courier_partner_service_url"
-	text = text.replace(/\b(using|via|through|by calling|by using)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)[^.]*\.?\s*/gi, '');
-	
-	// Clean up any double spaces or awkward spacing
-	text = text.replace(/\s{2,}/g, ' ');
-	text = text.replace(/\n\s*\n\s*\n/g, '\n\n');
-	
-	return text.trim();
-}
-
-// Helper function to convert markdown to Slack mrkdwn format
-function formatForSlack(text) {
-	if (!text) return text;
-	
-	// Convert markdown headers to bold (Slack doesn't support ### headers)
-	// Convert ### Header to *Header*
-	text = text.replace(/^###\s+(.+)$/gm, '*$1*');
-	// Convert ## Header to *Header*
-	text = text.replace(/^##\s+(.+)$/gm, '*$1*');
-	// Convert # Header to *Header*
-	text = text.replace(/^#\s+(.+)$/gm, '*$1*');
-	
-	// Convert markdown bold (**text**) to Slack bold (*text*)
-	// Handle cases where **text** appears in the text
-	text = text.replace(/\*\*(.+?)\*\*/g, '*$1*');
-	
-	// Ensure proper line breaks (max 2 consecutive newlines)
-	text = text.replace(/\n{3,}/g, '\n\n');
-	
-	return text;
-}
-
 // Health check
 app.get('/', (c) => {
 	return c.json({
@@ -159,9 +112,15 @@ app.post('/slack', async (c) => {
 		return c.json({ text: "Please provide a question. Example: /cpbot What is the cancellation url of shiprocket?" });
 	  }
   
-	  // B. Define the Background Task (The RAG Search)
-	  const runSearch = async () => {
-		try {
+	  // B. Repeated and near-identical questions are answered from the cache
+	  // before anything is scheduled, so a hit never takes or waits for a RAG
+	  // slot. The lookup's embedding call stays well inside Slack's 3 seconds.
+	  const answerCache = getAnswerCache(c.env, 'slack');
+	  const hit = await lookupAnswer(answerCache, c.env.AI, question);
+
+	  // Define the RAG search for a miss. The scheduler runs it once per
+	  // distinct question in flight, within its concurrency limit.
+	  const search = async () => {
 		  console.log(`Processing background query: ${question}`);
 		  
 		  // Enhance query with instructions to avoid document and code references
@@ -171,19 +130,41 @@ app.post('/slack', async (c) => {
 		  const searchResult = await c.env.AI.autorag("clickpost-rag-bot").aiSearch({
 			query: enhancedQuery,
 		  });
-  
+
 		  // Extract the response text from the search result
 		  // The autorag returns an object with a 'response' field containing the answer
 		  const rawAnswerText = typeof searchResult === 'string' 
 			? searchResult 
 			: (searchResult?.response || JSON.stringify(searchResult));
-  
-		  // Remove document references from the response
-		  let cleanedAnswerText = removeDocumentReferences(rawAnswerText);
-		  
-		  // Remove code references from the response
-		//   cleanedAnswerText = removeCodeReferences(cleanedAnswerText);
-  
+
+		  // Remove document references from the response (code references
+		  // are kept for Slack; pass { stripCode: true } to drop them too).
+		  // A raw JSON fallback is shown once but never cached.
+		  const answer = sanitizeAnswer(rawAnswerText);
+		  if (answer && (typeof searchResult === 'string' || searchResult?.response)) {
+			answerCache.set(question, hit.vector, answer);
+		  }
+		  return answer;
+	  };
+
+	  const job = hit.answer !== null
+		? { status: 'cached', result: Promise.resolve(hit.answer) }
+		: slackScheduler.submit(question, search);
+
+	  // Queue full: tell the user now instead of starting more work
+	  if (job.status === 'rejected') {
+		return c.json({
+			response_type: "ephemeral",
+			text: `I'm handling a lot of questions right now (${slackScheduler.queued} waiting). Please try again in a minute.`
+		});
+	  }
+
+	  // C. Define the Background Task: wait for the (possibly shared) answer
+	  // and post it to this request's response_url
+	  const deliverAnswer = async () => {
+		try {
+		  const cleanedAnswerText = await job.result;
+
 		  // Format the answer text for Slack (convert markdown to mrkdwn)
 		  const answerText = formatForSlack(cleanedAnswerText);
   
@@ -230,13 +211,19 @@ app.post('/slack', async (c) => {
 		}
 	  };
   
-	  // C. Trigger background execution (Non-blocking)
-	  c.executionCtx.waitUntil(runSearch());
+	  // D. Trigger background execution (Non-blocking)
+	  c.executionCtx.waitUntil(deliverAnswer());
   
-	  // D. Immediately acknowledge Slack (Must happen < 3 seconds)
+	  // E. Immediately acknowledge Slack (Must happen < 3 seconds)
+	  let thinking = "Thinking... :thinking_face:";
+	  if (job.status === 'coalesced') {
+		thinking = "Thinking... :thinking_face: (the same question was just asked, so you'll get that answer)";
+	  } else if (job.status === 'queued') {
+		thinking = `Thinking... :thinking_face: (you're #${job.position} in the queue)`;
+	  }
 	  return c.json({
 		  response_type: "ephemeral", // Only the user sees this "Thinking" message
-		  text: "Thinking... :thinking_face:" 
+		  text: thinking
 	  });
   
 	} catch (error) {
@@ -259,22 +246,29 @@ app.post('/query', async (c) => {
 		// Enhance query with instructions to avoid document and code references
 		const enhancedQuery = `${question}\n\nPlease provide a direct answer without mentioning source documents, file names, or any code references. Do not include phrases like "According to the document", "Based on the document", or any function calls, method names, or code snippets like "fetch_courier_partner_service_url(...)" or "CourierPartnerServiceTypeEnum.AUTHORIZATION". Provide only the information requested in plain language.`;
 
-		const searchResult = await c.env.AI.autorag("clickpost-rag-bot").aiSearch({
-			query: enhancedQuery,
-		});
+		// Repeated and near-identical questions are served from the answer cache
+		const { answer: cleanedAnswerText, cached } = await cachedAnswer(getAnswerCache(c.env, 'query'), c.env.AI, question, async () => {
+			const searchResult = await c.env.AI.autorag("clickpost-rag-bot").aiSearch({
+				query: enhancedQuery,
+			});
 
-		// Extract and clean the response
-		const rawAnswerText = typeof searchResult === 'string' 
-			? searchResult 
-			: (searchResult?.response || JSON.stringify(searchResult));
-		
-		// Remove document and code references
-		let cleanedAnswerText = removeDocumentReferences(rawAnswerText);
-		cleanedAnswerText = removeCodeReferences(cleanedAnswerText);
+			// Extract and clean the response
+			const rawAnswerText = typeof searchResult === 'string' 
+				? searchResult 
+				: (searchResult?.response || JSON.stringify(searchResult));
+
+			// Remove document and code references. A raw JSON fallback is
+			// returned once but never cached.
+			return {
+				answer: sanitizeAnswer(rawAnswerText, { stripCode: true }),
+				cacheable: typeof searchResult === 'string' || Boolean(searchResult?.response),
+			};
+		});
 
 		return c.json({
 			answer: cleanedAnswerText,
-			question: question
+			question: question,
+			cached: cached
 		});
 
 	} catch (error) {
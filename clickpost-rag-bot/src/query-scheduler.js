@@ -0,0 +1,166 @@
+// Query scheduler for Slack questions: bounds how many RAG calls run at once,
+// queues the overflow up to a limit, and coalesces normalized-equal questions
+// that are in flight together into one call whose answer every asker shares.
+// Bursty-load simulator: test_scripts/query_scheduler.py
+//
+// The limits are per isolate. Each isolate has its own scheduler, so with N
+// isolates serving the bot up to N * maxInFlight searches run at once, and
+// only questions landing on the same isolate are coalesced. A global limit
+// would have to coordinate through a Durable Object.
+//
+// Requests never settle each other's promises. The Workers runtime ties a
+// promise to the request that created it: resolving it from another request
+// is flagged, and leaves the waiter hanging if that other request is
+// cancelled. So a job is plain state shared through the isolate, and every
+// caller waits in its own request, polling that state on its own timers.
+// The owner renews its job's lease every poll while the job is queued or
+// running, however long the search takes. A job whose owner stops renewing
+// (its request was cancelled) is dropped after leaseMs; its waiters then run
+// the search themselves.
+
+import { normalizeQuestion } from './semantic-cache';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export class QueryScheduler {
+	constructor({ maxInFlight = 4, maxQueued = 32, pollMs = 100, leaseMs = 30000, now = Date.now } = {}) {
+		this.maxInFlight = maxInFlight;
+		this.maxQueued = maxQueued;
+		this.pollMs = pollMs;
+		this.leaseMs = leaseMs;
+		this.now = now;
+		// Jobs holding a slot, and jobs waiting for one (oldest first)
+		this.active = new Set();
+		this.queue = [];
+		// normalized question -> job, for every running or queued job
+		this.jobs = new Map();
+		this.stats = { started: 0, queued: 0, coalesced: 0, rejected: 0, completed: 0, failed: 0, abandoned: 0 };
+	}
+
+	get running() {
+		return this.active.size;
+	}
+
+	get queued() {
+		return this.queue.length;
+	}
+
+	// Schedule `run()` for `question`. Returns { status, position, waiters,
+	// result }:
+	//   started    a slot was free and `run` is executing
+	//   queued     waiting for a slot; `position` is 1-based
+	//   coalesced  the same question is already running or queued; `result`
+	//              settles with that job's answer and `run` is only called
+	//              if the job is abandoned
+	//   rejected   the queue is full; `result` is null and `run` is not called
+	// `result` is a promise of the caller's own request, so the answer is
+	// fanned out to every waiting response_url without crossing requests.
+	submit(question, run) {
+		this._expire();
+		const key = normalizeQuestion(question);
+		const existing = this.jobs.get(key);
+		if (existing) {
+			existing.waiters++;
+			this.stats.coalesced++;
+			return {
+				status: 'coalesced',
+				position: this._position(existing),
+				waiters: existing.waiters,
+				result: this._follow(existing, question, run),
+			};
+		}
+
+		const job = { key, waiters: 1, done: false, expired: false, answer: undefined, error: undefined };
+		job.expires = this.now() + this.leaseMs;
+		let status = 'started';
+		if (this.active.size < this.maxInFlight) {
+			this.active.add(job);
+			this.stats.started++;
+		} else if (this.queue.length < this.maxQueued) {
+			this.queue.push(job);
+			status = 'queued';
+			this.stats.queued++;
+		} else {
+			this.stats.rejected++;
+			return { status: 'rejected', position: 0, waiters: 0, result: null };
+		}
+
+		this.jobs.set(key, job);
+		return { status, position: this._position(job), waiters: 1, result: this._run(job, run) };
+	}
+
+	// 1-based queue position, 0 once the job holds a slot
+	_position(job) {
+		return this.queue.indexOf(job) + 1;
+	}
+
+	async _run(job, run) {
+		// A finished job hands its slot over by moving this one into
+		// `active`; this request notices on its next poll
+		while (!this.active.has(job)) {
+			if (job.expired) throw new Error('Query expired while queued');
+			job.expires = this.now() + this.leaseMs;
+			await sleep(this.pollMs);
+			this._expire();
+		}
+		// Timers stop when the request is cancelled, so the lease only runs
+		// out for a search nobody is waiting on any more
+		job.expires = this.now() + this.leaseMs;
+		job.renewal = setInterval(() => {
+			job.expires = this.now() + this.leaseMs;
+		}, this.pollMs);
+		try {
+			job.answer = await run();
+			this.stats.completed++;
+			return job.answer;
+		} catch (err) {
+			job.error = err;
+			this.stats.failed++;
+			throw err;
+		} finally {
+			clearInterval(job.renewal);
+			job.done = true;
+			this._release(job);
+		}
+	}
+
+	async _follow(job, question, run) {
+		while (!job.done) {
+			if (job.expired) {
+				// The owner went away: run (or join) the search from this request
+				const retry = this.submit(question, run);
+				if (!retry.result) throw new Error('Query queue is full');
+				return retry.result;
+			}
+			await sleep(this.pollMs);
+			this._expire();
+		}
+		if (job.error) throw job.error;
+		return job.answer;
+	}
+
+	_release(job) {
+		if (this.jobs.get(job.key) === job) this.jobs.delete(job.key);
+		const queued = this.queue.indexOf(job);
+		if (queued >= 0) this.queue.splice(queued, 1);
+		if (!this.active.delete(job)) return;
+		// Hand the slot straight to the oldest queued job, so a new
+		// submission cannot take it before that job's next poll
+		while (this.queue.length && this.active.size < this.maxInFlight) {
+			const next = this.queue.shift();
+			next.expires = this.now() + this.leaseMs;
+			this.active.add(next);
+		}
+	}
+
+	_expire() {
+		const now = this.now();
+		for (const job of [...this.active, ...this.queue]) {
+			if (job.expires < now) {
+				job.expired = true;
+				this.stats.abandoned++;
+				this._release(job);
+			}
+		}
+	}
+}
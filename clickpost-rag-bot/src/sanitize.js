@@ -0,0 +1,105 @@
+// Single-pass answer sanitizer: strips document and code references from a
+// model answer and collapses whitespace in one linear scan, replacing the
+// sequential regex cascades that used to live in index.js.
+// Python reference and benchmark: test_scripts/sanitize.py
+// Shared golden cases: test/fixtures/sanitize-golden.json
+
+// A whole identifier. The lookarounds only let it match complete words, so
+// each identifier is examined once rather than from every character in it.
+const IDENT = String.raw`(?<![A-Za-z0-9_])[A-Za-z_][A-Za-z0-9_]*(?![A-Za-z0-9_])`;
+// Call arguments, bounded so an unclosed "(" cannot scan to the end of a
+// large JSON answer from every identifier before it
+const ARGS = String.raw`\s*\([^)]{0,256}\)`;
+const WORD_START = String.raw`(?<![A-Za-z0-9_])`;
+// Rest of the sentence, including the period and trailing whitespace. A
+// period followed by a word character (file.md, Enum.VALUE) does not end it.
+const REST = String.raw`(?:[^.]|\.(?=[A-Za-z0-9_]))*\.?\s*`;
+
+const DOCUMENT_PATTERNS = [
+	// "According to the document ...", "Based on clickpost-tracking-v2.md ..."
+	String.raw`${WORD_START}(?:according to|based on) (?:the )?(?:document|[^"\n]{0,200}?\.md)${REST}`,
+	// 'The document "X" states ...'
+	String.raw`${WORD_START}the document "[^"\n]{0,200}" (?:states|indicates|shows|mentions|contains|provides)${REST}`,
+	// 'In the document "X" ...'
+	String.raw`${WORD_START}in (?:the )?document "[^"\n]{0,200}"${REST}`,
+];
+
+const CODE_PATTERNS = [
+	// "... is constructed using X."
+	String.raw`${WORD_START}is (?:constructed|built|created) using${REST}`,
+	// "... via fetch_url(...) for ..."
+	String.raw`${WORD_START}(?:using|via|through|by calling|by using)\s+${IDENT}${ARGS}${REST}`,
+	// `fetch_url(...)` or `Enum.VALUE` in backticks
+	String.raw`\`${IDENT}(?:${ARGS}|\.${IDENT})\``,
+	// fetch_url(...), client.fetch(...)
+	String.raw`${IDENT}(?:\.${IDENT})*${ARGS}`,
+	// CourierPartnerServiceTypeEnum.AUTHORIZATION
+	String.raw`${IDENT}(?:\.${IDENT})+`,
+];
+
+// Group 1 is a span to drop, group 2 a run of 2+ whitespace characters.
+// Everything else is copied through in slices.
+function compile(patterns) {
+	return new RegExp(`(${patterns.join('|')})|(\\s{2,})`, 'gi');
+}
+
+const DOCUMENT_RE = compile(DOCUMENT_PATTERNS);
+const DOCUMENT_AND_CODE_RE = compile([...DOCUMENT_PATTERNS, ...CODE_PATTERNS]);
+
+// Remove document references (and, with stripCode, code references) and
+// collapse whitespace in a single pass. The result is the same as removing
+// every matched span and then collapsing runs of 2+ whitespace characters
+// to one space: whitespace on both sides of a removal is held until the
+// next kept text and merged there.
+export function sanitizeAnswer(text, { stripCode = false } = {}) {
+	if (!text) return text;
+
+	const pattern = stripCode ? DOCUMENT_AND_CODE_RE : DOCUMENT_RE;
+	pattern.lastIndex = 0;
+
+	const out = [];
+	let whitespace = '';
+	const keep = (segment) => {
+		const body = segment.trimStart();
+		whitespace += segment.slice(0, segment.length - body.length);
+		if (!body) return;
+		out.push(whitespace.length >= 2 ? ' ' : whitespace);
+		const kept = body.trimEnd();
+		out.push(kept);
+		whitespace = body.slice(kept.length);
+	};
+
+	let last = 0;
+	let match;
+	while ((match = pattern.exec(text)) !== null) {
+		keep(text.slice(last, match.index));
+		if (match[2] !== undefined) whitespace += match[2];
+		last = pattern.lastIndex;
+	}
+	keep(text.slice(last));
+	return out.join('').trim();
+}
+
+export function removeDocumentReferences(text) {
+	return sanitizeAnswer(text);
+}
+
+export function removeCodeReferences(text) {
+	return sanitizeAnswer(text, { stripCode: true });
+}
+
+// Headers, **bold** and 3+ newlines in one pass. Slack has no headers, so
+// they become bold lines; Slack bold does not nest, so bold markers inside a
+// header are dropped.
+const SLACK_RE = /^#{1,3}\s+(.+)$|\*\*(.+?)\*\*|\n{3,}/gm;
+const BOLD_RE = /\*\*(.+?)\*\*/g;
+
+// Convert markdown to Slack mrkdwn
+export function formatForSlack(text) {
+	if (!text) return text;
+	return text.replace(SLACK_RE, (match, header, bold) => {
+		if (header !== undefined) return `*${header.replace(BOLD_RE, '$1')}*`;
+		if (bold !== undefined) return `*${bold}*`;
+		return '\n\n';
+	});
+}
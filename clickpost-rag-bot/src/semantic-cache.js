@@ -0,0 +1,186 @@
+// Semantic answer cache: returns a stored answer when a new question is an
+// exact (normalized) repeat or close enough in embedding space.
+// Reference implementation and hit-rate simulator: test_scripts/semantic_cache.py
+
+export const EMBEDDING_MODEL = '@cf/baai/bge-small-en-v1.5';
+
+// Lowercase, drop punctuation, collapse whitespace
+export function normalizeQuestion(question) {
+	if (!question) return '';
+	return question
+		.toLowerCase()
+		.replace(/[^\p{L}\p{N}_\/\-\s]+/gu, ' ')
+		.replace(/\s+/g, ' ')
+		.trim();
+}
+
+// Words that carry no entity: a semantic hit may differ in these freely
+const STOPWORDS = new Set(
+	(
+		'a an the is are was were be been am to of for in on at by with from into and or ' +
+		'how what which when where who whom why do does did can could should would will shall may ' +
+		'i me my we our us you your it its this that these those there here please tell about ' +
+		'any some all via using use used'
+	).split(' ')
+);
+
+function contentTerms(question) {
+	return new Set(
+		normalizeQuestion(question)
+			.split(' ')
+			.filter((term) => term && !STOPWORDS.has(term))
+	);
+}
+
+// Two spellings of the same word: one a prefix of the other (cancel /
+// cancellation, url / urls) or sharing their first five letters (tracking /
+// tracked). Anything with a digit must match exactly.
+function sameStem(a, b) {
+	if (a === b) return true;
+	if (/\d/.test(a) || /\d/.test(b)) return false;
+	if (a.startsWith(b) || b.startsWith(a)) return true;
+	return a.length >= 5 && b.length >= 5 && a.slice(0, 5) === b.slice(0, 5);
+}
+
+// Embeddings put "cancellation url for shiprocket" and "... for delhivery"
+// close together, so a semantic hit also needs the two questions to name
+// the same things: every content word of one has a stem match in the other.
+// Paraphrases that only differ in word order, stopwords or inflection pass;
+// a different carrier, code or path does not.
+export function sameEntities(a, b) {
+	const termsA = contentTerms(a);
+	const termsB = contentTerms(b);
+	const covered = (terms, others) => [...terms].every((term) => [...others].some((other) => sameStem(term, other)));
+	return covered(termsA, termsB) && covered(termsB, termsA);
+}
+
+function cosine(a, b) {
+	let dot = 0;
+	let normA = 0;
+	let normB = 0;
+	for (let i = 0; i < a.length; i++) {
+		dot += a[i] * b[i];
+		normA += a[i] * a[i];
+		normB += b[i] * b[i];
+	}
+	if (!normA || !normB) return 0;
+	return dot / Math.sqrt(normA * normB);
+}
+
+export class SemanticCache {
+	constructor({ maxEntries = 500, ttlMs = 60 * 60 * 1000, threshold = 0.92 } = {}) {
+		this.maxEntries = maxEntries;
+		this.ttlMs = ttlMs;
+		this.threshold = threshold;
+		this.corpusHash = null;
+		// Map keeps insertion order, so the first key is always the least recently used
+		this.entries = new Map();
+	}
+
+	// Drop everything when the chunk corpus behind the answers changes
+	setCorpusHash(corpusHash) {
+		if (corpusHash !== this.corpusHash) {
+			this.entries.clear();
+			this.corpusHash = corpusHash;
+		}
+	}
+
+	get size() {
+		return this.entries.size;
+	}
+
+	_expired(entry, now) {
+		return now - entry.storedAt > this.ttlMs;
+	}
+
+	_touch(key, entry) {
+		this.entries.delete(key);
+		this.entries.set(key, entry);
+	}
+
+	// Exact lookup on the normalized question; no embedding needed
+	getExact(question, now = Date.now()) {
+		const key = normalizeQuestion(question);
+		const entry = this.entries.get(key);
+		if (!entry) return null;
+		if (this._expired(entry, now)) {
+			this.entries.delete(key);
+			return null;
+		}
+		this._touch(key, entry);
+		return entry.answer;
+	}
+
+	// Nearest stored question by cosine similarity, if above the threshold
+	// and naming the same entities as `question`
+	getSimilar(question, vector, now = Date.now()) {
+		let bestKey = null;
+		let bestEntry = null;
+		let bestScore = this.threshold;
+		for (const [key, entry] of this.entries) {
+			if (this._expired(entry, now)) {
+				this.entries.delete(key);
+				continue;
+			}
+			if (!entry.vector || !sameEntities(question, key)) continue;
+			const score = cosine(vector, entry.vector);
+			if (score >= bestScore) {
+				bestKey = key;
+				bestEntry = entry;
+				bestScore = score;
+			}
+		}
+		if (!bestEntry) return null;
+		this._touch(bestKey, bestEntry);
+		return bestEntry.answer;
+	}
+
+	set(question, vector, answer, now = Date.now()) {
+		const key = normalizeQuestion(question);
+		if (!key) return;
+		this.entries.delete(key);
+		this.entries.set(key, { vector, answer, storedAt: now });
+		while (this.entries.size > this.maxEntries) {
+			this.entries.delete(this.entries.keys().next().value);
+		}
+	}
+}
+
+// Embed one question with Workers AI; returns null if the call fails so the
+// cache degrades to exact matching instead of failing the request
+export async function embedQuestion(ai, question) {
+	try {
+		const result = await ai.run(EMBEDDING_MODEL, { text: [normalizeQuestion(question)] });
+		return result?.data?.[0] || null;
+	} catch (err) {
+		console.warn('Question embedding failed:', err);
+		return null;
+	}
+}
+
+// The cache lookup on its own, for callers that schedule the miss
+// themselves. Returns { answer, cached, vector }: `answer` is null on a miss,
+// and `vector` (the question's embedding, or null) is what cache.set takes.
+export async function lookupAnswer(cache, ai, question) {
+	const exact = cache.getExact(question);
+	if (exact !== null) return { answer: exact, cached: 'exact', vector: null };
+
+	const vector = await embedQuestion(ai, question);
+	if (vector) {
+		const similar = cache.getSimilar(question, vector);
+		if (similar !== null) return { answer: similar, cached: 'semantic', vector };
+	}
+	return { answer: null, cached: false, vector };
+}
+
+// Cache in front of an answer producer. `produce` is only called on a miss
+// and returns { answer, cacheable }; answers marked not cacheable (fallbacks,
+// empty results) are returned but never stored.
+export async function cachedAnswer(cache, ai, question, produce) {
+	const hit = await lookupAnswer(cache, ai, question);
+	if (hit.answer !== null) return { answer: hit.answer, cached: hit.cached };
+
+	const { answer, cacheable } = await produce();
+	if (cacheable && answer) cache.set(question, hit.vector, answer);
+	return { answer, cached: false };
+}
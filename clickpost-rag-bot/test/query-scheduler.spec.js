@@ -0,0 +1,162 @@
+import { describe, it, expect } from 'vitest';
+import { QueryScheduler } from '../src/query-scheduler';
+
+// A search that stays pending until the test resolves it
+function deferredSearch() {
+	let resolve;
+	let reject;
+	let calls = 0;
+	const promise = new Promise((res, rej) => {
+		resolve = res;
+		reject = rej;
+	});
+	return {
+		get calls() {
+			return calls;
+		},
+		run: () => {
+			calls++;
+			return promise;
+		},
+		resolve,
+		reject,
+	};
+}
+
+describe('Query scheduler', () => {
+	it('coalesces normalized-equal questions into one search', async () => {
+		const scheduler = new QueryScheduler();
+		const search = deferredSearch();
+
+		const first = scheduler.submit('Cancellation URL for Shiprocket?', search.run);
+		const second = scheduler.submit('  cancellation url for shiprocket ', search.run);
+		expect(first.status).toBe('started');
+		expect(second.status).toBe('coalesced');
+		expect(second.waiters).toBe(2);
+
+		search.resolve('answer');
+		expect(await first.result).toBe('answer');
+		expect(await second.result).toBe('answer');
+		expect(search.calls).toBe(1);
+	});
+
+	it('starts a new search once the previous one finished', async () => {
+		const scheduler = new QueryScheduler();
+		let calls = 0;
+		const run = async () => `answer ${++calls}`;
+
+		expect(await scheduler.submit('q', run).result).toBe('answer 1');
+		expect(await scheduler.submit('q', run).result).toBe('answer 2');
+	});
+
+	it('queues beyond the in-flight limit and rejects when the queue is full', async () => {
+		const scheduler = new QueryScheduler({ maxInFlight: 1, maxQueued: 1 });
+		const a = deferredSearch();
+		const b = deferredSearch();
+
+		const first = scheduler.submit('a', a.run);
+		const second = scheduler.submit('b', b.run);
+		const third = scheduler.submit('c', async () => 'c');
+		expect(first.status).toBe('started');
+		expect(second).toMatchObject({ status: 'queued', position: 1 });
+		expect(third).toMatchObject({ status: 'rejected', result: null });
+
+		// Joining a queued question does not need queue space
+		expect(scheduler.submit('b', b.run).status).toBe('coalesced');
+
+		await Promise.resolve();
+		expect(b.calls).toBe(0);
+		a.resolve('a');
+		await first.result;
+		b.resolve('b');
+		expect(await second.result).toBe('b');
+		expect(scheduler.running).toBe(0);
+		expect(scheduler.stats).toMatchObject({ started: 1, queued: 1, coalesced: 1, rejected: 1, completed: 2 });
+	});
+
+	it('hands a finished slot to the queue before new submissions', async () => {
+		const scheduler = new QueryScheduler({ maxInFlight: 1, maxQueued: 4 });
+		const a = deferredSearch();
+		const first = scheduler.submit('a', a.run);
+		const second = scheduler.submit('b', async () => 'b');
+
+		a.resolve('a');
+		await first.result;
+		// 'b' owns the slot now even though it has not resumed yet
+		expect(scheduler.submit('c', async () => 'c').status).toBe('queued');
+		expect(await second.result).toBe('b');
+	});
+
+	it('fans a failure out to every waiter and frees the slot', async () => {
+		const scheduler = new QueryScheduler({ maxInFlight: 1 });
+		const search = deferredSearch();
+		const first = scheduler.submit('q', search.run);
+		const second = scheduler.submit('Q?', search.run);
+
+		search.reject(new Error('search failed'));
+		await expect(first.result).rejects.toThrow('search failed');
+		await expect(second.result).rejects.toThrow('search failed');
+		expect(scheduler.running).toBe(0);
+		expect(scheduler.stats.failed).toBe(1);
+	});
+
+	it('gives every caller a promise of its own', async () => {
+		const scheduler = new QueryScheduler({ pollMs: 1 });
+		const search = deferredSearch();
+
+		const first = scheduler.submit('q', search.run);
+		const second = scheduler.submit('q', search.run);
+		// A shared promise would be settled from the first caller's request
+		expect(second.result).not.toBe(first.result);
+
+		search.resolve('answer');
+		expect(await second.result).toBe('answer');
+	});
+
+	it('lets a waiter take over a job whose owner went away', async () => {
+		let clock = 0;
+		const scheduler = new QueryScheduler({ maxInFlight: 1, pollMs: 1, leaseMs: 1000, now: () => clock });
+		const hung = deferredSearch();
+		const retry = deferredSearch();
+
+		scheduler.submit('q', hung.run);
+		const waiter = scheduler.submit('q', retry.run);
+		expect(waiter.status).toBe('coalesced');
+
+		// The owner's request was cancelled mid-search: its timers stop and
+		// its lease runs out
+		clearInterval(scheduler.jobs.get('q').renewal);
+		clock = 1001;
+		await new Promise((resolve) => setTimeout(resolve, 5));
+		expect(retry.calls).toBe(1);
+		retry.resolve('answer');
+		expect(await waiter.result).toBe('answer');
+		expect(scheduler.running).toBe(0);
+		expect(scheduler.stats.abandoned).toBe(1);
+	});
+
+	it('keeps the lease of a search that runs longer than leaseMs', async () => {
+		const scheduler = new QueryScheduler({ maxInFlight: 1, pollMs: 1, leaseMs: 20 });
+		let calls = 0;
+		let running = 0;
+		let maxRunning = 0;
+		const slowSearch = (answer) => async () => {
+			calls++;
+			maxRunning = Math.max(maxRunning, ++running);
+			await new Promise((resolve) => setTimeout(resolve, 60));
+			running--;
+			return answer;
+		};
+
+		const first = scheduler.submit('q', slowSearch('q'));
+		const waiter = scheduler.submit('q', slowSearch('q'));
+		const second = scheduler.submit('r', slowSearch('r'));
+
+		expect(await waiter.result).toBe('q');
+		expect(await first.result).toBe('q');
+		expect(await second.result).toBe('r');
+		expect(calls).toBe(2);
+		expect(maxRunning).toBe(1);
+		expect(scheduler.stats.abandoned).toBe(0);
+	});
+});
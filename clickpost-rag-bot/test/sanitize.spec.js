@@ -0,0 +1,51 @@
+import { describe, it, expect } from 'vitest';
+import { sanitizeAnswer, formatForSlack, removeDocumentReferences, removeCodeReferences } from '../src/sanitize';
+// Shared with the Python reference (test_scripts/sanitize.py check)
+import goldenCases from './fixtures/sanitize-golden.json';
+
+function apply(testCase) {
+	if (testCase.fn === 'slack') return formatForSlack(testCase.input);
+	return sanitizeAnswer(testCase.input, testCase.options);
+}
+
+describe('Answer sanitizer', () => {
+	describe('golden cases', () => {
+		for (const testCase of goldenCases) {
+			it(testCase.name, () => {
+				expect(apply(testCase)).toBe(testCase.expected);
+			});
+		}
+	});
+
+	it('keeps the old helper names', () => {
+		const text = 'According to the document, x. Call fetch_url(id) now.';
+		expect(removeDocumentReferences(text)).toBe('Call fetch_url(id) now.');
+		expect(removeCodeReferences(text)).toBe('Call now.');
+	});
+
+	it('passes empty and missing answers through', () => {
+		expect(sanitizeAnswer(undefined)).toBe(undefined);
+		expect(formatForSlack('')).toBe('');
+	});
+
+	it('stays linear on unclosed parentheses in long answers', () => {
+		// Each "(" that never closes used to send a [^)]* pass to the end of
+		// the text, so this took seconds under the old regex cascade
+		const unit = 'see shipment_details (and ';
+		const small = unit.repeat(2_000);
+		const large = unit.repeat(20_000);
+
+		const time = (text) => {
+			const start = performance.now();
+			sanitizeAnswer(text, { stripCode: true });
+			return performance.now() - start;
+		};
+		time(small);
+		const smallMs = Math.max(time(small), 1);
+		const largeMs = time(large);
+
+		expect(largeMs).toBeLessThan(500);
+		// 10x the input, allowing generous noise but not 100x (quadratic)
+		expect(largeMs).toBeLessThan(smallMs * 40);
+	});
+});
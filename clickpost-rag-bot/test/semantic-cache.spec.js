@@ -0,0 +1,135 @@
+import { describe, it, expect } from 'vitest';
+import { SemanticCache, cachedAnswer, lookupAnswer, normalizeQuestion, sameEntities } from '../src/semantic-cache';
+
+// Fake Workers AI binding that embeds every question to the same fixed vector
+function fakeAI(vector) {
+	let calls = 0;
+	return {
+		get calls() {
+			return calls;
+		},
+		async run() {
+			calls++;
+			return { data: [vector] };
+		},
+	};
+}
+
+describe('Semantic answer cache', () => {
+	it('normalizes case, punctuation and whitespace', () => {
+		expect(normalizeQuestion('  Cancellation URL for Shiprocket?? ')).toBe('cancellation url for shiprocket');
+		expect(normalizeQuestion('What is /api/v2/track-order/ ?')).toBe('what is /api/v2/track-order/');
+	});
+
+	it('serves exact repeats without embedding', async () => {
+		const cache = new SemanticCache();
+		const ai = fakeAI([1, 0]);
+		let produced = 0;
+		const produce = async () => {
+			produced++;
+			return { answer: 'answer', cacheable: true };
+		};
+
+		const first = await cachedAnswer(cache, ai, 'Cancellation url for shiprocket', produce);
+		const second = await cachedAnswer(cache, ai, 'cancellation URL for shiprocket?', produce);
+
+		expect(first.cached).toBe(false);
+		expect(second).toEqual({ answer: 'answer', cached: 'exact' });
+		expect(produced).toBe(1);
+		expect(ai.calls).toBe(1);
+	});
+
+	it('looks answers up without producing one, so hits can skip the scheduler', async () => {
+		const cache = new SemanticCache({ threshold: 0.9 });
+		const ai = fakeAI([1, 0]);
+
+		const miss = await lookupAnswer(cache, ai, 'Cancellation url for shiprocket');
+		expect(miss).toEqual({ answer: null, cached: false, vector: [1, 0] });
+
+		cache.set('Cancellation url for shiprocket', miss.vector, 'answer');
+		expect(await lookupAnswer(cache, ai, 'cancellation URL for shiprocket?')).toEqual({
+			answer: 'answer',
+			cached: 'exact',
+			vector: null,
+		});
+		expect(ai.calls).toBe(1);
+
+		const similar = await lookupAnswer(cache, ai, 'Shiprocket cancellation URL');
+		expect(similar).toEqual({ answer: 'answer', cached: 'semantic', vector: [1, 0] });
+		expect(ai.calls).toBe(2);
+	});
+
+	it('serves near-identical questions above the similarity threshold', () => {
+		const cache = new SemanticCache({ threshold: 0.9 });
+		cache.set('cancellation url for shiprocket', [1, 0], 'answer');
+
+		expect(cache.getSimilar('Shiprocket cancellation URL?', [0.99, 0.05])).toBe('answer');
+		expect(cache.getSimilar('cancellation url for shiprocket', [0, 1])).toBeNull();
+	});
+
+	it('never crosses carriers, codes or paths however close the vectors are', () => {
+		const cache = new SemanticCache({ threshold: 0.9 });
+		cache.set('cancellation url for shiprocket', [1, 0], 'shiprocket answer');
+		cache.set('what does meta status 316 mean', [0, 1], '316 answer');
+
+		expect(cache.getSimilar('cancellation url for delhivery', [1, 0])).toBeNull();
+		expect(cache.getSimilar('what does meta status 317 mean', [0, 1])).toBeNull();
+		expect(cache.getSimilar('how do I cancel with shiprocket, url?', [1, 0])).toBe('shiprocket answer');
+	});
+
+	it('matches entities up to stopwords, order and inflection', () => {
+		expect(sameEntities('How do I track an order?', 'tracking order')).toBe(true);
+		expect(sameEntities('Cancellation URL for Shiprocket', 'shiprocket cancel urls')).toBe(true);
+		expect(sameEntities('track order v2', 'track order v3')).toBe(false);
+		expect(sameEntities('create order for bluedart', 'create order')).toBe(false);
+	});
+
+	it('does not cache answers marked not cacheable', async () => {
+		const cache = new SemanticCache();
+		const ai = fakeAI([1, 0]);
+		let produced = 0;
+		const produce = async () => {
+			produced++;
+			return { answer: '{"error":"no response"}', cacheable: false };
+		};
+
+		const first = await cachedAnswer(cache, ai, 'q', produce);
+		await cachedAnswer(cache, ai, 'q', produce);
+
+		expect(first).toEqual({ answer: '{"error":"no response"}', cached: false });
+		expect(produced).toBe(2);
+		expect(cache.size).toBe(0);
+	});
+
+	it('expires entries after the TTL', () => {
+		const cache = new SemanticCache({ ttlMs: 1000 });
+		cache.set('q', [1, 0], 'answer', 0);
+
+		expect(cache.getExact('q', 500)).toBe('answer');
+		expect(cache.getExact('q', 1501)).toBeNull();
+		expect(cache.size).toBe(0);
+	});
+
+	it('evicts the least recently used entry when full', () => {
+		const cache = new SemanticCache({ maxEntries: 2 });
+		cache.set('a', [1, 0], 'A');
+		cache.set('b', [0, 1], 'B');
+		cache.getExact('a');
+		cache.set('c', [1, 1], 'C');
+
+		expect(cache.getExact('a')).toBe('A');
+		expect(cache.getExact('b')).toBeNull();
+		expect(cache.getExact('c')).toBe('C');
+	});
+
+	it('clears everything when the corpus hash changes', () => {
+		const cache = new SemanticCache();
+		cache.setCorpusHash('v1');
+		cache.set('q', [1, 0], 'answer');
+		cache.setCorpusHash('v1');
+		expect(cache.size).toBe(1);
+
+		cache.setCorpusHash('v2');
+		expect(cache.size).toBe(0);
+	});
+});
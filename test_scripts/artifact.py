@@ -0,0 +1,182 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from spec_stream import write_chunks_jsonl
+
+MAGIC = b"CPCHUNK1"
+# Columns stored as UTF-8 blob + offsets. Any other metadata keys go to
+# "extra" as JSON, decoded only when a chunk's full metadata is requested.
+# A column field that is not a non-empty string (an empty string, a number,
+# a list, None) also goes to "extra", so it reads back exactly as written.
+COLUMNS = ("text", "endpoint", "method", "path", "api", "summary", "source", "section", "extra")
+METADATA_COLUMNS = COLUMNS[1:-1]
+
+# magic, chunk count, column count
+HEADER = struct.Struct("<8sQQ")
+# per column: offsets position, blob position, blob length
+DIRECTORY_ENTRY = struct.Struct("<QQQ")
+
+
+def _pad(f):
+    """Align the next write to 8 bytes so offset arrays can be cast in place."""
+
+    remainder = f.tell() % 8
+    if remainder:
+        f.write(b"\0" * (8 - remainder))
+
+
+def _columnar(value):
+    """Whether a column field can live in its column: "" there means absent."""
+
+    return isinstance(value, str) and value != ""
+
+
+def write_artifact(chunks, artifact_file):
+    """
+    Compile chunks into a single binary file:
+
+      header     magic, chunk count, column count
+      directory  (offsets_pos, blob_pos, blob_len) per column
+      columns    uint64 offsets[count + 1] then the UTF-8 blob, per column
+
+    Written to a temp file and renamed, so readers never see a partial
+    artifact. Returns the number of chunks written.
+    """
+
+    blobs = {name: bytearray() for name in COLUMNS}
+    offsets = {name: [0] for name in COLUMNS}
+
+    count = 0
+    for chunk in chunks:
+        meta = chunk.get("metadata", {})
+        extra = {k: v for k, v in meta.items() if k not in METADATA_COLUMNS or not _columnar(v)}
+        values = [chunk["text"]]
+        values += [meta[name] if _columnar(meta.get(name)) else "" for name in METADATA_COLUMNS]
+        values.append(json.dumps(extra, ensure_ascii=False) if extra else "")
+
+        for name, value in zip(COLUMNS, values):
+            blobs[name] += value.encode("utf-8")
+            offsets[name].append(len(blobs[name]))
+        count += 1
+
+    tmp_file = artifact_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, count, len(COLUMNS)))
+        directory_pos = f.tell()
+        f.write(b"\0" * DIRECTORY_ENTRY.size * len(COLUMNS))
+
+        directory = []
+        for name in COLUMNS:
+            _pad(f)
+            offsets_pos = f.tell()
+            f.write(struct.pack(f"<{count + 1}Q", *offsets[name]))
+            blob_pos = f.tell()
+            f.write(blobs[name])
+            directory.append((offsets_pos, blob_pos, len(blobs[name])))
+
+        f.seek(directory_pos)
+        for entry in directory:
+            f.write(DIRECTORY_ENTRY.pack(*entry))
+
+    os.replace(tmp_file, artifact_file)
+    return count
+
+
+class ChunkArtifact:
+    """
+    Memory-mapped reader for write_artifact files. Opening only reads the
+    fixed-size header, so it costs the same for any corpus size; strings
+    are decoded on access. Behaves as a read-only sequence of chunk dicts.
+    """
+
+    def __init__(self, artifact_file):
+        self._file = open(artifact_file, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, self.count, column_count = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{artifact_file} is not a chunk artifact")
+
+        self._columns = {}
+        for i, name in enumerate(COLUMNS[:column_count]):
+            offsets_pos, blob_pos, blob_len = DIRECTORY_ENTRY.unpack_from(
+                view, HEADER.size + i * DIRECTORY_ENTRY.size
+            )
+            offsets = view[offsets_pos : offsets_pos + 8 * (self.count + 1)].cast("Q")
+            self._columns[name] = (offsets, view[blob_pos : blob_pos + blob_len])
+
+    def __len__(self):
+        return self.count
+
+    def value(self, name, i):
+        offsets, blob = self._columns[name]
+        return bytes(blob[offsets[i] : offsets[i + 1]]).decode("utf-8")
+
+    def text(self, i):
+        return self.value("text", i)
+
+    def metadata(self, i):
+        meta = {}
+        for name in METADATA_COLUMNS:
+            value = self.value(name, i)
+            if value:
+                meta[name] = value
+        extra = self.value("extra", i)
+        if extra:
+            meta.update(json.loads(extra))
+        return meta
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return {"text": self.text(i), "metadata": self.metadata(i)}
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self):
+        self._columns.clear()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage:
+    #   python artifact.py build [data_dir|chunks.jsonl|chunks.json] [out.cpchunks]
+    #   python artifact.py export in.cpchunks [out.jsonl]
+    args = sys.argv[1:]
+    command = args[0] if args else "build"
+
+    if command == "build":
+        from benchmark import load_chunks
+        from ingest import DEFAULT_DATA_DIR
+
+        source = args[1] if len(args) > 1 else DEFAULT_DATA_DIR
+        output_filename = args[2] if len(args) > 2 else "clickpost_chunks.cpchunks"
+        count = write_artifact(load_chunks(source), output_filename)
+        print(f"\n✅ Compiled {count} chunks")
+        print(f"📄 Saved to: {output_filename} ({os.path.getsize(output_filename)} bytes)")
+
+    elif command == "export":
+        output_filename = args[2] if len(args) > 2 else "clickpost_chunks.jsonl"
+        start = time.perf_counter()
+        with ChunkArtifact(args[1]) as artifact:
+            open_ms = (time.perf_counter() - start) * 1000
+            count = write_chunks_jsonl(artifact, output_filename)
+        print(f"Opened {args[1]} in {open_ms:.3f} ms")
+        print(f"\n✅ Exported {count} chunks to: {output_filename}")
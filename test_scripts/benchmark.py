@@ -0,0 +1,197 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+from artifact import ChunkArtifact
+from chunking import estimate_tokens
+from hybrid import BM25Index, HybridRetriever
+from ingest import DEFAULT_DATA_DIR, ingest
+from spec_stream import read_chunks_jsonl
+
+DEFAULT_GOLDEN_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "golden_questions.json"
+)
+
+
+def load_chunks(source, max_tokens=None, with_payloads=False):
+    """
+    Load a chunk corpus from a data directory (run through ingest), a
+    compiled .cpchunks artifact, a JSON Lines file, or a JSON list such as
+    clickpost_chunks_clean.json. `with_payloads` is passed to ingest for
+    a data directory.
+    """
+
+    if os.path.isdir(source):
+        return list(ingest(source, max_tokens=max_tokens, with_payloads=with_payloads))
+    if source.endswith(".cpchunks"):
+        return ChunkArtifact(source)
+    if source.endswith(".jsonl"):
+        return list(read_chunks_jsonl(source))
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_relevant(chunk, expected):
+    """
+    A chunk is relevant if its metadata, or that of any duplicate it
+    absorbed during dedup, matches any expected entry.
+    """
+
+    meta = chunk.get("metadata", {})
+    candidates = [meta] + meta.get("duplicates", [])
+    return any(
+        all(candidate.get(key) == value for key, value in e.items())
+        for candidate in candidates
+        for e in expected
+    )
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def size_distribution(values):
+    return {
+        "min": min(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values),
+        "mean": round(sum(values) / len(values), 1),
+    }
+
+
+def build_backend(name, chunks, index_dir, embedder_name="hashing-512"):
+    """
+    Build a retriever over `chunks` and return search(question, k) ->
+    [(row, score)]. Vector-based backends embed into an index written to
+    `index_dir`, which must outlive the returned search function.
+    """
+
+    if name == "bm25":
+        index = BM25Index(chunks)
+        return index.search
+
+    from vector_index import VectorIndex, build_index, load_embedder
+
+    embedder = load_embedder(embedder_name)
+    build_index(chunks, embedder, index_dir)
+    vector_index = VectorIndex(index_dir)
+
+    if name == "vector":
+        return lambda question, k: vector_index.search(embedder([question])[0], k)
+    if name == "hybrid":
+        return HybridRetriever(
+            vector_index.chunks, vector_index, embedder, facets=vector_index.facets
+        ).search
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def run_benchmark(chunks, golden, backend="hybrid", k=5, embedder_name="hashing-512"):
+    """
+    Run every golden question against one backend and report recall@k,
+    MRR, query latency percentiles, build time and chunk statistics.
+    The backend's index lives in a temporary directory removed afterwards.
+    """
+
+    hits, reciprocal_ranks, latencies, misses = 0, [], [], []
+    with tempfile.TemporaryDirectory(prefix="clickpost_bench_") as index_dir:
+        start = time.perf_counter()
+        search = build_backend(backend, chunks, index_dir, embedder_name)
+        build_seconds = time.perf_counter() - start
+
+        for item in golden:
+            start = time.perf_counter()
+            results = search(item["question"], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            rank = next(
+                (
+                    i
+                    for i, (row, _) in enumerate(results, 1)
+                    if is_relevant(chunks[row], item["expected"])
+                ),
+                None,
+            )
+            if rank:
+                hits += 1
+                reciprocal_ranks.append(1 / rank)
+            else:
+                reciprocal_ranks.append(0.0)
+                misses.append(item["question"])
+
+    return {
+        "backend": backend,
+        "k": k,
+        "questions": len(golden),
+        f"recall@{k}": round(hits / len(golden), 3),
+        "mrr": round(sum(reciprocal_ranks) / len(golden), 3),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+        },
+        "build_seconds": round(build_seconds, 3),
+        "chunk_count": len(chunks),
+        "chunk_chars": size_distribution([len(c["text"]) for c in chunks]),
+        "chunk_tokens": size_distribution([estimate_tokens(c["text"]) for c in chunks]),
+        "misses": misses,
+    }
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python benchmark.py [--chunks DIR|FILE] [--backend bm25,vector,hybrid]
+    #                            [--k 5] [--max-tokens N] [--golden FILE] [--json OUT]
+    args = sys.argv[1:]
+    options = {
+        "--chunks": DEFAULT_DATA_DIR,
+        "--backend": "bm25,vector,hybrid",
+        "--k": "5",
+        "--max-tokens": None,
+        "--golden": DEFAULT_GOLDEN_FILE,
+        "--json": None,
+        "--model": "hashing-512",
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+
+    max_tokens = int(options["--max-tokens"]) if options["--max-tokens"] else None
+    k = int(options["--k"])
+    chunks = load_chunks(options["--chunks"], max_tokens)
+    with open(options["--golden"], "r", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    print(f"Benchmarking {len(golden)} golden questions over {len(chunks)} chunks from {options['--chunks']}")
+
+    reports = []
+    for backend in options["--backend"].split(","):
+        report = run_benchmark(chunks, golden, backend, k, options["--model"])
+        reports.append(report)
+
+        print("\n" + "=" * 70)
+        print(f"BACKEND: {backend}")
+        print("=" * 70)
+        print(f"recall@{k}: {report[f'recall@{k}']:.3f}   MRR: {report['mrr']:.3f}")
+        print(
+            f"latency p50/p95: {report['latency_ms']['p50']:.2f} / "
+            f"{report['latency_ms']['p95']:.2f} ms   build: {report['build_seconds']:.2f}s"
+        )
+        tokens = report["chunk_tokens"]
+        print(
+            f"chunks: {report['chunk_count']}   tokens min/p50/p95/max: "
+            f"{tokens['min']}/{tokens['p50']}/{tokens['p95']}/{tokens['max']}"
+        )
+        for question in report["misses"]:
+            print(f"  ❌ miss: {question}")
+
+    if options["--json"]:
+        with open(options["--json"], "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n📄 Report saved to: {options['--json']}")
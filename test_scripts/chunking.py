@@ -0,0 +1,175 @@
+def estimate_tokens(text):
+    """
+    Rough token count (~4 characters per token for English/JSON).
+    Swap in a real tokenizer via the `count_tokens` arguments below.
+    """
+
+    return (len(text) + 3) // 4
+
+
+def _section_text(section):
+    return "\n".join(section["lines"])
+
+
+# Pieces of an oversized section are never cut smaller than this; parent
+# context lines are dropped first
+MIN_PIECE_TOKENS = 32
+
+
+def _cost(lines, count_tokens):
+    """Tokens of `lines` joined by newlines, counting one per newline."""
+
+    return sum(count_tokens(line) + 1 for line in lines)
+
+
+def _cut_line(line, budget, count_tokens):
+    """
+    Cut a line longer than `budget` into consecutive pieces of at most
+    `budget` tokens (newline included). "".join(pieces) == line.
+    """
+
+    step = max(1, len(line) * (budget - 1) // max(count_tokens(line), 1))
+    while step > 1:
+        pieces = [line[i : i + step] for i in range(0, len(line), step)]
+        if all(count_tokens(piece) + 1 <= budget for piece in pieces):
+            return pieces
+        step = min(step - 1, step * 9 // 10)
+    return list(line)
+
+
+def _tail(lines, overlap_tokens, count_tokens):
+    """Trailing lines of a sub-chunk that fit in `overlap_tokens`."""
+
+    tail, used = [], 0
+    for line in reversed(lines):
+        tokens = count_tokens(line) + 1
+        if used + tokens > overlap_tokens:
+            break
+        tail.insert(0, line)
+        used += tokens
+    return tail
+
+
+def _identity_len(header):
+    """Lines of the header before its first blank line (API, endpoint, URL)."""
+
+    return header.index("") if "" in header else len(header)
+
+
+def split_sections(
+    sections, metadata, max_tokens=512, overlap_tokens=0, count_tokens=estimate_tokens
+):
+    """
+    Turn the sections of one endpoint into chunks of at most `max_tokens`.
+
+    Endpoints that fit are returned as a single chunk, unchanged. Larger
+    ones are packed section by section (parameters, request body, each
+    example, each response code); every sub-chunk starts with the shared
+    header, and a section that opens a sub-chunk also repeats its parent
+    context lines. With `overlap_tokens`, each sub-chunk also repeats the
+    last lines of the previous one, as far as they fit.
+
+    The header counts against every sub-chunk. When repeating all of it
+    would leave less than MIN_PIECE_TOKENS for content, only its first
+    lines (API, endpoint, URL) are repeated and the rest (summary,
+    description) is packed as a section of its own.
+    """
+
+    full_text = "\n".join(_section_text(section) for section in sections)
+    if count_tokens(full_text) <= max_tokens:
+        return [{"text": full_text, "metadata": dict(metadata)}]
+
+    min_piece = max(1, min(MIN_PIECE_TOKENS, max_tokens // 2))
+    header = sections[0]["lines"]
+    prefix_len = next(
+        n
+        for n in (len(header), _identity_len(header), 0)
+        if _cost(header[:n], count_tokens) + min_piece <= max_tokens
+    )
+    prefix = header[:prefix_len]
+    budget = max_tokens - _cost(prefix, count_tokens)
+
+    body = list(sections[1:])
+    if header[prefix_len:]:
+        body.insert(0, {"name": "header", "context": [], "lines": header[prefix_len:]})
+
+    parts = []
+    current, used, names = [], 0, []
+
+    def context_for(section):
+        # Parent context is dropped rather than squeezing content below min_piece
+        context = section["context"]
+        return context if _cost(context, count_tokens) + min_piece <= budget else []
+
+    def open_part(section, need):
+        """
+        Close the current sub-chunk and start the next one for `section`,
+        keeping `need` tokens free after the overlap tail and context.
+        """
+
+        nonlocal current, used, names
+        previous = current
+        if names:
+            parts.append((current, names))
+        context = context_for(section)
+        room = budget - _cost(context, count_tokens) - need
+        tail = []
+        if overlap_tokens and names and room > 0:
+            tail = _tail(previous, min(overlap_tokens, room), count_tokens)
+        # Skip parent lines the overlap tail already carries
+        carried = set(tail)
+        current = tail + [line for line in context if line not in carried]
+        used = _cost(current, count_tokens)
+        names = []
+
+    def add(lines, tokens, name):
+        nonlocal used
+        current.extend(lines)
+        used += tokens
+        if name not in names:
+            names.append(name)
+
+    for section in body:
+        lines = section["lines"]
+        tokens = _cost(lines, count_tokens)
+
+        if names and used + tokens <= budget:
+            add(lines, tokens, section["name"])
+            continue
+
+        piece_budget = budget - _cost(context_for(section), count_tokens)
+        if tokens <= piece_budget:
+            open_part(section, tokens)
+            add(lines, tokens, section["name"])
+            continue
+
+        # The section alone is over budget: split it along its lines,
+        # cutting any line that is longer than a whole sub-chunk
+        pieces = []
+        for line in _section_text(section).split("\n"):
+            if count_tokens(line) + 1 > piece_budget:
+                pieces += _cut_line(line, piece_budget, count_tokens)
+            else:
+                pieces.append(line)
+
+        first = True
+        for piece in pieces:
+            piece_tokens = count_tokens(piece) + 1
+            if first or used + piece_tokens > budget:
+                open_part(section, piece_tokens)
+                first = False
+            add([piece], piece_tokens, section["name"])
+    if names:
+        parts.append((current, names))
+
+    chunks = []
+    for i, (lines, names) in enumerate(parts):
+        chunks.append(
+            {
+                "text": "\n".join(prefix + lines),
+                "metadata": dict(
+                    metadata, part=i + 1, parts=len(parts), sections=names
+                ),
+            }
+        )
+    return chunks
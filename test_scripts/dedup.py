@@ -0,0 +1,381 @@
+import json
+import re
+import sys
+import zlib
+
+import numpy as np
+
+from example_render import render_compact
+from facets import FACETS
+from hybrid import normalize_path
+from manifest import chunk_key, content_hash
+from spec_stream import write_chunks_jsonl
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+MERSENNE_PRIME = (1 << 61) - 1
+# Lines that only say where a chunk came from. Copies of an endpoint in two
+# specs differ in these and nothing else.
+PROVENANCE_PREFIXES = ("API: ", "Full URL: ", "Document: ")
+# Metadata kept for each collapsed duplicate so filters, identifier lookup
+# and relevance checks still see every source an answer came from
+DUPLICATE_FIELDS = ("source", "api", "endpoint", "method", "path", "section") + FACETS
+
+WORD_RE = re.compile(r"\w+")
+PAYLOAD_START_RE = re.compile(r"^[ \t]*[\[{]", re.M)
+
+
+def dedup_text(text):
+    """Chunk text without provenance lines, lowercased, whitespace collapsed."""
+
+    lines = [line for line in text.splitlines() if not line.startswith(PROVENANCE_PREFIXES)]
+    return " ".join(" ".join(lines).lower().split())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Word n-grams of `text` as 32-bit ints. crc32 rather than hash() so
+    signatures are the same in every process.
+    """
+
+    words = WORD_RE.findall(text)
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures over shingle sets using `num_perm` universal hashes
+    (a * x + b) mod p. a and b stay below 2**29, so with 32-bit shingles
+    nothing overflows uint64 before the modulo.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 1 << 29, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 29, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        return ((self.a * x + self.b) % np.uint64(MERSENNE_PRIME)).min(axis=1)
+
+
+def lsh_candidates(signatures, bands=BANDS):
+    """
+    Yield candidate pairs (i, j), i < j, whose signatures agree on at least
+    one band. With 64 hashes in 16 bands the 50% detection point is around
+    Jaccard 0.5, well below the default threshold, so true near-duplicates
+    are rarely missed; every candidate is then verified exactly.
+    """
+
+    if not signatures:
+        return
+    seen = set()
+    for band in np.array_split(np.arange(len(signatures[0])), bands):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(signature[band].tobytes(), []).append(i)
+        for rows in buckets.values():
+            for n, i in enumerate(rows):
+                for j in rows[n + 1 :]:
+                    if (i, j) not in seen:
+                        seen.add((i, j))
+                        yield i, j
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _source(chunk):
+    return chunk.get("metadata", {}).get("source")
+
+
+def _duplicate_entry(chunk):
+    meta = chunk.get("metadata", {})
+    return {name: meta[name] for name in DUPLICATE_FIELDS if meta.get(name)}
+
+
+def near_duplicate_allowed(a, b):
+    """
+    Whether two chunks may be merged as near duplicates: copies of the same
+    endpoint (method and path) or the same doc section, at the same part,
+    from different sources. Different endpoints of one spec, and the parts
+    of one endpoint, often share most of their words and still say
+    different things.
+    """
+
+    if _source(a) == _source(b):
+        return False
+    a, b = a.get("metadata", {}), b.get("metadata", {})
+    if a.get("part") != b.get("part"):
+        return False
+    if a.get("path") and b.get("path"):
+        same_path = normalize_path(a["path"]) == normalize_path(b["path"])
+        if same_path and a.get("method") == b.get("method"):
+            return True
+    return bool(a.get("section")) and a.get("section") == b.get("section")
+
+
+def find_payloads(text, min_chars=200):
+    """
+    Yield (start, end, value) for every JSON object or array in `text` that
+    starts a line and is at least `min_chars` long once serialized.
+    """
+
+    decoder = json.JSONDecoder()
+    position = 0
+    for match in PAYLOAD_START_RE.finditer(text):
+        start = match.end() - 1
+        if start < position:
+            continue
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except ValueError:
+            continue
+        if len(text[start:end]) >= min_chars:
+            position = end
+            yield start, end, value
+
+
+def parsed_payloads(chunk, min_chars=200):
+    """
+    Yield (start, end, value) for the parsed example payloads the parser
+    attached to `chunk` (see parser.iter_openapi_chunks): objects and
+    arrays at least `min_chars` long once serialized, located by their
+    rendered text. The span starts after the first line's indentation, so
+    a marker keeps the payload's place in the layout.
+    """
+
+    text = chunk["text"]
+    for payload in chunk["payloads"]:
+        value = payload["value"]
+        if not isinstance(value, (dict, list)):
+            continue
+        if len(json.dumps(value, ensure_ascii=False)) < min_chars:
+            continue
+        rendered = payload["text"]
+        start = text.find(rendered)
+        if start < 0:
+            continue
+        yield start + len(rendered) - len(rendered.lstrip(" \t")), start + len(rendered), value
+
+
+def _without_payloads(chunk):
+    return {key: value for key, value in chunk.items() if key != "payloads"}
+
+
+def intern_payloads(chunks, min_chars=200, min_uses=2):
+    """
+    Replace example payloads that appear in `min_uses` or more chunks with a
+    short "[example:<hash>]" marker and return (chunks, reference_chunks).
+    Each reference chunk holds the payload once, plus the chunks that use it.
+
+    Chunks carrying parsed "payloads" are matched on those values, whatever
+    style they were rendered in; others (markdown) fall back to scanning
+    their text for JSON (see find_payloads). "payloads" is dropped from
+    every chunk returned.
+    """
+
+    uses = {}
+    for i, chunk in enumerate(chunks):
+        if "payloads" in chunk:
+            found = parsed_payloads(chunk, min_chars)
+        else:
+            found = find_payloads(chunk["text"], min_chars)
+        for start, end, value in found:
+            ref = "example:" + content_hash(value)[:12]
+            entry = uses.setdefault(ref, {"value": value, "rows": [], "spans": {}})
+            if i not in entry["spans"]:
+                entry["rows"].append(i)
+            spans = entry["spans"].setdefault(i, [])
+            if (start, end) not in spans:
+                spans.append((start, end))
+
+    shared = {ref: entry for ref, entry in uses.items() if len(entry["rows"]) >= min_uses}
+    if not shared:
+        return [_without_payloads(chunk) for chunk in chunks], []
+
+    replacements = {}
+    for ref, entry in shared.items():
+        for i, spans in entry["spans"].items():
+            replacements.setdefault(i, []).extend((start, end, ref) for start, end in spans)
+
+    interned = []
+    for i, chunk in enumerate(chunks):
+        if i not in replacements:
+            interned.append(_without_payloads(chunk))
+            continue
+        text = chunk["text"]
+        refs = []
+        # Right to left so earlier offsets stay valid
+        for start, end, ref in sorted(replacements[i], reverse=True):
+            text = text[:start] + f"[{ref}]" + text[end:]
+            if ref not in refs:
+                refs.append(ref)
+        metadata = dict(chunk.get("metadata", {}), examples=sorted(refs))
+        interned.append({"text": text, "metadata": metadata})
+
+    references = []
+    for ref, entry in shared.items():
+        users = [chunk_key(chunks[i]) for i in entry["rows"]]
+        first = chunks[entry["rows"][0]].get("metadata", {})
+        text = [f"Example payload [{ref}]", "Used by:"]
+        text += [f"  - {user}" for user in users]
+        text += ["", render_compact(entry["value"])]
+        references.append(
+            {
+                "text": "\n".join(text),
+                "metadata": {
+                    "example": ref,
+                    "used_by": users,
+                    "source": first.get("source", ""),
+                    "api": first.get("api", ""),
+                },
+            }
+        )
+    return interned, references
+
+
+def dedup_chunks(chunks, threshold=0.8, min_payload_chars=200, num_perm=NUM_PERM, bands=BANDS):
+    """
+    Collapse duplicate chunks and intern shared example payloads.
+
+    1. Exact: chunks whose text matches once provenance lines are dropped
+       collapse to the first one, when it is from another source.
+    2. Near: MinHash + LSH proposes pairs, kept if the true shingle Jaccard
+       is at least `threshold` and they are copies of one endpoint or
+       section from different sources (see near_duplicate_allowed). Each
+       cluster keeps its longest chunk.
+    3. Example payloads repeated across the survivors move into reference
+       chunks (see intern_payloads).
+
+    Survivors keep stream order and list what they absorbed under
+    metadata["duplicates"]. Returns (chunks, report).
+    """
+
+    chunks = list(chunks)
+    chars_before = sum(len(chunk["text"]) for chunk in chunks)
+
+    # 1. Exact duplicates
+    first_by_hash = {}
+    parent = list(range(len(chunks)))
+    texts = []
+    for i, chunk in enumerate(chunks):
+        text = dedup_text(chunk["text"])
+        texts.append(text)
+        digest = content_hash(text.encode("utf-8"))
+        first = first_by_hash.setdefault(digest, i)
+        # Repeats within one source (e.g. two identical parts of an
+        # endpoint) stay: each is its own place in that document
+        if _source(chunks[first]) != _source(chunk):
+            parent[i] = first
+    unique = [i for i in range(len(chunks)) if parent[i] == i]
+    exact_duplicates = len(chunks) - len(unique)
+
+    # 2. Near duplicates among the exact survivors
+    shingle_sets = [shingles(texts[i]) for i in unique]
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(s) for s in shingle_sets]
+    candidates = verified = 0
+    for a, b in lsh_candidates(signatures, bands):
+        candidates += 1
+        if not near_duplicate_allowed(chunks[unique[a]], chunks[unique[b]]):
+            continue
+        if jaccard(shingle_sets[a], shingle_sets[b]) >= threshold:
+            verified += 1
+            root_a, root_b = _find(parent, unique[a]), _find(parent, unique[b])
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = {}
+    for i in range(len(chunks)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+
+    survivors = []
+    for rows in clusters.values():
+        keep = max(rows, key=lambda i: (len(chunks[i]["text"]), -i))
+        chunk = chunks[keep]
+        others = [i for i in rows if i != keep]
+        if others:
+            metadata = dict(chunk.get("metadata", {}))
+            metadata["duplicates"] = [_duplicate_entry(chunks[i]) for i in others]
+            chunk = dict(chunk, metadata=metadata)
+        survivors.append((keep, chunk))
+    survivors = [chunk for _, chunk in sorted(survivors, key=lambda item: item[0])]
+    near_duplicates = len(unique) - len(clusters)
+
+    # 3. Shared example payloads
+    survivors, references = intern_payloads(survivors, min_payload_chars)
+    result = survivors + references
+
+    report = {
+        "input": len(chunks),
+        "exact_duplicates": exact_duplicates,
+        "near_duplicates": near_duplicates,
+        "lsh_candidates": candidates,
+        "lsh_verified": verified,
+        "interned_payloads": len(references),
+        "payload_references": sum(len(c["metadata"].get("examples", [])) for c in survivors),
+        "output": len(result),
+        "chars_before": chars_before,
+        "chars_after": sum(len(chunk["text"]) for chunk in result),
+    }
+    return result, report
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python dedup.py [data_dir|chunks.jsonl|chunks.json] [out.jsonl]
+    #                        [--threshold 0.8] [--min-payload-chars 200]
+    from benchmark import load_chunks
+    from ingest import DEFAULT_DATA_DIR
+
+    args = sys.argv[1:]
+    options = {"--threshold": "0.8", "--min-payload-chars": "200"}
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+
+    source = args[0] if args else DEFAULT_DATA_DIR
+    output_filename = args[1] if len(args) > 1 else "clickpost_chunks_dedup.jsonl"
+
+    chunks, report = dedup_chunks(
+        load_chunks(source, with_payloads=True),
+        threshold=float(options["--threshold"]),
+        min_payload_chars=int(options["--min-payload-chars"]),
+    )
+    write_chunks_jsonl(chunks, output_filename)
+
+    saved = 1 - report["chars_after"] / report["chars_before"] if report["chars_before"] else 0.0
+    print(f"Deduplicated {report['input']} chunks from {source}")
+    print(f"  exact duplicates: {report['exact_duplicates']}")
+    print(
+        f"  near duplicates:  {report['near_duplicates']} "
+        f"({report['lsh_verified']}/{report['lsh_candidates']} LSH candidates verified)"
+    )
+    print(
+        f"  interned payloads: {report['interned_payloads']} "
+        f"({report['payload_references']} references)"
+    )
+    print(f"\n✅ {report['output']} chunks, {report['chars_after']} chars ({saved:.1%} smaller)")
+    print(f"📄 Saved to: {output_filename}")
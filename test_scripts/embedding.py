@@ -0,0 +1,254 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from chunking import estimate_tokens
+from manifest import content_hash
+
+DEFAULT_CACHE_DIR = "clickpost_embedding_cache"
+UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class EmbeddingCache:
+    """
+    On-disk float32 vectors keyed by (model, content hash), one .npy per
+    vector under <cache_dir>/<model>/<hash[:2]>/. Writes are atomic, so
+    concurrent builds can share a cache directory.
+    """
+
+    def __init__(self, cache_dir, model):
+        self.root = os.path.join(cache_dir, UNSAFE_NAME_RE.sub("_", model))
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.npy")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path)
+
+    def put(self, key, vector):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(vector, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+
+class EmbeddingScheduler:
+    """
+    Turns a chunk stream into (chunk, vector) pairs, in input order.
+
+    Cache hits never reach the embedder. Misses are grouped into batches
+    bounded by `max_batch_size` chunks and a token budget, and run on
+    `workers` threads with at most `max_in_flight` batches outstanding, so
+    memory stays bounded however large the corpus is.
+
+    Results leave in input order, so a cache hit waits for every miss
+    ahead of it. A partial batch is therefore sent as soon as a hit queues
+    behind it with nothing older in flight, and at most `max_pending`
+    chunks (default: one batch per in-flight slot, plus one) are held
+    before waiting on the oldest batch.
+
+    The token budget adapts between `min_batch_tokens` and
+    `max_batch_tokens`: it grows while batches finish well under
+    `target_seconds` and halves when one runs over. A batch whose call
+    raises is split in half and retried, down to single chunks.
+
+    `embedder` is any callable texts -> (n, dim) array with a `.name`;
+    HashingEmbedder is the deterministic local backend for tests.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        cache=None,
+        max_batch_tokens=8192,
+        min_batch_tokens=512,
+        max_batch_size=64,
+        workers=2,
+        max_in_flight=None,
+        max_pending=None,
+        target_seconds=1.0,
+        count_tokens=estimate_tokens,
+    ):
+        self.embedder = embedder
+        self.cache = cache
+        self.max_batch_tokens = max_batch_tokens
+        self.min_batch_tokens = min_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.workers = workers
+        self.max_in_flight = max_in_flight or 2 * workers
+        self.max_pending = max_pending or (self.max_in_flight + 1) * max_batch_size
+        self.target_seconds = target_seconds
+        self.count_tokens = count_tokens
+        self.batch_tokens = max_batch_tokens
+        self.stats = {
+            "chunks": 0,
+            "cache_hits": 0,
+            "embedded": 0,
+            "calls": 0,
+            "failed_calls": 0,
+            "tokens": 0,
+            "embed_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def _adapt(self, elapsed):
+        with self._lock:
+            if elapsed > self.target_seconds:
+                self.batch_tokens = max(self.min_batch_tokens, self.batch_tokens // 2)
+            elif elapsed < self.target_seconds / 2:
+                self.batch_tokens = min(self.max_batch_tokens, self.batch_tokens * 3 // 2)
+
+    def _call(self, texts):
+        start = time.perf_counter()
+        try:
+            vectors = np.asarray(self.embedder(texts), dtype=np.float32)
+        except Exception:
+            with self._lock:
+                self.stats["failed_calls"] += 1
+                self.batch_tokens = max(self.min_batch_tokens, self.batch_tokens // 2)
+            if len(texts) == 1:
+                raise
+            middle = len(texts) // 2
+            return np.concatenate([self._call(texts[:middle]), self._call(texts[middle:])])
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["embed_seconds"] += elapsed
+        self._adapt(elapsed)
+        return vectors
+
+    def _run_batch(self, entries):
+        vectors = self._call([entry["chunk"]["text"] for entry in entries])
+        if self.cache is not None:
+            for entry, vector in zip(entries, vectors):
+                self.cache.put(entry["key"], vector)
+        with self._lock:
+            self.stats["embedded"] += len(entries)
+        return vectors
+
+    def embed(self, chunks):
+        """Yield (chunk, float32 vector) for every chunk, in input order."""
+
+        pending = deque()
+        in_flight = deque()
+        batch = []
+        batch_tokens = 0
+
+        def ready(entry, wait):
+            if entry["vector"] is not None:
+                return True
+            future = entry["future"]
+            if future is None or not (wait or future.done()):
+                return False
+            entry["vector"] = future.result()[entry["offset"]]
+            return True
+
+        def drain(wait=False):
+            while pending and ready(pending[0], wait):
+                entry = pending.popleft()
+                yield entry["chunk"], entry["vector"]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+
+            def submit():
+                nonlocal batch, batch_tokens
+                future = pool.submit(self._run_batch, batch)
+                for offset, entry in enumerate(batch):
+                    entry["future"], entry["offset"] = future, offset
+                in_flight.append(future)
+                batch, batch_tokens = [], 0
+                # Backpressure: wait for the oldest batch before queuing more
+                while len(in_flight) > self.max_in_flight:
+                    in_flight.popleft().result()
+                while in_flight and in_flight[0].done():
+                    in_flight.popleft()
+
+            for chunk in chunks:
+                self.stats["chunks"] += 1
+                key = content_hash(chunk["text"].encode("utf-8"))
+                entry = {"chunk": chunk, "key": key, "vector": None, "future": None}
+                pending.append(entry)
+
+                if self.cache is not None:
+                    entry["vector"] = self.cache.get(key)
+                if entry["vector"] is not None:
+                    self.stats["cache_hits"] += 1
+                else:
+                    tokens = self.count_tokens(chunk["text"])
+                    self.stats["tokens"] += tokens
+                    if batch and (
+                        batch_tokens + tokens > self.batch_tokens
+                        or len(batch) >= self.max_batch_size
+                    ):
+                        submit()
+                    batch.append(entry)
+                    batch_tokens += tokens
+
+                yield from drain()
+
+                # The oldest chunk is a miss waiting for its batch to fill
+                # while hits queue behind it: send the batch now
+                if batch and pending[0] is batch[0] and len(pending) > len(batch):
+                    submit()
+                if len(pending) > self.max_pending:
+                    yield from drain(wait=True)
+
+            if batch:
+                submit()
+            yield from drain(wait=True)
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python embedding.py [data_dir|chunks.jsonl|chunks.json] [--model NAME]
+    #                            [--cache DIR] [--workers N] [--max-batch-tokens N]
+    from benchmark import load_chunks
+    from ingest import DEFAULT_DATA_DIR
+    from vector_index import load_embedder
+
+    args = sys.argv[1:]
+    options = {
+        "--model": "hashing-512",
+        "--cache": DEFAULT_CACHE_DIR,
+        "--workers": "2",
+        "--max-batch-tokens": "8192",
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+    source = args[0] if args else DEFAULT_DATA_DIR
+
+    embedder = load_embedder(options["--model"])
+    scheduler = EmbeddingScheduler(
+        embedder,
+        EmbeddingCache(options["--cache"], embedder.name),
+        max_batch_tokens=int(options["--max-batch-tokens"]),
+        workers=int(options["--workers"]),
+    )
+
+    start = time.perf_counter()
+    count = sum(1 for _ in scheduler.embed(load_chunks(source)))
+    elapsed = time.perf_counter() - start
+
+    stats = scheduler.stats
+    print(f"Embedded {count} chunks from {source} with {embedder.name} in {elapsed:.2f}s")
+    print(f"  cache hits: {stats['cache_hits']}   embedded: {stats['embedded']}")
+    print(
+        f"  calls: {stats['calls']} ({stats['failed_calls']} failed)   "
+        f"tokens: {stats['tokens']}   final batch budget: {scheduler.batch_tokens}"
+    )
+    print(f"📄 Cache: {options['--cache']}")
@@ -0,0 +1,395 @@
+import ast
+import json
+import re
+import sys
+
+from chunking import estimate_tokens
+
+# Compact rendering of OpenAPI example payloads for chunk text. The default
+# json.dumps(indent=2) output is mostly indentation, quotes and braces; the
+# compact form is YAML-like, shows long arrays as one representative element
+# plus a count, and prints scenarios that share most of a payload as a diff
+# against an earlier one. Every field name is kept.
+
+EXAMPLE_STYLES = ("compact", "json")
+
+# Arrays of scalars up to this length are printed in full
+MAX_INLINE_ITEMS = 5
+
+# Matched against the whole key or string (fullmatch: "$" would also
+# accept a trailing newline)
+PLAIN_KEY_RE = re.compile(r"[\w.$@/\-]+")
+PLAIN_STRING_RE = re.compile(r"[^\s\-?:,\[\]{}#&*!|>'\"%@`][^\n]*")
+# Strings that would read as another type if left unquoted
+AMBIGUOUS_RE = re.compile(r"(?:true|false|null|yes|no|~|[-+]?(?:\d[\d_]*)?\.?\d+(?:[eE][-+]?\d+)?)", re.I)
+
+# A JSON string literal; JSON strings never span lines
+JSON_STRING_RE = re.compile(r'("(?:[^"\\\n]|\\.)*")')
+# The end of a line before a string literal, and the value that ends it
+LINE_END_RE = re.compile(r"(\d|[\]}]|true|false|null)?[ \t]*\n\s*\Z")
+
+
+def _repair_json(text):
+    """
+    Fix the slips hand-written examples make: doubled and trailing commas,
+    commas missing at the end of a line, and numbers with leading zeros
+    ("000").
+    Only the text between string literals is touched.
+    """
+
+    parts = JSON_STRING_RE.split(text)
+    for i in range(0, len(parts), 2):
+        code = parts[i]
+        code = re.sub(r",(?:\s*,)+", ",", code)
+        code = re.sub(r",(\s*[\]}])", r"\1", code)
+        code = re.sub(r"(?<![\w.])(-?)0+(?=\d)", r"\1", code)
+        # A line ending in a value, followed by a line starting with a
+        # string, is missing its comma
+        end = LINE_END_RE.search(code) if i < len(parts) - 1 else None
+        if end and end.group(1):
+            code = code[: end.end(1)] + "," + code[end.end(1) :]
+        elif end and i > 0 and end.start() == 0:
+            code = "," + code
+        parts[i] = code
+    return "".join(parts)
+
+
+def decode_payload(value):
+    """
+    Specs often hold an example as a JSON document inside a string, which
+    json.dumps then escapes onto one line. Parse those into their value,
+    repairing small JSON slips and accepting Python literals ({'awb': ''}).
+    A string that still does not parse is returned unchanged.
+    """
+
+    if isinstance(value, str) and value.lstrip()[:1] in ("{", "["):
+        for parse in (json.loads, lambda text: json.loads(_repair_json(text)), ast.literal_eval):
+            try:
+                parsed = parse(value)
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(parsed, (dict, list)):
+                return parsed
+    return value
+
+
+def _is_scalar(value):
+    return not isinstance(value, (dict, list))
+
+
+def _key(key):
+    key = str(key)
+    return key if PLAIN_KEY_RE.fullmatch(key) else json.dumps(key, ensure_ascii=False)
+
+
+def _scalar(value):
+    if isinstance(value, str):
+        plain = (
+            PLAIN_STRING_RE.fullmatch(value)
+            and not value.endswith(" ")
+            and ": " not in value
+            and " #" not in value
+            and not AMBIGUOUS_RE.fullmatch(value)
+        )
+        return value if plain else json.dumps(value, ensure_ascii=False)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _representative(items):
+    """
+    One element standing in for a list of dicts: the first element, with
+    any field that only later elements have merged in, so no field name is
+    lost when the rest are elided.
+    """
+
+    merged = {}
+    for item in items:
+        for key, value in item.items():
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(merged[key], dict) and isinstance(value, dict):
+                merged[key] = _representative([merged[key], value])
+    return merged
+
+
+def _inline_list(items):
+    shown = items if len(items) <= MAX_INLINE_ITEMS else items[:1]
+    text = "[" + ", ".join(_scalar(item) for item in shown)
+    if len(shown) < len(items):
+        return text + f", ...]  # {len(items)} items"
+    return text + "]"
+
+
+def _lines(value, pad):
+    """YAML-like lines for a dict or list, each prefixed with `pad`."""
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _entry(f"{pad}{_key(key)}:", item, pad)
+    else:
+        if value and all(isinstance(item, dict) for item in value) and len(value) > 1:
+            yield f"{pad}# {len(value)} items, first shown"
+            value = [_representative(value)]
+        for item in value:
+            if _is_scalar(item) or not item:
+                yield f"{pad}- {_scalar(item) if _is_scalar(item) else json.dumps(item)}"
+                continue
+            if isinstance(item, list) and all(_is_scalar(x) for x in item):
+                yield f"{pad}- {_inline_list(item)}"
+                continue
+            lines = list(_lines(item, pad + "  "))
+            # The first line moves up beside the dash
+            yield f"{pad}- {lines[0][len(pad) + 2:]}"
+            yield from lines[1:]
+
+
+def _entry(label, value, pad):
+    if _is_scalar(value):
+        yield f"{label} {_scalar(value)}"
+    elif not value:
+        yield f"{label} {json.dumps(value)}"
+    elif isinstance(value, list) and all(_is_scalar(item) for item in value):
+        yield f"{label} {_inline_list(value)}"
+    else:
+        yield label
+        yield from _lines(value, pad + "  ")
+
+
+def render_compact(value):
+    """Compact text for one example payload."""
+
+    value = decode_payload(value)
+    if _is_scalar(value) or not value:
+        return _scalar(value) if _is_scalar(value) else json.dumps(value)
+    if isinstance(value, list) and all(_is_scalar(item) for item in value):
+        return _inline_list(value)
+    return "\n".join(_lines(value, ""))
+
+
+def payload_diff(value, reference, prefix=""):
+    """
+    (changed, removed): the fields of `value` that are new or differ from
+    `reference`, recursing into objects both have, and the dotted paths of
+    fields only `reference` has.
+    """
+
+    changed, removed = {}, []
+    for key, item in value.items():
+        if key not in reference:
+            changed[key] = item
+        elif item == reference[key]:
+            continue
+        elif isinstance(item, dict) and isinstance(reference[key], dict):
+            nested, nested_removed = payload_diff(item, reference[key], f"{prefix}{key}.")
+            if nested:
+                changed[key] = nested
+            removed += nested_removed
+        else:
+            changed[key] = item
+    removed += [f"{prefix}{key}" for key in reference if key not in value]
+    return changed, removed
+
+
+def render_diff(changed, removed):
+    lines = [render_compact(changed)] if changed else []
+    if removed:
+        lines.append("# without: " + ", ".join(removed))
+    return "\n".join(lines) or "(identical)"
+
+
+def _indent(text, indent):
+    return "\n".join(indent + line for line in text.splitlines()) if indent else text
+
+
+def render_examples(examples, style="compact", indent=""):
+    """
+    Render named example payloads. `examples` is a list of (name, value);
+    empty values are skipped. Returns (name, label, text, payload) per
+    block, where `label` is the "--- label ---" heading, `text` is indented
+    by `indent`, and `payload` is the decoded value when `text` renders it
+    in full (None for a diff), for dedup to intern.
+
+    "json" reproduces the original json.dumps(indent=2) rendering. With
+    "compact", an object payload that shares most of its fields with an
+    earlier scenario is printed as a diff against it ("Scenario: B (changes
+    from A)"), whenever that is shorter than printing it in full.
+    """
+
+    examples = [(name, value) for name, value in examples if value]
+    if style == "json":
+        return [
+            (name, f"Scenario: {name}", _indent(json.dumps(value, indent=2), indent), decode_payload(value))
+            for name, value in examples
+        ]
+
+    blocks, printed = [], []
+    for name, value in examples:
+        value = decode_payload(value)
+        label, text, payload = f"Scenario: {name}", render_compact(value), value
+        if isinstance(value, dict):
+            # Diff against whichever earlier scenario gives the shortest text
+            for base_name, base in printed:
+                diff = render_diff(*payload_diff(value, base))
+                if estimate_tokens(diff) < estimate_tokens(text):
+                    label, text, payload = f"Scenario: {name} (changes from {base_name})", diff, None
+            printed.append((name, value))
+        blocks.append((name, label, _indent(text, indent), payload))
+    return blocks
+
+
+def render_example(value, style="compact", indent=""):
+    """Text for a single payload (an OpenAPI singular `example`)."""
+
+    if style == "compact":
+        text = render_compact(value)
+    else:
+        text = json.dumps(value, indent=2)
+    return _indent(text, indent)
+
+
+def field_names(value):
+    """Every object key in a payload, at any depth."""
+
+    names = set()
+    value = decode_payload(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            names.add(str(key))
+            names |= field_names(item)
+    elif isinstance(value, list):
+        for item in value:
+            names |= field_names(item)
+    return names
+
+
+EXAMPLE_SECTIONS = ("request_example", "response_example")
+
+
+def savings_report(spec_files, count_tokens=estimate_tokens):
+    """
+    Build every endpoint with both example styles and report, per chunk,
+    the tokens of the whole chunk and of its example sections alone, plus
+    any example field name the compact text lost (expected: none).
+    """
+
+    from parser import HTTP_METHODS, build_endpoint_sections, spec_header
+    from schema_resolver import SchemaResolver
+    from spec_stream import iter_openapi_paths
+
+    def tokens(sections):
+        full = count_tokens("\n".join(line for section in sections for line in section["lines"]))
+        examples = sum(
+            count_tokens("\n".join(section["lines"]))
+            for section in sections
+            if section["name"].startswith(EXAMPLE_SECTIONS)
+        )
+        return full, examples
+
+    rows = []
+    for spec_file in spec_files:
+        resolver = None
+        for spec, path, methods in iter_openapi_paths(spec_file):
+            if resolver is None:
+                resolver = SchemaResolver(spec)
+            title, base_url = spec_header(spec)
+            for method, details in methods.items():
+                if method.lower() not in HTTP_METHODS:
+                    continue
+                built = {
+                    style: build_endpoint_sections(title, base_url, path, method, details, resolver, style)
+                    for style in EXAMPLE_STYLES
+                }
+                (tokens_before, examples_before), (tokens_after, examples_after) = (
+                    tokens(built["json"]),
+                    tokens(built["compact"]),
+                )
+                text = "\n".join(line for section in built["compact"] for line in section["lines"])
+                fields = _example_fields(details)
+                rows.append(
+                    {
+                        "source": spec_file,
+                        "endpoint": f"{method.upper()} {path}",
+                        "tokens_before": tokens_before,
+                        "tokens_after": tokens_after,
+                        "example_tokens_before": examples_before,
+                        "example_tokens_after": examples_after,
+                        "saved": _saved(tokens_before, tokens_after),
+                        "example_fields": len(fields),
+                        "missing_fields": sorted(name for name in fields if name not in text),
+                    }
+                )
+
+    def total(prefix):
+        before = sum(row[f"{prefix}tokens_before"] for row in rows)
+        after = sum(row[f"{prefix}tokens_after"] for row in rows)
+        return {"tokens_before": before, "tokens_after": after, "saved": _saved(before, after)}
+
+    return {
+        "chunks": len(rows),
+        "all_text": total(""),
+        "example_text": total("example_"),
+        "missing_fields": sum(len(row["missing_fields"]) for row in rows),
+        "rows": rows,
+    }
+
+
+def _saved(before, after):
+    return round(1 - after / before, 3) if before else 0.0
+
+
+def _example_fields(details):
+    """Field names of every literal example in one operation (refs unresolved)."""
+
+    names = set()
+
+    def visit(content):
+        for content_info in (content or {}).values():
+            if not isinstance(content_info, dict):
+                continue
+            for example in (content_info.get("examples") or {}).values():
+                if isinstance(example, dict):
+                    names.update(field_names(example.get("value")))
+            names.update(field_names(content_info.get("example")))
+
+    visit((details.get("requestBody") or {}).get("content"))
+    for response in (details.get("responses") or {}).values():
+        if isinstance(response, dict):
+            visit(response.get("content"))
+    return names
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage:
+    #   python example_render.py report [spec.json ...] [--out report.json]
+    #   python example_render.py < payload.json    render one payload compactly
+    args = sys.argv[1:]
+    output_filename = "clickpost_example_savings.json"
+    if "--out" in args:
+        i = args.index("--out")
+        output_filename = args[i + 1]
+        args = args[:i] + args[i + 2 :]
+
+    if args and args[0] == "report":
+        from ingest import DEFAULT_DATA_DIR, discover_sources
+
+        spec_files = args[1:] or [f for f in discover_sources(DEFAULT_DATA_DIR) if f.endswith(".json")]
+        report = savings_report(spec_files)
+        with open(output_filename, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        print(f"{'endpoint':<48}{'before':>8}{'after':>8}{'saved':>8}")
+        for row in sorted(report["rows"], key=lambda r: -r["tokens_before"])[:15]:
+            print(f"{row['endpoint'][:47]:<48}{row['tokens_before']:>8}{row['tokens_after']:>8}{row['saved']:>8.1%}")
+        print(f"\n{report['chunks']} endpoint chunks")
+        for name in ("example_text", "all_text"):
+            summary = report[name]
+            print(
+                f"{name:<14}{summary['tokens_before']:>8} -> {summary['tokens_after']:<8} tokens"
+                f"  ({summary['saved']:.1%} saved)"
+            )
+        print(f"{'✅' if not report['missing_fields'] else '❌'} Missing example field names: {report['missing_fields']}")
+        print(f"\n📄 Report saved to: {output_filename}")
+
+    else:
+        print(render_compact(json.load(sys.stdin)))
@@ -0,0 +1,214 @@
+import json
+import re
+import sys
+
+import numpy as np
+
+# Facets are encoded in the data/ file names, e.g.
+# clickpost-mps-order-creation-india.md or clickpost-shipment-tracking-v3.md
+FACETS = ("geo", "type", "version")
+
+FILENAME_FACETS = {
+    "geo": [("india", re.compile(r"india")), ("row", re.compile(r"rest-world"))],
+    "type": [(value, re.compile(rf"(?:^|[-_]){value}[-_]")) for value in ("sps", "mps", "qc")],
+}
+VERSION_RE = re.compile(r"(?:^|[-_/])(v\d+)(?:[-_/.]|$)")
+
+QUESTION_FACETS = {
+    "geo": [
+        ("india", re.compile(r"\bindia\b|\bindian\b|\bdomestic\b", re.I)),
+        (
+            "row",
+            re.compile(
+                # "ROW"/"RoW" only as written: the lowercase word "row" is ordinary English
+                r"rest[- ]of[- ](?:the[- ])?world|(?-i:\bR[Oo]W\b)|international|cross[- ]border"
+                r"|outside india",
+                re.I,
+            ),
+        ),
+    ],
+    "type": [
+        ("mps", re.compile(r"\bmps\b|multi[- ]?(?:piece|package|parcel|box)", re.I)),
+        ("sps", re.compile(r"\bsps\b|single[- ]?(?:piece|package|parcel|box)", re.I)),
+        ("qc", re.compile(r"\bqc\b|quality[- ]check", re.I)),
+    ],
+}
+QUESTION_VERSION_RE = re.compile(r"\b(v\d+)\b", re.I)
+
+
+def chunk_facets(source, metadata):
+    """
+    Facet values for one chunk, from its source file name and endpoint
+    path. The file name wins for version, since the docs name it there
+    (tracking-v2 vs tracking-v3) even when examples use other paths.
+    """
+
+    name = source.lower()
+    facets = {}
+    for facet, patterns in FILENAME_FACETS.items():
+        for value, pattern in patterns:
+            if pattern.search(name):
+                facets[facet] = value
+                break
+
+    match = VERSION_RE.search(name) or VERSION_RE.search(metadata.get("path", "").lower())
+    if match:
+        facets["version"] = match.group(1)
+    return facets
+
+
+def infer_filters(question):
+    """
+    Guess facet filters from the question text. A facet is only set when
+    exactly one value matches, so "India vs rest of world" adds no geo
+    filter.
+    """
+
+    filters = {}
+    for facet, patterns in QUESTION_FACETS.items():
+        values = [value for value, pattern in patterns if pattern.search(question)]
+        if len(values) == 1:
+            filters[facet] = values[0]
+
+    versions = {v.lower() for v in QUESTION_VERSION_RE.findall(question)}
+    if len(versions) == 1:
+        filters["version"] = versions.pop()
+    return filters
+
+
+def parse_filters(text):
+    """Parse 'geo=india, type=mps' (values may be '|'-separated) into a dict."""
+
+    filters = {}
+    for part in text.split(","):
+        if "=" in part:
+            facet, value = part.split("=", 1)
+            values = [v.strip().lower() for v in value.split("|") if v.strip()]
+            filters[facet.strip()] = values[0] if len(values) == 1 else values
+    return filters
+
+
+def rows_to_bitmap(rows, count):
+    """Bitmap with the bits of `rows` set, built in one pass."""
+
+    flags = np.zeros(count, dtype=bool)
+    flags[rows] = True
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+def bitmap_to_rows(bits, count):
+    """Set bits of a bitmap as ascending row ids, in one pass."""
+
+    data = np.frombuffer(bits.to_bytes((count + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(data, count=count, bitorder="little")).tolist()
+
+
+class FacetIndex:
+    """
+    One bitmap per facet value, as Python ints: bit i is set when row i
+    has that value.
+
+    Filtering ANDs across facets and ORs values within a facet. Rows that
+    carry no value for a facet are neutral and always pass it: the error
+    code reference is as relevant to India as to rest-of-world questions.
+    A row also carries the values of the duplicates dedup folded into it
+    (metadata["duplicates"]), so filtering for any copy still finds it.
+    """
+
+    def __init__(self, chunks=None, count=0, bitmaps=None):
+        self.count = count
+        self.bitmaps = bitmaps or {facet: {} for facet in FACETS}
+        if chunks is not None:
+            # Rows are collected first: OR-ing one bit at a time into a
+            # growing int copies it per row
+            self.count = 0
+            rows = {facet: {} for facet in FACETS}
+            for row, chunk in enumerate(chunks):
+                meta = chunk.get("metadata", {})
+                metas = [meta] + meta.get("duplicates", [])
+                for facet in FACETS:
+                    for value in {m[facet] for m in metas if m.get(facet)}:
+                        rows[facet].setdefault(value, []).append(row)
+                self.count = row + 1
+            for facet, values in rows.items():
+                bitmaps = self.bitmaps.setdefault(facet, {})
+                for value, value_rows in values.items():
+                    bitmaps[value] = bitmaps.get(value, 0) | rows_to_bitmap(value_rows, self.count)
+
+    def all_rows(self):
+        return (1 << self.count) - 1
+
+    def bitmap(self, filters):
+        """Bitmap of rows matching every filter."""
+
+        selected = self.all_rows()
+        for facet, values in filters.items():
+            if facet not in self.bitmaps:
+                raise ValueError(f"Unknown facet: {facet}")
+            if isinstance(values, str):
+                values = [values]
+            tagged = 0
+            matched = 0
+            for value, bits in self.bitmaps[facet].items():
+                tagged |= bits
+                if value in values:
+                    matched |= bits
+            selected &= matched | (self.all_rows() & ~tagged)
+        return selected
+
+    def rows(self, filters):
+        """Row ids matching `filters` in ascending order, or None if unfiltered."""
+
+        if not filters:
+            return None
+        return bitmap_to_rows(self.bitmap(filters), self.count)
+
+    def counts(self):
+        return {
+            facet: {value: bin(bits).count("1") for value, bits in sorted(values.items())}
+            for facet, values in self.bitmaps.items()
+        }
+
+    def save(self, facets_file):
+        data = {
+            "count": self.count,
+            "bitmaps": {
+                facet: {value: format(bits, "x") for value, bits in values.items()}
+                for facet, values in self.bitmaps.items()
+            },
+        }
+        with open(facets_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def load(cls, facets_file):
+        with open(facets_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        bitmaps = {
+            facet: {value: int(bits, 16) for value, bits in values.items()}
+            for facet, values in data["bitmaps"].items()
+        }
+        return cls(count=data["count"], bitmaps=bitmaps)
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python facets.py [data_dir|chunks.jsonl|chunks.json] ["question"]
+    from benchmark import load_chunks
+    from ingest import DEFAULT_DATA_DIR
+
+    args = sys.argv[1:]
+    source = args[0] if args else DEFAULT_DATA_DIR
+    index = FacetIndex(load_chunks(source))
+
+    print(f"Facets over {index.count} chunks from {source}")
+    for facet, values in index.counts().items():
+        print(f"  {facet}: " + ", ".join(f"{value}={n}" for value, n in values.items()))
+
+    if len(args) > 1:
+        question = " ".join(args[1:])
+        filters = infer_filters(question)
+        rows = index.rows(filters)
+        print(f"\nQuestion: {question}")
+        print(f"Inferred filters: {filters or 'none'}")
+        print(f"Candidates: {index.count if rows is None else len(rows)} of {index.count}")
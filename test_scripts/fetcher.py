@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+import sys
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Same directory ingest.py reads from; spelled out so fetching does not
+# import the chunking stack
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+# name -> (url, file saved under the output directory); file names match data/
+OPENAPI_SPECS = {
+    "clickpost": (
+        "https://docs.clickpost.ai/openapi/634e78c76acdf1003cf664db",
+        "clickpost_openapi_doc.json",
+    ),
+    "serviceability": (
+        "https://docs.clickpost.ai/openapi/6380cc6906fcf5006ec60dc7",
+        "clickpost_serviceability_openapi.json",
+    ),
+    "edd": (
+        "https://docs.clickpost.ai/openapi/651e4afa6d0e43006e1bca30",
+        "clickpost_edd_openapi.json",
+    ),
+    "tracking": (
+        "https://docs.clickpost.ai/openapi/6426725b5d5091022af9c61a",
+        "clickpost_tracking.json",
+    ),
+}
+
+DEFAULT_STATE_FILE = "clickpost_fetch_state.json"
+
+# Worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableStatus(Exception):
+    pass
+
+
+def make_session(pool_size):
+    """One session whose connection pool is shared by every request."""
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_state(state_file):
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, state_file):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, state_file)
+
+
+def _get(session, url, validators, timeout):
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return session.get(url, headers=headers, timeout=timeout)
+
+
+async def fetch_spec(
+    session, name, url, output_file, state, retries=3, backoff=0.5, timeout=10
+):
+    """
+    Fetch one spec with a conditional GET, retrying transient failures
+    with exponential backoff.
+
+    Returns {"name", "status", ...} where status is "updated", "unchanged"
+    (server answered 304) or "failed".
+    """
+
+    # Without a local copy a 304 would leave us with nothing, so ask for
+    # the full body
+    validators = state.get(name, {}) if os.path.exists(output_file) else {}
+
+    for attempt in range(retries + 1):
+        try:
+            response = await asyncio.to_thread(_get, session, url, validators, timeout)
+
+            if response.status_code == 304:
+                return {"name": name, "status": "unchanged", "file": output_file}
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableStatus(f"HTTP {response.status_code}")
+            response.raise_for_status()
+
+            # Validate before touching the file on disk
+            data = response.json()
+            if "openapi" not in data and "swagger" not in data:
+                return {
+                    "name": name,
+                    "status": "failed",
+                    "error": "Not a standard OpenAPI format",
+                }
+
+            tmp_file = output_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(response.content)
+            os.replace(tmp_file, output_file)
+
+            state[name] = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            return {
+                "name": name,
+                "status": "updated",
+                "file": output_file,
+                "bytes": len(response.content),
+            }
+
+        except (
+            RetryableStatus,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ) as e:
+            if attempt == retries:
+                return {"name": name, "status": "failed", "error": str(e)}
+            await asyncio.sleep(backoff * 2**attempt)
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return {"name": name, "status": "failed", "error": str(e)}
+
+
+async def fetch_all(
+    specs=OPENAPI_SPECS, output_dir=DEFAULT_DATA_DIR, state_file=DEFAULT_STATE_FILE, **kwargs
+):
+    """
+    Download every spec concurrently over one pooled session.
+    ETag/Last-Modified values are persisted to `state_file` for the next run.
+    """
+
+    state = load_state(state_file)
+    session = make_session(len(specs))
+    try:
+        results = await asyncio.gather(
+            *(
+                fetch_spec(
+                    session, name, url, os.path.join(output_dir, filename), state, **kwargs
+                )
+                for name, (url, filename) in specs.items()
+            )
+        )
+    finally:
+        session.close()
+
+    save_state(state, state_file)
+    return results
+
+
+def fetch_specs(specs=OPENAPI_SPECS, output_dir=DEFAULT_DATA_DIR, **kwargs):
+    """Synchronous wrapper around fetch_all."""
+
+    return asyncio.run(fetch_all(specs, output_dir, **kwargs))
+
+
+# Main execution
+if __name__ == "__main__":
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+
+    print(f"Fetching {len(OPENAPI_SPECS)} ClickPost OpenAPI specs into {output_dir}...")
+    results = fetch_specs(output_dir=output_dir)
+
+    for result in results:
+        if result["status"] == "updated":
+            print(f"✅ {result['name']}: updated ({result['bytes']} bytes)")
+        elif result["status"] == "unchanged":
+            print(f"⏸️  {result['name']}: not modified")
+        else:
+            print(f"❌ {result['name']}: {result['error']}")
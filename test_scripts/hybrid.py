@@ -0,0 +1,255 @@
+import math
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+from facets import FacetIndex, infer_filters, parse_filters
+
+WORD_RE = re.compile(r"[a-z0-9_]+")
+PATH_CHARS = r"[A-Za-z0-9_\-./{}]"
+# An endpoint path in a question: a URL's path, a token starting with "/",
+# or one starting "api/" or "v2/". A slash inside a word ("application/json",
+# "SPS/MPS", "and/or") is not a path.
+PATH_RE = re.compile(
+    rf"(?:https?://[^\s/`]+|(?<![\w./-]))(/{PATH_CHARS}+|(?:api|v\d+)/{PATH_CHARS}+)", re.IGNORECASE
+)
+# Paths indexed from document text: only those of full URLs
+URL_PATH_RE = re.compile(rf"https?://[^\s/`]+(/{PATH_CHARS}+)")
+# A 3-digit number in a question is a status code only when a word says so:
+# "status 404", "meta status 316", "HTTP status code 503", "302 error". Bare
+# numbers (pincode fragments, quantities, "top 100") are left to BM25/vectors.
+CODE_WORD = r"(?:status|error|code|http|meta)"
+CODE_RE = re.compile(
+    rf"\b{CODE_WORD}(?:\s+{CODE_WORD}){{0,2}}\s*[:=#]?\s*([1-5]\d\d)\b"
+    rf"|\b([1-5]\d\d)\s+{CODE_WORD}\b",
+    re.IGNORECASE,
+)
+# Meta/status codes as the docs write them: table cells like **301** or "status": 301
+DOC_CODE_RE = re.compile(r"\*\*([1-5]\d\d)\*\*|\"status\":\s*([1-5]\d\d)")
+
+# Metadata fields indexed alongside the text, with their repeat weight
+METADATA_FIELDS = {"endpoint": 3, "path": 3, "method": 1, "api": 1, "summary": 2, "section": 2}
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.lower())
+
+
+def normalize_path(path):
+    """
+    Canonical form for endpoint paths so '/api/v2/track-order/',
+    'v2/track-order' and the OpenAPI '/v2/track-order/' all match.
+    """
+
+    path = path.lower().strip("/.")
+    if path.startswith("api/"):
+        path = path[4:]
+    return path
+
+
+def query_identifiers(query):
+    """Exact identifiers in a question: endpoint paths and status/error codes."""
+
+    paths = {normalize_path(p) for p in PATH_RE.findall(query)}
+    codes = {before or after for before, after in CODE_RE.findall(query)}
+    return {p for p in paths if p}, codes
+
+
+class BM25Index:
+    """
+    Inverted-index BM25 over chunk text plus weighted metadata fields.
+    Scoring only walks the postings of the query terms.
+    """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk["text"])
+            meta = chunk.get("metadata", {})
+            for field, weight in METADATA_FIELDS.items():
+                if meta.get(field):
+                    tokens.extend(tokenize(str(meta[field])) * weight)
+
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((doc_id, tf))
+            self.doc_lengths.append(len(tokens))
+
+        self.doc_count = len(self.doc_lengths)
+        self.avg_length = sum(self.doc_lengths) / self.doc_count if self.doc_count else 0.0
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query, k=10, rows=None):
+        """Return the top-k [(doc_id, score)], optionally within `rows`."""
+
+        allowed = set(rows) if rows is not None else None
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class IdentifierIndex:
+    """
+    Exact lookup of endpoint paths (from metadata, including absorbed
+    duplicates, and full URLs in the text; a bare "a/b" in prose is not
+    indexed) and meta/status codes (from error-code tables and examples).
+    """
+
+    def __init__(self, chunks):
+        self.paths = defaultdict(set)
+        self.codes = defaultdict(set)
+
+        for doc_id, chunk in enumerate(chunks):
+            meta = chunk.get("metadata", {})
+            # Paths of the duplicates dedup folded into this chunk too
+            for m in [meta] + meta.get("duplicates", []):
+                if m.get("path"):
+                    self.paths[normalize_path(m["path"])].add(doc_id)
+            for path in URL_PATH_RE.findall(chunk["text"]):
+                self.paths[normalize_path(path)].add(doc_id)
+            for bold, status in DOC_CODE_RE.findall(chunk["text"]):
+                self.codes[bold or status].add(doc_id)
+
+    def lookup(self, query, rows=None):
+        """Docs hit by an exact identifier in the query, fewest-hits first."""
+
+        paths, codes = query_identifiers(query)
+        hits = [self.paths[p] for p in paths if p in self.paths]
+        hits += [self.codes[c] for c in codes if c in self.codes]
+
+        counts = Counter()
+        for doc_ids in hits:
+            counts.update(doc_ids)
+        allowed = set(rows) if rows is not None else None
+        ranked = [
+            doc_id
+            for doc_id, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+            if allowed is None or doc_id in allowed
+        ]
+        return ranked
+
+
+def reciprocal_rank_fusion(rankings, k=60, weights=None):
+    """
+    Fuse ranked lists of doc ids: score = sum(weight / (k + rank)).
+    Returns [(doc_id, score)] best first.
+    """
+
+    weights = weights or [1.0] * len(rankings)
+    scores = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] += weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class HybridRetriever:
+    """
+    BM25 + vector retrieval fused with reciprocal rank fusion.
+
+    Questions naming an exact endpoint path or error code are answered
+    from the identifier and BM25 indexes alone, skipping the embedding
+    call entirely. Facet filters (geo, type, version) narrow the candidate
+    rows before any index is scored.
+    """
+
+    def __init__(
+        self, chunks, vector_index=None, embedder=None, depth=50, exact_weight=2.0, facets=None
+    ):
+        self.chunks = chunks
+        self.bm25 = BM25Index(chunks)
+        self.identifiers = IdentifierIndex(chunks)
+        self.facets = facets if facets is not None else FacetIndex(chunks)
+        self.vector_index = vector_index
+        self.embedder = embedder
+        self.depth = depth
+        self.exact_weight = exact_weight
+
+    def candidate_rows(self, query, rows=None, filters=None):
+        """
+        Rows to search: `rows` narrowed by `filters`, or by filters inferred
+        from the question when `filters` is None. Inferred filters that
+        match nothing are dropped rather than returning no results.
+        """
+
+        inferred = filters is None
+        if inferred:
+            filters = infer_filters(query)
+        facet_rows = self.facets.rows(filters)
+        if facet_rows is None:
+            return rows
+        if rows is not None:
+            allowed = set(rows)
+            facet_rows = [row for row in facet_rows if row in allowed]
+        if not facet_rows and inferred:
+            return rows
+        return facet_rows
+
+    def search(self, query, k=5, rows=None, filters=None):
+        """
+        Return the top-k [(row, score)]. `filters` is a facet dict such as
+        {"geo": "india", "type": "mps"}; pass {} to disable inference.
+        """
+
+        rows = self.candidate_rows(query, rows, filters)
+        exact = self.identifiers.lookup(query, rows)[: self.depth]
+        lexical = [doc_id for doc_id, _ in self.bm25.search(query, self.depth, rows)]
+
+        rankings, weights = [lexical], [1.0]
+        if exact:
+            rankings.append(exact)
+            weights.append(self.exact_weight)
+        elif self.vector_index is not None and self.embedder is not None:
+            query_vector = self.embedder([query])[0]
+            semantic = self.vector_index.search(query_vector, self.depth, rows)
+            rankings.append([doc_id for doc_id, _ in semantic])
+            weights.append(1.0)
+
+        return reciprocal_rank_fusion(rankings, weights=weights)[:k]
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python hybrid.py "question" [--out index_dir] [--filter geo=india,type=mps]
+    from vector_index import VectorIndex, load_embedder
+
+    args = sys.argv[1:]
+    options = {"--out": "clickpost_index", "--filter": None}
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+    question = " ".join(args)
+    filters = parse_filters(options["--filter"]) if options["--filter"] else None
+
+    index = VectorIndex(options["--out"])
+    retriever = HybridRetriever(
+        index.chunks, index, load_embedder(index.info["model"]), facets=index.facets
+    )
+
+    start = time.perf_counter()
+    results = retriever.search(question, k=5, filters=filters)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Top {len(results)} for: {question} ({elapsed_ms:.2f} ms)")
+    for row, score in results:
+        meta = index.chunks[row]["metadata"]
+        label = meta.get("section") or meta.get("endpoint", "")
+        print(f"  {score:.4f}  {meta.get('source', '')}  {label}")
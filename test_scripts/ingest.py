@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from dedup import dedup_chunks
+from facets import chunk_facets
+from md_chunker import chunk_markdown
+from parser import iter_openapi_chunks
+from spec_stream import write_chunks_jsonl
+from tracing import Tracer
+from tracing import current as current_tracer
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+def discover_sources(data_dir):
+    """
+    Return every OpenAPI JSON and markdown file in `data_dir`, sorted by
+    name so the merged chunk stream is deterministic.
+    """
+
+    sources = []
+    for name in sorted(os.listdir(data_dir)):
+        if name.endswith(".json") or name.endswith(".md"):
+            sources.append(os.path.join(data_dir, name))
+    return sources
+
+
+def chunk_file(
+    file_path, max_tokens=None, overlap_tokens=0, example_style="compact", with_payloads=False
+):
+    """
+    Parse and chunk a single source file. Runs inside a worker process.
+    `with_payloads` keeps the parsed example payloads on OpenAPI chunks
+    for dedup (see parser.iter_openapi_chunks).
+    """
+
+    source = os.path.basename(file_path)
+    if file_path.endswith(".md"):
+        chunks = chunk_markdown(file_path, max_tokens)
+    else:
+        chunks = []
+        for chunk in iter_openapi_chunks(
+            file_path, max_tokens, overlap_tokens, example_style, with_payloads
+        ):
+            chunk["metadata"]["source"] = source
+            chunks.append(chunk)
+
+    # geo / type / version facets for filtered retrieval
+    for chunk in chunks:
+        chunk["metadata"].update(chunk_facets(source, chunk["metadata"]))
+    return chunks
+
+
+def _traced_chunk_file(worker, tracer_config, file_path):
+    """
+    Run chunk_file under a fresh tracer inside a worker process and return
+    (chunks, stage records, profile tables) for the parent to merge, so
+    profiles cover every file rather than the last one each worker ran.
+    """
+
+    tracer = Tracer(**tracer_config)
+    with tracer.activate():
+        chunks = worker(file_path)
+    return chunks, tracer.report()["stages"], tracer.profile_stats()
+
+
+def ingest(
+    data_dir=DEFAULT_DATA_DIR,
+    workers=None,
+    max_tokens=None,
+    overlap_tokens=0,
+    example_style="compact",
+    with_payloads=False,
+):
+    """
+    Chunk every source in `data_dir` over a process pool.
+
+    Files are fanned out to `workers` processes (default: CPU count) and
+    results are yielded in sorted file order, so output is identical for
+    any worker count. `max_tokens`/`overlap_tokens` enable token-budgeted
+    splitting of oversized endpoints; `example_style` picks how OpenAPI
+    example payloads are rendered (see example_render). Pass
+    `with_payloads` when the chunks are headed for dedup_chunks, so shared
+    payloads can be interned.
+
+    Under an active tracer, stage records and profiles from the workers
+    are merged into it, so parse/resolve/chunk times are summed across
+    processes.
+    """
+
+    sources = discover_sources(data_dir)
+    worker = partial(
+        chunk_file,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+        example_style=example_style,
+        with_payloads=with_payloads,
+    )
+    if workers == 1:
+        for file_path in sources:
+            yield from worker(file_path)
+        return
+
+    tracer = current_tracer()
+    if tracer.enabled:
+        worker = partial(_traced_chunk_file, worker, tracer.config())
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() returns results in submission order, whatever finishes first
+        for result in pool.map(worker, sources):
+            if tracer.enabled:
+                result, records, profiles = result
+                tracer.merge(records, profiles)
+            yield from result
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python ingest.py [data_dir] [--workers N] [--max-tokens N] [--overlap N] [--dedup]
+    #                         [--json-examples]
+    args = sys.argv[1:]
+    dedup = "--dedup" in args
+    if dedup:
+        args.remove("--dedup")
+    example_style = "json" if "--json-examples" in args else "compact"
+    if example_style == "json":
+        args.remove("--json-examples")
+    options = {"--workers": None, "--max-tokens": None, "--overlap": 0}
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            args = args[:i] + args[i + 2 :]
+    data_dir = args[0] if args else DEFAULT_DATA_DIR
+
+    print(f"Ingesting {data_dir}...")
+    start = time.perf_counter()
+
+    output_filename = "clickpost_chunks.jsonl"
+    chunks = ingest(
+        data_dir,
+        options["--workers"],
+        options["--max-tokens"],
+        options["--overlap"],
+        example_style,
+        with_payloads=dedup,
+    )
+    if dedup:
+        chunks, report = dedup_chunks(chunks)
+    count = write_chunks_jsonl(chunks, output_filename)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Created {count} chunks from {len(discover_sources(data_dir))} files in {elapsed:.2f}s")
+    if dedup:
+        print(
+            f"🧹 Dedup: {report['exact_duplicates']} exact, {report['near_duplicates']} near "
+            f"duplicates, {report['interned_payloads']} interned payloads"
+        )
+    print(f"📄 Saved to: {output_filename}")
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sys
+
+from parser import iter_openapi_chunks
+from spec_stream import write_chunks_jsonl
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(data):
+    """
+    Stable SHA-256 of a chunk dict or raw bytes.
+    Dicts are hashed in canonical form so key order never matters.
+    """
+
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_key(chunk):
+    """
+    Identity of a chunk across runs: source file plus heading section for
+    document chunks, API title plus "METHOD /path" for endpoint chunks, and
+    the part number for sub-chunks.
+    """
+
+    meta = chunk.get("metadata", {})
+    if meta.get("section"):
+        key = f"{meta.get('source', '')}::{meta['section']}"
+    else:
+        key = f"{meta.get('api', '')}::{meta.get('endpoint', '')}"
+    # Sub-chunks of a split endpoint or section
+    if meta.get("part"):
+        key += f"#{meta['part']}"
+    return key
+
+
+def file_hash(file_path, block_size=64 * 1024):
+    """SHA-256 of a file's bytes, read in blocks."""
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_file):
+    """
+    Load a manifest, or return an empty one if it is missing or from an
+    older format (which forces a full rebuild).
+    """
+
+    empty = {"version": MANIFEST_VERSION, "chunks": {}, "files": {}}
+    if not os.path.exists(manifest_file):
+        return empty
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty
+    return manifest
+
+
+def save_manifest(manifest, manifest_file):
+    """Write the manifest atomically so a crash never leaves it half-written."""
+
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def diff_chunks(chunks, old_hashes, new_hashes):
+    """
+    Compare a chunk stream against the hashes from the previous run.
+
+    Yields delta records and fills in `new_hashes` (a dict owned by the
+    caller) as the stream is consumed:
+      {"op": "add" | "change", "key": ..., "hash": ..., "chunk": {...}}
+      {"op": "delete", "key": ...}
+    Unchanged chunks produce no output.
+    """
+
+    for chunk in chunks:
+        key = chunk_key(chunk)
+        digest = content_hash(chunk)
+        new_hashes[key] = digest
+
+        previous = old_hashes.get(key)
+        if previous == digest:
+            continue
+        op = "add" if previous is None else "change"
+        yield {"op": op, "key": key, "hash": digest, "chunk": chunk}
+
+    for key in sorted(old_hashes.keys() - new_hashes.keys()):
+        yield {"op": "delete", "key": key}
+
+
+def diff_files(file_paths, old_hashes):
+    """
+    Same as diff_chunks, but for whole source files (e.g. data/*.md).
+    Keys are file basenames.
+    """
+
+    new_hashes = {}
+    deltas = []
+    for file_path in sorted(file_paths):
+        key = os.path.basename(file_path)
+        digest = file_hash(file_path)
+        new_hashes[key] = digest
+
+        previous = old_hashes.get(key)
+        if previous != digest:
+            op = "add" if previous is None else "change"
+            deltas.append({"op": op, "key": key, "hash": digest, "file": file_path})
+
+    for key in sorted(old_hashes.keys() - new_hashes.keys()):
+        deltas.append({"op": "delete", "key": key})
+
+    return deltas, new_hashes
+
+
+def incremental_update(openapi_files, markdown_files, manifest_file, output_file):
+    """
+    Write only the added, changed and deleted chunks/files to `output_file`
+    (JSON Lines) and update the manifest. Returns a summary of counts.
+    """
+
+    manifest = load_manifest(manifest_file)
+
+    def all_chunks():
+        for openapi_file in openapi_files:
+            yield from iter_openapi_chunks(openapi_file)
+
+    summary = {"add": 0, "change": 0, "delete": 0}
+
+    def counted(deltas):
+        for delta in deltas:
+            summary[delta["op"]] += 1
+            yield delta
+
+    file_deltas, file_hashes = diff_files(markdown_files, manifest["files"])
+    chunk_hashes = {}
+    chunk_deltas = diff_chunks(all_chunks(), manifest["chunks"], chunk_hashes)
+
+    def deltas():
+        yield from chunk_deltas
+        yield from file_deltas
+
+    write_chunks_jsonl(counted(deltas()), output_file)
+
+    # Only commit the new manifest after the delta file is fully written
+    manifest["chunks"] = chunk_hashes
+    manifest["files"] = file_hashes
+    save_manifest(manifest, manifest_file)
+
+    return summary
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python manifest.py [spec.json ...] [--data ../data]
+    args = sys.argv[1:]
+    data_dir = None
+    if "--data" in args:
+        i = args.index("--data")
+        data_dir = args[i + 1]
+        args = args[:i] + args[i + 2 :]
+
+    openapi_files = args or ["clickpost_openapi_formatted.json"]
+    markdown_files = []
+    if data_dir:
+        markdown_files = [
+            os.path.join(data_dir, name)
+            for name in os.listdir(data_dir)
+            if name.endswith(".md")
+        ]
+
+    manifest_filename = "clickpost_manifest.json"
+    output_filename = "clickpost_chunks_delta.jsonl"
+
+    print("Computing incremental chunk delta...")
+    summary = incremental_update(
+        openapi_files, markdown_files, manifest_filename, output_filename
+    )
+
+    print(
+        f"\n✅ {summary['add']} added, {summary['change']} changed, "
+        f"{summary['delete']} deleted"
+    )
+    print(f"📄 Delta saved to: {output_filename}")
+    print(f"📄 Manifest saved to: {manifest_filename}")
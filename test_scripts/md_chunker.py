@@ -0,0 +1,248 @@
+import os
+import re
+import sys
+from urllib.parse import urlparse
+
+from chunking import estimate_tokens
+from spec_stream import write_chunks_jsonl
+from tracing import current as current_tracer
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+METHOD_RE = re.compile(r"\*\*Method:\*\*\s*`(GET|POST|PUT|DELETE|PATCH)`")
+URL_RE = re.compile(
+    r"\*\*(?:Full URL|URL|Path):\*\*\s*`<?(?:(GET|POST|PUT|DELETE|PATCH)\s+)?(https?://[^`>?\s]+)"
+)
+
+
+def _endpoint_metadata(text):
+    """
+    Pick up the '**Method:** `GET`' / '**URL:** `https://...`' lines the
+    docs use, so markdown chunks carry the same endpoint fields as
+    OpenAPI chunks.
+    """
+
+    method_match = METHOD_RE.search(text)
+    url_match = URL_RE.search(text)
+    if not url_match:
+        return {}
+
+    method = url_match.group(1) or (method_match.group(1) if method_match else "")
+    path = urlparse(url_match.group(2)).path
+    meta = {"path": path}
+    if method:
+        meta["method"] = method
+        meta["endpoint"] = f"{method} {path}"
+    return meta
+
+
+def _section_endpoints(sections):
+    """
+    Endpoint metadata for each section. An endpoint named in a section
+    applies to it and to the sections after it, up to the next section
+    naming one. Sections before the first are tagged only if the whole
+    doc names a single endpoint, since the intro is then about that one.
+    """
+
+    declared = [_endpoint_metadata("\n".join(section["lines"])) for section in sections]
+    distinct = {meta.get("endpoint", meta.get("path")) for meta in declared if meta}
+
+    current = next((meta for meta in declared if meta), {}) if len(distinct) == 1 else {}
+    metas = []
+    for meta in declared:
+        if meta:
+            current = meta
+        metas.append(current)
+    return metas
+
+
+def split_markdown(text):
+    """
+    Split markdown into sections along its heading hierarchy in one pass.
+
+    Returns a list of {"breadcrumb", "lines", "blocks"} where `blocks` are
+    (start, end) line ranges inside the section: paragraphs, whole tables
+    and whole fenced code blocks. Headings inside code fences are ignored.
+    """
+
+    sections = []
+    stack = []
+    current = {"breadcrumb": [], "lines": [], "blocks": []}
+    block_start = None
+    in_fence = None
+
+    def close_block():
+        nonlocal block_start
+        if block_start is not None:
+            current["blocks"].append((block_start, len(current["lines"])))
+            block_start = None
+
+    for line in text.splitlines():
+        fence = FENCE_RE.match(line)
+        if in_fence:
+            current["lines"].append(line)
+            if fence and fence.group(1) == in_fence:
+                in_fence = None
+                close_block()
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            close_block()
+            sections.append(current)
+            level = len(heading.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, heading.group(2).strip()))
+            current = {
+                "breadcrumb": [title for _, title in stack],
+                "lines": [line],
+                "blocks": [],
+            }
+            continue
+
+        if fence:
+            # A fence always starts its own block
+            close_block()
+            in_fence = fence.group(1)
+            block_start = len(current["lines"])
+            current["lines"].append(line)
+            continue
+
+        if not line.strip():
+            close_block()
+            current["lines"].append(line)
+            continue
+
+        if block_start is None:
+            block_start = len(current["lines"])
+        current["lines"].append(line)
+
+    close_block()
+    sections.append(current)
+
+    # Headings with no body of their own are carried by the breadcrumb of
+    # the next section instead of becoming empty chunks
+    return [section for section in sections if section["blocks"]]
+
+
+def _pack_blocks(section, max_tokens, count_tokens):
+    """
+    Group a section's blocks into runs of at most `max_tokens`, counting
+    the heading each run is printed under, never splitting a block. A
+    block larger than the budget stays whole.
+    """
+
+    lines = section["lines"]
+    heading = lines[0] if HEADING_RE.match(lines[0]) else None
+    heading_tokens = count_tokens(heading) + 1 if heading else 0
+
+    groups, current, current_tokens = [], [], 0
+    for start, end in section["blocks"]:
+        block = "\n".join(lines[start:end])
+        tokens = count_tokens(block) + 1
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current = []
+        if not current:
+            # Every run but one that opens with the heading gets it prepended
+            prefixed = heading and (groups or not block.startswith(heading))
+            current_tokens = heading_tokens if prefixed else 0
+        current.append(block)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+
+    # Repeat the heading on continuation parts
+    texts = []
+    for i, group in enumerate(groups):
+        body = "\n\n".join(group)
+        if heading and (i > 0 or not body.startswith(heading)):
+            body = f"{heading}\n\n{body}"
+        texts.append(body)
+    return texts
+
+
+def chunk_markdown(md_file, max_tokens=None, count_tokens=estimate_tokens):
+    """
+    Convert a markdown doc into one chunk per heading section.
+
+    Tables and fenced code blocks are never split. Metadata matches the
+    OpenAPI chunks (endpoint/method/path/api/summary where the doc names
+    an endpoint) plus `source`, `section` and the heading `breadcrumb`.
+    With `max_tokens`, long sections are split between blocks.
+    """
+
+    tracer = current_tracer()
+    with tracer.stage("parse", files=1, bytes_in=os.path.getsize(md_file)):
+        with open(md_file, "r", encoding="utf-8") as f:
+            text = f.read()
+        sections = split_markdown(text)
+
+    with tracer.stage("chunk") as stage:
+        chunks = _chunk_sections(md_file, sections, max_tokens, count_tokens)
+        stage.add(chunks=len(chunks), bytes_out=sum(len(c["text"]) for c in chunks))
+    return chunks
+
+
+def _chunk_sections(md_file, sections, max_tokens, count_tokens):
+    """Turn the parsed sections of one doc into chunks (see chunk_markdown)."""
+
+    source = os.path.basename(md_file)
+
+    doc_title = source
+    for section in sections:
+        if section["breadcrumb"]:
+            doc_title = section["breadcrumb"][0]
+            break
+    endpoint_metas = _section_endpoints(sections)
+
+    chunks = []
+    seen = {}
+    for section, endpoint_meta in zip(sections, endpoint_metas):
+        breadcrumb = section["breadcrumb"] or [doc_title]
+        name = " > ".join(breadcrumb)
+        # Repeated headings (e.g. two "Sample Response" sections) stay unique
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name} ({seen[name]})"
+
+        metadata = {
+            "source": source,
+            "api": doc_title,
+            "section": name,
+            "breadcrumb": breadcrumb,
+            "summary": breadcrumb[-1],
+        }
+        metadata.update(endpoint_meta)
+
+        header = f"Document: {doc_title}\nSection: {' > '.join(breadcrumb)}\n\n"
+        budget = float("inf")
+        if max_tokens is not None:
+            budget = max(max_tokens - count_tokens(header), 1)
+        texts = _pack_blocks(section, budget, count_tokens)
+
+        for i, body in enumerate(texts):
+            chunk_meta = dict(metadata)
+            if len(texts) > 1:
+                chunk_meta.update(part=i + 1, parts=len(texts))
+            chunks.append({"text": header + body, "metadata": chunk_meta})
+
+    return chunks
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python md_chunker.py doc.md [doc2.md ...]
+    chunks = []
+    for md_file in sys.argv[1:]:
+        chunks.extend(chunk_markdown(md_file))
+
+    print(f"\n✅ Created {len(chunks)} chunks")
+    if chunks:
+        avg_size = sum(len(c["text"]) for c in chunks) / len(chunks)
+        print(f"Average chunk size: {avg_size:.0f} characters")
+
+    output_filename = "clickpost_md_chunks.jsonl"
+    write_chunks_jsonl(chunks, output_filename)
+    print(f"📄 Saved to: {output_filename}")
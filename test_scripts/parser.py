@@ -1,7 +1,225 @@
 import json
+import os
+import sys
 
+from chunking import split_sections
+from example_render import decode_payload, render_example, render_examples
+from schema_resolver import SchemaResolver
+from spec_stream import iter_openapi_paths, write_chunks_jsonl
+from tracing import current as current_tracer
 
-def parse_openapi_to_chunks(openapi_file):
+HTTP_METHODS = ["get", "post", "put", "delete", "patch"]
+
+
+def spec_header(spec):
+    """
+    Return (title, base_url) for a spec.
+    """
+
+    info = spec.get("info", {})
+    title = info.get("title", "API")
+    # Handle server URL safely
+    servers = spec.get("servers", [])
+    base_url = servers[0].get("url", "") if servers else ""
+    return title, base_url
+
+
+def build_endpoint_sections(
+    title, base_url, path, method, details, resolver=None, example_style="compact"
+):
+    """
+    Build the text of a single endpoint (one method on one path) as a list
+    of structural sections: header, parameters, request body, each example
+    and each response code.
+
+    Each section is {"name", "context", "lines", "payloads"}. Joining every
+    section's lines gives the full chunk text; `context` holds the parent
+    lines to repeat when a section has to start a sub-chunk on its own;
+    `payloads` lists {"text", "value"} for each example payload rendered
+    in full, so dedup can intern it from the parsed value.
+    `resolver` expands $ref/allOf/oneOf schemas against the owning spec.
+    `example_style` is "compact" or "json" (see example_render).
+    """
+
+    if resolver is None:
+        resolver = SchemaResolver({})
+
+    sections = []
+
+    def start(name, context=()):
+        section = {"name": name, "context": list(context), "lines": [], "payloads": []}
+        sections.append(section)
+        return section["lines"]
+
+    def add_payload(text, value):
+        sections[-1]["payloads"].append({"text": text, "value": value})
+
+    # Build comprehensive text representation
+    chunk_text = start("header")
+
+    # 1. Header
+    chunk_text.append(f"API: {title}")
+    chunk_text.append(f"Endpoint: {method.upper()} {path}")
+    chunk_text.append(f"Full URL: {base_url}{path}")
+    chunk_text.append("")
+
+    # 2. Summary and description
+    if details.get("summary"):
+        chunk_text.append(f"Summary: {details['summary']}")
+    if details.get("description"):
+        chunk_text.append(f"Description: {details['description']}")
+    chunk_text.append("")
+
+    # 3. Parameters
+    params = details.get("parameters", [])
+    if params:
+        chunk_text = start("parameters")
+        chunk_text.append("Parameters:")
+        for param in params:
+            param = resolver.deref(param)
+            name = param.get("name")
+            location = param.get("in")
+            required = "REQUIRED" if param.get("required") else "optional"
+            # Handle schema inside param
+            param_type = resolver.type_label(param.get("schema", {}), "string")
+            description = param.get("description", "")
+            chunk_text.append(
+                f"  - {name} ({location}, {required}, {param_type}): {description}"
+            )
+        chunk_text.append("")
+
+    # 4. Request Body
+    request_body = resolver.deref(details.get("requestBody", {}))
+    if request_body:
+        chunk_text = start("request_body")
+        chunk_text.append("Request Body:")
+        if request_body.get("description"):
+            chunk_text.append(f"  Description: {request_body['description']}")
+
+        content = request_body.get("content", {})
+        for content_type, content_info in content.items():
+            chunk_text = start(f"request_body:{content_type}", ["Request Body:"])
+            chunk_text.append(f"  Content-Type: {content_type}")
+
+            # 4a. Schema Properties (nested fields as dotted paths)
+            fields = resolver.fields(content_info.get("schema", {}))
+            if fields:
+                chunk_text.append("  Schema Fields:")
+                for prop_name, prop_type, is_required, prop_desc in fields:
+                    req_marker = "[REQUIRED]" if is_required else "[optional]"
+                    chunk_text.append(
+                        f"    - {prop_name} ({prop_type}) {req_marker}: {prop_desc}"
+                    )
+
+            # 4b. Extract Request Examples (The Fix)
+            examples = content_info.get("examples", {})
+            context = ["Request Body:", f"  Content-Type: {content_type}"]
+            if examples:
+                chunk_text.append("\n  Request Examples:")
+                # OpenAPI 'examples' usually have a 'value' key holding the actual payload
+                values = [
+                    (example_name, resolver.deref(example_data).get("value"))
+                    for example_name, example_data in examples.items()
+                ]
+                for example_name, label, text, payload in render_examples(values, example_style):
+                    chunk_text = start(
+                        f"request_example:{example_name}",
+                        context + ["  Request Examples:"],
+                    )
+                    chunk_text.append(f"    --- {label} ---")
+                    chunk_text.append(text)
+                    chunk_text.append("")
+                    if payload is not None:
+                        add_payload(text, payload)
+
+            # Fallback for singular 'example'
+            elif content_info.get("example"):
+                chunk_text = start("request_example", context)
+                chunk_text.append("\n  Request Example:")
+                text = render_example(content_info["example"], example_style)
+                chunk_text.append(text)
+                add_payload(text, decode_payload(content_info["example"]))
+        chunk_text.append("")
+
+    # 5. Responses
+    responses = details.get("responses", {})
+    if responses:
+        chunk_text = start("responses")
+        chunk_text.append("Responses:")
+        for code, response in responses.items():
+            response = resolver.deref(response)
+            desc = response.get("description", "No description")
+            chunk_text = start(f"response:{code}", ["Responses:"])
+            chunk_text.append(f"  Status {code}: {desc}")
+
+            content = response.get("content", {})
+            for content_type, content_info in content.items():
+                context = ["Responses:", f"  Status {code}: {desc}"]
+
+                # 5a. Extract Response Examples (The Fix)
+                examples = content_info.get("examples", {})
+                if examples:
+                    chunk_text.append(f"    Examples ({content_type}):")
+                    values = [
+                        (example_name, resolver.deref(example_data).get("value"))
+                        for example_name, example_data in examples.items()
+                    ]
+                    # Indent the whole block to align with hierarchy
+                    for example_name, label, text, payload in render_examples(
+                        values, example_style, indent="      "
+                    ):
+                        chunk_text = start(
+                            f"response_example:{code}:{example_name}",
+                            context + [f"    Examples ({content_type}):"],
+                        )
+                        chunk_text.append(f"      --- {label} ---")
+                        chunk_text.append(text)
+                        chunk_text.append("")
+                        if payload is not None:
+                            add_payload(text, payload)
+
+                # Fallback for singular 'example'
+                elif content_info.get("example"):
+                    chunk_text = start(f"response_example:{code}", context)
+                    chunk_text.append(f"    Example ({content_type}):")
+                    text = render_example(content_info["example"], example_style, indent="      ")
+                    chunk_text.append(text)
+                    add_payload(text, decode_payload(content_info["example"]))
+
+        chunk_text.append("")
+
+    return sections
+
+
+def endpoint_metadata(title, path, method, details):
+    return {
+        "endpoint": f"{method.upper()} {path}",
+        "method": method.upper(),
+        "path": path,
+        "api": title,
+        "summary": details.get("summary", ""),
+    }
+
+
+def build_endpoint_chunk(
+    title, base_url, path, method, details, resolver=None, example_style="compact"
+):
+    """
+    Build the chunk for a single endpoint (one method on one path).
+    """
+
+    sections = build_endpoint_sections(
+        title, base_url, path, method, details, resolver, example_style
+    )
+
+    # Create chunk object
+    return {
+        "text": "\n".join(line for section in sections for line in section["lines"]),
+        "metadata": endpoint_metadata(title, path, method, details),
+    }
+
+
+def parse_openapi_to_chunks(openapi_file, example_style="compact"):
     """
     Convert OpenAPI spec into text chunks for RAG embedding.
     Includes comprehensive extraction of Request/Response 'examples'.
@@ -13,161 +231,90 @@ def parse_openapi_to_chunks(openapi_file):
     chunks = []
 
     # Extract metadata
-    info = spec.get("info", {})
-    title = info.get("title", "API")
-    # Handle server URL safely
-    servers = spec.get("servers", [])
-    base_url = servers[0].get("url", "") if servers else ""
+    title, base_url = spec_header(spec)
+    resolver = SchemaResolver(spec)
 
     # Process each endpoint
     paths = spec.get("paths", {})
 
     for path, methods in paths.items():
         for method, details in methods.items():
-            if method.lower() not in ["get", "post", "put", "delete", "patch"]:
+            if method.lower() not in HTTP_METHODS:
                 continue
 
-            # Build comprehensive text representation
-            chunk_text = []
-
-            # 1. Header
-            chunk_text.append(f"API: {title}")
-            chunk_text.append(f"Endpoint: {method.upper()} {path}")
-            chunk_text.append(f"Full URL: {base_url}{path}")
-            chunk_text.append("")
-
-            # 2. Summary and description
-            if details.get("summary"):
-                chunk_text.append(f"Summary: {details['summary']}")
-            if details.get("description"):
-                chunk_text.append(f"Description: {details['description']}")
-            chunk_text.append("")
-
-            # 3. Parameters
-            params = details.get("parameters", [])
-            if params:
-                chunk_text.append("Parameters:")
-                for param in params:
-                    name = param.get("name")
-                    location = param.get("in")
-                    required = "REQUIRED" if param.get("required") else "optional"
-                    # Handle schema inside param
-                    schema = param.get("schema", {})
-                    param_type = schema.get("type", "string")
-                    description = param.get("description", "")
-                    chunk_text.append(
-                        f"  - {name} ({location}, {required}, {param_type}): {description}"
-                    )
-                chunk_text.append("")
-
-            # 4. Request Body
-            request_body = details.get("requestBody", {})
-            if request_body:
-                chunk_text.append("Request Body:")
-                if request_body.get("description"):
-                    chunk_text.append(f"  Description: {request_body['description']}")
-
-                content = request_body.get("content", {})
-                for content_type, content_info in content.items():
-                    chunk_text.append(f"  Content-Type: {content_type}")
-
-                    # 4a. Schema Properties
-                    schema = content_info.get("schema", {})
-                    if schema.get("properties"):
-                        chunk_text.append("  Schema Fields:")
-                        required_fields = schema.get("required", [])
-                        for prop_name, prop_details in schema["properties"].items():
-                            is_required = prop_name in required_fields
-                            prop_type = prop_details.get("type", "object")
-                            prop_desc = prop_details.get("description", "")
-                            req_marker = "[REQUIRED]" if is_required else "[optional]"
-                            chunk_text.append(
-                                f"    - {prop_name} ({prop_type}) {req_marker}: {prop_desc}"
-                            )
-
-                    # 4b. Extract Request Examples (The Fix)
-                    examples = content_info.get("examples", {})
-                    if examples:
-                        chunk_text.append("\n  Request Examples:")
-                        for example_name, example_data in examples.items():
-                            # OpenAPI 'examples' usually have a 'value' key holding the actual payload
-                            val = example_data.get("value")
-                            if val:
-                                chunk_text.append(
-                                    f"    --- Scenario: {example_name} ---"
-                                )
-                                chunk_text.append(json.dumps(val, indent=2))
-                                chunk_text.append("")
-
-                    # Fallback for singular 'example'
-                    elif content_info.get("example"):
-                        chunk_text.append("\n  Request Example:")
-                        chunk_text.append(json.dumps(content_info["example"], indent=2))
-                chunk_text.append("")
-
-            # 5. Responses
-            responses = details.get("responses", {})
-            if responses:
-                chunk_text.append("Responses:")
-                for code, response in responses.items():
-                    desc = response.get("description", "No description")
-                    chunk_text.append(f"  Status {code}: {desc}")
-
-                    content = response.get("content", {})
-                    for content_type, content_info in content.items():
-
-                        # 5a. Extract Response Examples (The Fix)
-                        examples = content_info.get("examples", {})
-                        if examples:
-                            chunk_text.append(f"    Examples ({content_type}):")
-                            for example_name, example_data in examples.items():
-                                val = example_data.get("value")
-                                if val:
-                                    chunk_text.append(
-                                        f"      --- Scenario: {example_name} ---"
-                                    )
-                                    # Indent the JSON for readability
-                                    formatted_json = json.dumps(val, indent=2)
-                                    # Indent the whole block to align with hierarchy
-                                    indented_json = "\n".join(
-                                        "      " + line
-                                        for line in formatted_json.splitlines()
-                                    )
-                                    chunk_text.append(indented_json)
-                                    chunk_text.append("")
-
-                        # Fallback for singular 'example'
-                        elif content_info.get("example"):
-                            chunk_text.append(f"    Example ({content_type}):")
-                            formatted_json = json.dumps(
-                                content_info["example"], indent=2
-                            )
-                            indented_json = "\n".join(
-                                "      " + line for line in formatted_json.splitlines()
-                            )
-                            chunk_text.append(indented_json)
-
-                chunk_text.append("")
-
-            # Create chunk object
-            chunk = {
-                "text": "\n".join(chunk_text),
-                "metadata": {
-                    "endpoint": f"{method.upper()} {path}",
-                    "method": method.upper(),
-                    "path": path,
-                    "api": title,
-                    "summary": details.get("summary", ""),
-                },
-            }
-
-            chunks.append(chunk)
+            chunks.append(
+                build_endpoint_chunk(
+                    title, base_url, path, method, details, resolver, example_style
+                )
+            )
 
     return chunks
 
 
+def iter_openapi_chunks(
+    openapi_file, max_tokens=None, overlap_tokens=0, example_style="compact", with_payloads=False
+):
+    """
+    Generator version of parse_openapi_to_chunks.
+    Reads the spec incrementally and yields chunks one endpoint at a time,
+    so peak memory stays at a single path item regardless of spec size.
+    iter_openapi_paths completes the header (components included) before
+    the first path, whatever the key order, so one resolver built from it
+    serves every endpoint.
+
+    With `max_tokens`, endpoints over the budget are split into sub-chunks
+    along their sections (see chunking.split_sections). Example payloads
+    are rendered in `example_style` (see example_render). With
+    `with_payloads`, each chunk also carries "payloads": the {"text",
+    "value"} of every example rendered whole in its text, for
+    dedup.intern_payloads to consume.
+    """
+
+    tracer = current_tracer()
+    paths = tracer.wrap(
+        "parse", iter_openapi_paths(openapi_file), files=1, bytes_in=os.path.getsize(openapi_file)
+    )
+
+    resolver = None
+    for spec, path, methods in paths:
+        if resolver is None:
+            resolver = SchemaResolver(spec)
+        title, base_url = spec_header(spec)
+        for method, details in methods.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            with tracer.stage("resolve", endpoints=1):
+                sections = build_endpoint_sections(
+                    title, base_url, path, method, details, resolver, example_style
+                )
+            with tracer.stage("chunk") as stage:
+                metadata = endpoint_metadata(title, path, method, details)
+                if max_tokens is None:
+                    text = "\n".join(line for section in sections for line in section["lines"])
+                    chunks = [{"text": text, "metadata": metadata}]
+                else:
+                    chunks = split_sections(sections, metadata, max_tokens, overlap_tokens)
+                if with_payloads:
+                    payloads = [p for section in sections for p in section["payloads"]]
+                    for chunk in chunks:
+                        chunk["payloads"] = [p for p in payloads if p["text"] in chunk["text"]]
+                stage.add(chunks=len(chunks), bytes_out=sum(len(c["text"]) for c in chunks))
+            yield from chunks
+
+
 # Main execution
 if __name__ == "__main__":
+    # Streaming mode: python parser.py --jsonl [spec.json] [out.jsonl]
+    if "--jsonl" in sys.argv:
+        args = [a for a in sys.argv[1:] if a != "--jsonl"]
+        input_filename = args[0] if args else "clickpost_openapi_formatted.json"
+        output_filename = args[1] if len(args) > 1 else "clickpost_chunks_clean.jsonl"
+
+        print(f"Streaming {input_filename} -> {output_filename}...")
+        count = write_chunks_jsonl(iter_openapi_chunks(input_filename), output_filename)
+        print(f"\n✅ Wrote {count} chunks to: {output_filename}")
+        sys.exit(0)
+
     print("Parsing ClickPost OpenAPI spec...")
 
     # Ensure this filename matches your uploaded file
@@ -0,0 +1,123 @@
+import os
+import sys
+
+from dedup import dedup_chunks
+from embedding import DEFAULT_CACHE_DIR, EmbeddingCache, EmbeddingScheduler
+from ingest import DEFAULT_DATA_DIR, ingest
+from tracing import Tracer
+from vector_index import build_index, load_embedder
+
+
+def run_pipeline(
+    data_dir=DEFAULT_DATA_DIR,
+    index_dir="clickpost_index",
+    fetch=False,
+    dedup=True,
+    workers=None,
+    max_tokens=None,
+    model="hashing-512",
+    cache_dir=DEFAULT_CACHE_DIR,
+    tracer=None,
+):
+    """
+    fetch -> parse -> resolve -> chunk -> dedup -> embed -> index, with
+    every stage recorded on `tracer` (a new Tracer by default).
+
+    Chunks are collected after ingest, since dedup needs the whole corpus;
+    that also keeps the embed stage from absorbing parse time.
+    Returns the tracer.
+    """
+
+    tracer = tracer or Tracer()
+    with tracer.activate():
+        if fetch:
+            from fetcher import fetch_specs
+
+            with tracer.stage("fetch") as stage:
+                results = fetch_specs(output_dir=data_dir)
+                stage.add(
+                    files=len(results),
+                    updated=sum(1 for r in results if r["status"] == "updated"),
+                    failed=sum(1 for r in results if r["status"] == "failed"),
+                    bytes_out=sum(r.get("bytes", 0) for r in results),
+                )
+
+        chunks = list(ingest(data_dir, workers, max_tokens, with_payloads=dedup))
+
+        if dedup:
+            with tracer.stage("dedup") as stage:
+                chunks, report = dedup_chunks(chunks)
+                stage.add(
+                    chunks_in=report["input"],
+                    chunks=report["output"],
+                    bytes_in=report["chars_before"],
+                    bytes_out=report["chars_after"],
+                )
+
+        embedder = load_embedder(model)
+        cache = EmbeddingCache(cache_dir, embedder.name) if cache_dir else None
+        scheduler = EmbeddingScheduler(embedder, cache)
+        build_index(chunks, embedder, index_dir, scheduler=scheduler)
+        tracer.record("embed").add(
+            cache_hits=scheduler.stats["cache_hits"],
+            embedded=scheduler.stats["embedded"],
+            embedder_calls=scheduler.stats["calls"],
+            tokens=scheduler.stats["tokens"],
+        )
+    return tracer
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python pipeline.py [data_dir] [--out DIR] [--report report.json|metrics.prom]
+    #                           [--profile parse,embed] [--tracemalloc] [--fetch]
+    #                           [--no-dedup] [--workers N] [--max-tokens N] [--cache DIR|none]
+    args = sys.argv[1:]
+    flags = {name: name in args for name in ("--tracemalloc", "--fetch", "--no-dedup")}
+    args = [a for a in args if a not in flags]
+    options = {
+        "--out": "clickpost_index",
+        "--report": "clickpost_pipeline_report.json",
+        "--profile": "",
+        "--workers": None,
+        "--max-tokens": None,
+        "--model": "hashing-512",
+        "--cache": DEFAULT_CACHE_DIR,
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+    data_dir = args[0] if args else DEFAULT_DATA_DIR
+
+    tracer = Tracer(
+        profile=[name for name in options["--profile"].split(",") if name],
+        trace_memory=flags["--tracemalloc"],
+        profile_dir=os.path.dirname(os.path.abspath(options["--report"])),
+    )
+    run_pipeline(
+        data_dir,
+        options["--out"],
+        fetch=flags["--fetch"],
+        dedup=not flags["--no-dedup"],
+        workers=int(options["--workers"]) if options["--workers"] else None,
+        max_tokens=int(options["--max-tokens"]) if options["--max-tokens"] else None,
+        model=options["--model"],
+        cache_dir=None if options["--cache"] == "none" else options["--cache"],
+        tracer=tracer,
+    )
+    tracer.write(options["--report"])
+
+    report = tracer.report()
+    print(f"Pipeline over {data_dir} in {report['total_wall_seconds']:.2f}s")
+    print(f"{'stage':<10}{'wall s':>10}{'cpu s':>10}{'calls':>8}{'peak RSS MB':>13}  counters")
+    for name, stage in report["stages"].items():
+        counters = ", ".join(f"{k}={v}" for k, v in stage["counters"].items())
+        print(
+            f"{name:<10}{stage['wall_seconds']:>10.3f}{stage['cpu_seconds']:>10.3f}"
+            f"{stage['calls']:>8}{stage['peak_rss_bytes'] / 2**20:>13.1f}  {counters}"
+        )
+    for path in tracer.dump_profiles():
+        print(f"🔬 Profile: {path} (python -m pstats {path})")
+    print(f"\n📄 Report saved to: {options['--report']}")
@@ -0,0 +1,227 @@
+import heapq
+import json
+import random
+import sys
+from collections import deque
+
+from benchmark import DEFAULT_GOLDEN_FILE
+from semantic_cache import load_query_log, normalize_question
+
+# Simulator for clickpost-rag-bot/src/query-scheduler.js. Replays bursty
+# Slack traffic through the same policy (bounded in-flight searches, a bounded
+# queue, coalescing of normalized-equal questions) and through the old
+# one-search-per-request behaviour, and compares RAG calls, latency and
+# rejections. It models a single isolate: the worker's limits are per
+# isolate, and waiters there poll every pollMs (100 ms) rather than being
+# woken, which this simulation leaves out.
+
+
+class QueryScheduler:
+    """
+    Event-driven mirror of the worker's QueryScheduler. `submit` returns
+    the status the worker would report; completions are driven by the
+    simulation clock instead of promises.
+    """
+
+    def __init__(self, max_in_flight=4, max_queued=32, coalesce=True):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.coalesce = coalesce
+        self.running = 0
+        self.queue = deque()
+        self.jobs = {}
+        self.stats = {"started": 0, "queued": 0, "coalesced": 0, "rejected": 0, "completed": 0}
+        self._ids = 0
+
+    def submit(self, question, arrival):
+        """Returns (status, job); job is None when rejected."""
+
+        if self.coalesce:
+            key = normalize_question(question)
+        else:
+            self._ids += 1
+            key = self._ids
+        job = self.jobs.get(key)
+        if job is not None:
+            job["arrivals"].append(arrival)
+            self.stats["coalesced"] += 1
+            return "coalesced", job
+
+        if self.running < self.max_in_flight:
+            self.running += 1
+            status = "started"
+        elif len(self.queue) < self.max_queued:
+            status = "queued"
+        else:
+            self.stats["rejected"] += 1
+            return "rejected", None
+
+        job = {"key": key, "arrivals": [arrival]}
+        self.jobs[key] = job
+        self.stats[status] += 1
+        if status == "queued":
+            self.queue.append(job)
+        return status, job
+
+    def complete(self, job):
+        """Finish `job`; returns the queued job that inherits its slot, if any."""
+
+        del self.jobs[job["key"]]
+        self.stats["completed"] += 1
+        if self.queue:
+            return self.queue.popleft()
+        self.running -= 1
+        return None
+
+
+def bursty_arrivals(questions, duration=600.0, bursts_per_minute=2.0, burst_size=(5, 30), burst_window=5.0, background_rate=0.1, seed=0):
+    """
+    (ts, question) pairs: a trickle of background questions plus bursts in
+    which a channel fires a few popular questions many times, with varied
+    case and punctuation, within `burst_window` seconds.
+    """
+
+    rng = random.Random(seed)
+    variants = (str.lower, str.upper, lambda q: q.rstrip("?") + "??", lambda q: "  " + q + " ")
+    arrivals = []
+
+    t = 0.0
+    while True:
+        t += rng.expovariate(background_rate)
+        if t >= duration:
+            break
+        arrivals.append((t, rng.choice(questions)))
+
+    t = 0.0
+    while True:
+        t += rng.expovariate(bursts_per_minute / 60.0)
+        if t >= duration:
+            break
+        hot = rng.sample(questions, min(3, len(questions)))
+        for _ in range(rng.randint(*burst_size)):
+            question = rng.choice(variants)(rng.choice(hot))
+            arrivals.append((t + rng.uniform(0, burst_window), question))
+
+    arrivals.sort()
+    return arrivals
+
+
+def simulate(arrivals, max_in_flight=4, max_queued=32, coalesce=True, search_seconds=4.0, upstream_capacity=4, seed=0):
+    """
+    Run arrivals through a scheduler. A search takes about `search_seconds`
+    (exponentially distributed), stretched in proportion to how far the
+    number of concurrent searches exceeds `upstream_capacity`, as a shared
+    model backend would be.
+    """
+
+    rng = random.Random(seed)
+    scheduler = QueryScheduler(max_in_flight, max_queued, coalesce)
+    completions = []
+    latencies = []
+    peak = 0
+    order = 0
+
+    def start(job, now):
+        nonlocal peak, order
+        peak = max(peak, scheduler.running)
+        slowdown = max(1.0, scheduler.running / upstream_capacity)
+        order += 1
+        heapq.heappush(completions, (now + rng.expovariate(1 / search_seconds) * slowdown, order, job))
+
+    def finish_until(now):
+        while completions and completions[0][0] <= now:
+            done_at, _, job = heapq.heappop(completions)
+            latencies.extend(done_at - arrival for arrival in job["arrivals"])
+            following = scheduler.complete(job)
+            if following is not None:
+                start(following, done_at)
+
+    for ts, question in arrivals:
+        finish_until(ts)
+        status, job = scheduler.submit(question, ts)
+        if status == "started":
+            start(job, ts)
+    finish_until(float("inf"))
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2) if latencies else 0.0
+
+    stats = scheduler.stats
+    return {
+        "requests": len(arrivals),
+        "rag_calls": stats["started"] + stats["queued"],
+        "coalesced": stats["coalesced"],
+        "queued": stats["queued"],
+        "rejected": stats["rejected"],
+        "answers_posted": len(latencies),
+        "peak_in_flight": peak,
+        "p50_seconds": percentile(0.5),
+        "p95_seconds": percentile(0.95),
+        "max_seconds": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def compare(arrivals, max_in_flight=4, max_queued=32, **options):
+    """The old per-request behaviour vs the scheduler, on the same arrivals."""
+
+    return {
+        "unscheduled": simulate(arrivals, float("inf"), 0, coalesce=False, **options),
+        "scheduled": simulate(arrivals, max_in_flight, max_queued, coalesce=True, **options),
+    }
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python query_scheduler.py [query_log.(txt|jsonl)]
+    #        [--max-in-flight 4] [--max-queued 32] [--search-seconds 4] [--upstream-capacity 4]
+    #        [--duration 600] [--bursts-per-minute 2] [--seed 0]
+    args = sys.argv[1:]
+    options = {
+        "--max-in-flight": "4",
+        "--max-queued": "32",
+        "--search-seconds": "4",
+        "--upstream-capacity": "4",
+        "--duration": "600",
+        "--bursts-per-minute": "2",
+        "--seed": "0",
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+
+    seed = int(options["--seed"])
+    if args:
+        arrivals = load_query_log(args[0])
+        source = args[0]
+    else:
+        with open(DEFAULT_GOLDEN_FILE, "r", encoding="utf-8") as f:
+            questions = [item["question"] for item in json.load(f)]
+        arrivals = bursty_arrivals(
+            questions,
+            duration=float(options["--duration"]),
+            bursts_per_minute=float(options["--bursts-per-minute"]),
+            seed=seed,
+        )
+        source = "synthetic bursty load"
+
+    results = compare(
+        arrivals,
+        max_in_flight=int(options["--max-in-flight"]),
+        max_queued=int(options["--max-queued"]),
+        search_seconds=float(options["--search-seconds"]),
+        upstream_capacity=int(options["--upstream-capacity"]),
+        seed=seed,
+    )
+
+    print(f"Replayed {len(arrivals)} Slack questions ({source})")
+    fields = ("rag_calls", "coalesced", "queued", "rejected", "answers_posted", "peak_in_flight", "p50_seconds", "p95_seconds", "max_seconds")
+    print(f"\n{'':<16}{'unscheduled':>14}{'scheduled':>12}")
+    for field in fields:
+        print(f"{field:<16}{results['unscheduled'][field]:>14}{results['scheduled'][field]:>12}")
+
+    scheduled = results["scheduled"]
+    print(f"\n✅ Coalescing saved {scheduled['coalesced']} RAG calls; peak in-flight capped at {scheduled['peak_in_flight']}")
@@ -0,0 +1,260 @@
+import json
+import os
+import random
+import re
+import sys
+import time
+
+# Python reference for clickpost-rag-bot/src/sanitize.js. The patterns are
+# kept character-for-character in step with the worker; both must pass the
+# shared golden cases in GOLDEN_FILE.
+
+GOLDEN_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "clickpost-rag-bot",
+    "test",
+    "fixtures",
+    "sanitize-golden.json",
+)
+
+IDENT = r"(?<![A-Za-z0-9_])[A-Za-z_][A-Za-z0-9_]*(?![A-Za-z0-9_])"
+ARGS = r"\s*\([^)]{0,256}\)"
+WORD_START = r"(?<![A-Za-z0-9_])"
+# Rest of the sentence. A period followed by a word character (file.md,
+# Enum.VALUE) does not end it.
+REST = r"(?:[^.]|\.(?=[A-Za-z0-9_]))*\.?\s*"
+
+DOCUMENT_PATTERNS = [
+    rf"{WORD_START}(?:according to|based on) (?:the )?(?:document|[^\"\n]{{0,200}}?\.md){REST}",
+    rf"{WORD_START}the document \"[^\"\n]{{0,200}}\" (?:states|indicates|shows|mentions|contains|provides){REST}",
+    rf"{WORD_START}in (?:the )?document \"[^\"\n]{{0,200}}\"{REST}",
+]
+
+CODE_PATTERNS = [
+    rf"{WORD_START}is (?:constructed|built|created) using{REST}",
+    rf"{WORD_START}(?:using|via|through|by calling|by using)\s+{IDENT}{ARGS}{REST}",
+    rf"`{IDENT}(?:{ARGS}|\.{IDENT})`",
+    rf"{IDENT}(?:\.{IDENT})*{ARGS}",
+    rf"{IDENT}(?:\.{IDENT})+",
+]
+
+
+def _compile(patterns):
+    return re.compile(f"({'|'.join(patterns)})|(\\s{{2,}})", re.IGNORECASE)
+
+
+DOCUMENT_RE = _compile(DOCUMENT_PATTERNS)
+DOCUMENT_AND_CODE_RE = _compile(DOCUMENT_PATTERNS + CODE_PATTERNS)
+
+SLACK_RE = re.compile(r"^#{1,3}\s+(.+)$|\*\*(.+?)\*\*|\n{3,}", re.MULTILINE)
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+
+def sanitize_answer(text, strip_code=False):
+    """
+    Drop document references (and code references with `strip_code`) and
+    collapse whitespace in one scan. Equivalent to removing every matched
+    span and then replacing runs of 2+ whitespace characters with a space.
+
+    Only removals and 2+ whitespace runs are matches, so ordinary prose is
+    copied in large slices. Whitespace on both sides of a removal is held
+    in `whitespace` until the next kept text, where it merges into one run.
+    """
+
+    if not text:
+        return text
+
+    pattern = DOCUMENT_AND_CODE_RE if strip_code else DOCUMENT_RE
+    out = []
+    whitespace = ""
+
+    def keep(segment):
+        nonlocal whitespace
+        body = segment.lstrip()
+        whitespace += segment[: len(segment) - len(body)]
+        if not body:
+            return
+        out.append(" " if len(whitespace) >= 2 else whitespace)
+        kept = body.rstrip()
+        out.append(kept)
+        whitespace = body[len(kept) :]
+
+    last = 0
+    for match in pattern.finditer(text):
+        keep(text[last : match.start()])
+        if match.group(2) is not None:
+            whitespace += match.group(2)
+        last = match.end()
+    keep(text[last:])
+    return "".join(out).strip()
+
+
+def format_for_slack(text):
+    """Markdown headers and **bold** to Slack mrkdwn, 3+ newlines to 2."""
+
+    if not text:
+        return text
+
+    def replace(match):
+        header, bold = match.group(1), match.group(2)
+        if header is not None:
+            return "*" + BOLD_RE.sub(r"\1", header) + "*"
+        if bold is not None:
+            return f"*{bold}*"
+        return "\n\n"
+
+    return SLACK_RE.sub(replace, text)
+
+
+def apply(case):
+    """Run one golden case: {"fn": "sanitize"|"slack", "input", "options"}."""
+
+    if case["fn"] == "slack":
+        return format_for_slack(case["input"])
+    return sanitize_answer(case["input"], case.get("options", {}).get("stripCode", False))
+
+
+# The sequential passes index.js used before sanitize.js, with their flags,
+# kept as the benchmark baseline
+LEGACY_DOCUMENT_PASSES = [
+    (r"According to (the )?document[^.]*\.?\s*", re.I),
+    (r"Based on (the )?document[^.]*\.?\s*", re.I),
+    (r"According to (the )?[^\"]*\.md[^.]*\.?\s*", re.I),
+    (r"Based on (the )?[^\"]*\.md[^.]*\.?\s*", re.I),
+    (r"The document \"[^\"]*\" (states|indicates|shows|mentions|contains|provides)[^.]*\.?\s*", re.I),
+    (r"In (the )?document \"[^\"]*\"[^.]*\.?\s*", re.I),
+]
+LEGACY_CODE_PASSES = [
+    (r"[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)", 0),
+    (r"[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)", 0),
+    (r"[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*", 0),
+    (r"is constructed using[^.]*\.?\s*", re.I),
+    (r"is built using[^.]*\.?\s*", re.I),
+    (r"is created using[^.]*\.?\s*", re.I),
+    (r"using [a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)[^.]*\.?\s*", re.I),
+    (r"via [a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)[^.]*\.?\s*", re.I),
+    (r"`[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)`", 0),
+    (r"`[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*`", 0),
+    (r"\b(using|via|through|by calling|by using)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)[^.]*\.?\s*", re.I),
+]
+LEGACY_CLEANUP = [(r"\s{2,}", 0, " "), (r"\n\s*\n\s*\n", 0, "\n\n")]
+
+
+def legacy_sanitize(text, strip_code=False):
+    groups = [LEGACY_DOCUMENT_PASSES]
+    if strip_code:
+        groups.append(LEGACY_CODE_PASSES)
+    for passes in groups:
+        for pattern, flags in passes:
+            text = re.sub(pattern, "", text, flags=flags)
+        for pattern, flags, replacement in LEGACY_CLEANUP:
+            text = re.sub(pattern, replacement, text, flags=flags)
+        text = text.strip()
+    return text
+
+
+def long_answer(size, seed=0):
+    """
+    A synthetic answer of about `size` characters: prose with document and
+    code references, markdown, and large indented JSON examples.
+    """
+
+    rng = random.Random(seed)
+    sentences = [
+        "According to the document clickpost-tracking-v2.md, the AWB must be registered first. ",
+        "Use the `fetch_courier_partner_service_url(cp_id)` helper for courier URLs. ",
+        "The status code 301 means the shipment is out for delivery. ",
+        "The value is built using CourierPartnerServiceTypeEnum.AUTHORIZATION internally. ",
+        "### Request Body\n",
+        "**Required** fields are pickup_info, drop_info and shipment_details.\n\n",
+        "Send the request via create_order(payload) to the v3 endpoint. ",
+    ]
+    payload = {
+        "pickup_info": {"name": "Warehouse North", "address": "x" * 200},
+        "items": [{"sku": f"SKU-{i}", "description": "fragile box"} for i in range(40)],
+    }
+    parts, length = [], 0
+    while length < size:
+        if rng.random() < 0.1:
+            part = "```json\n" + json.dumps(payload, indent=2) + "\n```\n"
+        else:
+            part = rng.choice(sentences)
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def adversarial_answer(size):
+    """
+    Identifiers followed by "(" that never closes, as in a truncated JSON
+    example. Each one sends the legacy `[^)]*` pattern to the end of the text.
+    """
+
+    unit = "see shipment_details (and "
+    return unit * (size // len(unit) + 1)
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000), strip_code=True, repeat=3):
+    """
+    Throughput (MB/s) and worst latency of the single pass vs the legacy
+    cascade, on typical long answers and on adversarial ones. The legacy
+    cascade is quadratic on the latter, so it only runs up to 100k chars.
+    """
+
+    results = []
+    for kind, make in (("typical", long_answer), ("adversarial", adversarial_answer)):
+        for size in sizes:
+            text = make(size)
+            row = {"kind": kind, "chars": len(text)}
+            for name, fn in (("single_pass", sanitize_answer), ("legacy", legacy_sanitize)):
+                if name == "legacy" and kind == "adversarial" and size > 100_000:
+                    row[name] = None
+                    continue
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    fn(text, strip_code)
+                    timings.append(time.perf_counter() - start)
+                row[name] = {
+                    "max_ms": round(max(timings) * 1000, 2),
+                    "mb_per_s": round(len(text) / min(timings) / 1e6, 2),
+                }
+            results.append(row)
+    return results
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage:
+    #   python sanitize.py check            run the shared golden cases
+    #   python sanitize.py bench [chars..]  throughput vs the legacy cascade
+    #   python sanitize.py < answer.txt     sanitize stdin (code stripping on)
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command == "check":
+        with open(GOLDEN_FILE, "r", encoding="utf-8") as f:
+            cases = json.load(f)
+        failures = 0
+        for case in cases:
+            actual = apply(case)
+            if actual != case["expected"]:
+                failures += 1
+                print(f"❌ {case['name']}\n   expected: {case['expected']!r}\n   actual:   {actual!r}")
+        print(f"\n{'✅' if not failures else '❌'} {len(cases) - failures}/{len(cases)} golden cases pass")
+        sys.exit(1 if failures else 0)
+
+    elif command == "bench":
+        sizes = [int(a) for a in args[1:]] or [10_000, 100_000, 1_000_000]
+        print(f"{'answer':<12}{'chars':>10}{'single MB/s':>14}{'max ms':>10}{'legacy MB/s':>14}{'max ms':>10}")
+        for row in benchmark(sizes):
+            single, legacy = row["single_pass"], row["legacy"]
+            legacy_cells = f"{legacy['mb_per_s']:>14}{legacy['max_ms']:>10}" if legacy else f"{'skipped':>14}{'':>10}"
+            print(
+                f"{row['kind']:<12}{row['chars']:>10}{single['mb_per_s']:>14}{single['max_ms']:>10}"
+                + legacy_cells
+            )
+
+    else:
+        print(sanitize_answer(sys.stdin.read(), strip_code=True))
@@ -0,0 +1,159 @@
+class SchemaResolver:
+    """
+    Expands $ref, allOf, oneOf/anyOf and nested objects in an OpenAPI spec
+    into flat (dotted.path, type, required, description) fields.
+
+    Each referenced component is flattened once per spec and reused, so
+    specs with heavily shared schemas render in linear time. Expansions cut
+    short by a cycle or the depth limit are recomputed where they occur.
+    """
+
+    def __init__(self, spec, max_depth=10):
+        self.spec = spec
+        self.max_depth = max_depth
+        self._refs = {}
+        self._fields = {}
+
+    def lookup(self, ref):
+        """Resolve a local JSON pointer such as '#/components/schemas/Order'."""
+
+        if ref in self._refs:
+            return self._refs[ref]
+
+        target = {}
+        if ref.startswith("#/"):
+            target = self.spec
+            for part in ref[2:].split("/"):
+                part = part.replace("~1", "/").replace("~0", "~")
+                if not isinstance(target, dict) or part not in target:
+                    target = {}
+                    break
+                target = target[part]
+
+        self._refs[ref] = target
+        return target
+
+    def deref(self, obj):
+        """Follow a chain of $ref objects (parameters, responses, schemas)."""
+
+        seen = set()
+        while isinstance(obj, dict) and "$ref" in obj and obj["$ref"] not in seen:
+            seen.add(obj["$ref"])
+            obj = self.lookup(obj["$ref"])
+        return obj if isinstance(obj, dict) else {}
+
+    def type_label(self, schema, default="object"):
+        """Type shown for a field: its declared type, else `default`."""
+
+        schema = self.deref(schema)
+        field_type = schema.get("type")
+        if field_type is None:
+            for part in schema.get("allOf", []):
+                field_type = self.deref(part).get("type")
+                if field_type:
+                    break
+        if isinstance(field_type, list):
+            field_type = "|".join(field_type)
+        return field_type or default
+
+    def description(self, schema):
+        if schema.get("description"):
+            return schema["description"]
+        return self.deref(schema).get("description", "")
+
+    def fields(self, schema):
+        """Return the flattened fields of a schema."""
+
+        return self._flatten(schema, (), 0)[0]
+
+    def _flatten(self, schema, stack, depth):
+        """
+        Returns (fields, height). `height` is how many levels below `depth`
+        the expansion reached, or None when a cycle or the depth limit cut
+        it short. Only uncut results are cached: a cut depends on the path
+        taken to reach the schema, so reusing one elsewhere would drop
+        fields a fresh expansion keeps.
+        """
+
+        if not isinstance(schema, dict):
+            return [], 0
+        if depth > self.max_depth:
+            return [], None
+
+        ref = schema.get("$ref")
+        if ref:
+            cached = self._fields.get(ref)
+            # Reusable wherever the whole expansion still fits the depth limit
+            if cached is not None and depth + cached[1] <= self.max_depth:
+                return cached
+            # A component that contains itself: the parent field is already
+            # listed, so stop here instead of recursing forever
+            if ref in stack:
+                return [], None
+            result = self._flatten(self.lookup(ref), stack + (ref,), depth)
+            if result[1] is not None:
+                self._fields[ref] = result
+            return result
+
+        properties, required, height = self._properties(schema, stack, depth)
+
+        out = []
+        for name, prop in properties.items():
+            out.append(
+                (name, self.type_label(prop), name in required, self.description(prop))
+            )
+
+            child = prop
+            prefix = f"{name}."
+            if self.type_label(prop) == "array":
+                child = self.deref(prop).get("items", {})
+                prefix = f"{name}[]."
+
+            sub_fields, sub_height = self._flatten(child, stack, depth + 1)
+            for sub_name, sub_type, sub_required, sub_desc in sub_fields:
+                out.append((prefix + sub_name, sub_type, sub_required, sub_desc))
+            if height is not None:
+                height = None if sub_height is None else max(height, sub_height + 1)
+        return out, height
+
+    def _properties(self, schema, stack, depth):
+        """
+        Merge the properties and required lists of a (possibly composed)
+        object schema. oneOf/anyOf variants are unioned and never required,
+        since only one of them applies to a given payload. The third value
+        is 0, or None if a cyclic part was skipped.
+        """
+
+        properties = dict(schema.get("properties", {}))
+        required = set(schema.get("required", []))
+        height = 0
+
+        parts = [(part, True) for part in schema.get("allOf", [])]
+        for key in ("oneOf", "anyOf"):
+            parts += [(variant, False) for variant in schema.get(key, [])]
+
+        for part, merge_required in parts:
+            part, part_stack = self._enter(part, stack)
+            if part is None:
+                height = None
+                continue
+            part_props, part_required, part_height = self._properties(part, part_stack, depth)
+            for name, prop in part_props.items():
+                properties.setdefault(name, prop)
+            if merge_required:
+                required |= part_required
+            if part_height is None:
+                height = None
+
+        return properties, required, height
+
+    def _enter(self, schema, stack):
+        """Step into a composed sub-schema, returning (None, stack) on a cycle."""
+
+        while isinstance(schema, dict) and schema.get("$ref"):
+            ref = schema["$ref"]
+            if ref in stack:
+                return None, stack
+            stack = stack + (ref,)
+            schema = self.lookup(ref)
+        return (schema if isinstance(schema, dict) else None), stack
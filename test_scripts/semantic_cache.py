@@ -0,0 +1,248 @@
+import hashlib
+import json
+import re
+import sys
+from collections import OrderedDict
+
+from manifest import content_hash
+
+# Python reference for clickpost-rag-bot/src/semantic-cache.js. Keep the two
+# in step so hit rates measured here match the worker.
+
+PUNCTUATION_RE = re.compile(r"[^\w/\-\s]+")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# sentence-transformers name of the worker's EMBEDDING_MODEL
+# (@cf/baai/bge-small-en-v1.5), so simulated similarities match production
+WORKER_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+
+# Words that carry no entity: a semantic hit may differ in these freely
+STOPWORDS = frozenset(
+    (
+        "a an the is are was were be been am to of for in on at by with from into and or "
+        "how what which when where who whom why do does did can could should would will shall may "
+        "i me my we our us you your it its this that these those there here please tell about "
+        "any some all via using use used"
+    ).split()
+)
+
+
+def normalize_question(question):
+    """Lowercase, drop punctuation, collapse whitespace."""
+
+    if not question:
+        return ""
+    question = PUNCTUATION_RE.sub(" ", question.lower())
+    return WHITESPACE_RE.sub(" ", question).strip()
+
+
+def _content_terms(question):
+    return {term for term in normalize_question(question).split(" ") if term and term not in STOPWORDS}
+
+
+def _same_stem(a, b):
+    if a == b:
+        return True
+    if any(c.isdigit() for c in a + b):
+        return False
+    if a.startswith(b) or b.startswith(a):
+        return True
+    return len(a) >= 5 and len(b) >= 5 and a[:5] == b[:5]
+
+
+def same_entities(a, b):
+    """
+    True if every content word of each question has a stem match in the
+    other (see sameEntities in the worker). Keeps "... for shiprocket" and
+    "... for delhivery" apart however close their embeddings are.
+    """
+
+    terms_a, terms_b = _content_terms(a), _content_terms(b)
+
+    def covered(terms, others):
+        return all(any(_same_stem(term, other) for other in others) for term in terms)
+
+    return covered(terms_a, terms_b) and covered(terms_b, terms_a)
+
+
+def corpus_hash(chunks):
+    """
+    Order-independent hash of a chunk corpus. Deploy it as the worker's
+    CORPUS_HASH so a rebuilt index invalidates cached answers.
+    """
+
+    digest = hashlib.sha256()
+    for chunk_digest in sorted(content_hash(chunk) for chunk in chunks):
+        digest.update(chunk_digest.encode("ascii"))
+    return digest.hexdigest()
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = sum(x * x for x in a) ** 0.5
+    norm_b = sum(y * y for y in b) ** 0.5
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by normalized question, with a similarity fallback
+    over stored question vectors. TTL and LRU eviction as in the worker.
+    """
+
+    def __init__(self, max_entries=500, ttl=3600.0, threshold=0.92):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.corpus_hash = None
+        self.entries = OrderedDict()
+        self.evictions = 0
+
+    def set_corpus_hash(self, value):
+        if value != self.corpus_hash:
+            self.entries.clear()
+            self.corpus_hash = value
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _expired(self, entry, now):
+        return now - entry["stored_at"] > self.ttl
+
+    def get_exact(self, question, now):
+        key = normalize_question(question)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, now):
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry["answer"]
+
+    def get_similar(self, question, vector, now):
+        best_key, best_score = None, self.threshold
+        for key, entry in list(self.entries.items()):
+            if self._expired(entry, now):
+                del self.entries[key]
+                continue
+            if entry["vector"] is None or not same_entities(question, key):
+                continue
+            score = _cosine(vector, entry["vector"])
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        self.entries.move_to_end(best_key)
+        return self.entries[best_key]["answer"]
+
+    def set(self, question, vector, answer, now):
+        key = normalize_question(question)
+        if not key:
+            return
+        self.entries.pop(key, None)
+        self.entries[key] = {"vector": vector, "answer": answer, "stored_at": now}
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+def load_query_log(log_file):
+    """
+    Read a query log: JSON Lines with {"question", "ts"} (seconds), or
+    plain text with one question per line, spaced one second apart.
+    """
+
+    queries = []
+    with open(log_file, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                queries.append((float(record.get("ts", i)), record["question"]))
+            else:
+                queries.append((float(i), line))
+    return queries
+
+
+def simulate(queries, embedder, **cache_options):
+    """
+    Replay (ts, question) pairs through a cache and report how many would
+    have been answered exactly, semantically, or needed a RAG call.
+    """
+
+    cache = SemanticCache(**cache_options)
+    counts = {"exact": 0, "semantic": 0, "miss": 0}
+    embedding_calls = 0
+
+    for ts, question in queries:
+        if cache.get_exact(question, ts) is not None:
+            counts["exact"] += 1
+            continue
+
+        vector = [float(x) for x in embedder([normalize_question(question)])[0]]
+        embedding_calls += 1
+        if cache.get_similar(question, vector, ts) is not None:
+            counts["semantic"] += 1
+            continue
+
+        counts["miss"] += 1
+        cache.set(question, vector, f"answer:{normalize_question(question)}", ts)
+
+    total = len(queries)
+    hits = counts["exact"] + counts["semantic"]
+    return {
+        "queries": total,
+        **counts,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+        "rag_calls": counts["miss"],
+        "embedding_calls": embedding_calls,
+        "evictions": cache.evictions,
+        "entries": len(cache),
+    }
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python semantic_cache.py query_log.(txt|jsonl)
+    #        [--threshold 0.92] [--ttl 3600] [--max-entries 500] [--model BAAI/bge-small-en-v1.5]
+    #        python semantic_cache.py corpus-hash [data_dir]    print the worker's CORPUS_HASH
+    args = sys.argv[1:]
+    if args and args[0] == "corpus-hash":
+        from ingest import DEFAULT_DATA_DIR, ingest
+
+        # Printed bare so `npm run deploy` can pass it to wrangler --var
+        print(corpus_hash(ingest(args[1] if len(args) > 1 else DEFAULT_DATA_DIR)))
+        sys.exit(0)
+
+    from vector_index import load_embedder
+
+    options = {
+        "--threshold": "0.92",
+        "--ttl": "3600",
+        "--max-entries": "500",
+        "--model": WORKER_EMBEDDING_MODEL,
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+
+    queries = load_query_log(args[0])
+    report = simulate(
+        queries,
+        load_embedder(options["--model"]),
+        max_entries=int(options["--max-entries"]),
+        ttl=float(options["--ttl"]),
+        threshold=float(options["--threshold"]),
+    )
+
+    print(f"Replayed {report['queries']} queries from {args[0]}")
+    print(f"\n✅ Hit rate: {report['hit_rate']:.1%} ({report['exact']} exact, {report['semantic']} semantic)")
+    print(f"RAG calls: {report['rag_calls']}   Embedding calls: {report['embedding_calls']}")
+    print(f"Evictions: {report['evictions']}   Entries at end: {report['entries']}")
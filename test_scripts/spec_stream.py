@@ -0,0 +1,175 @@
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _IncrementalReader:
+    """
+    Minimal pull reader over a JSON text file.
+    Only the bytes needed for the current value are kept in memory.
+    """
+
+    def __init__(self, f, block_size):
+        self.f = f
+        self.block_size = block_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        # Drop everything already consumed before growing the buffer
+        if self.pos:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        data = self.f.read(size or self.block_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(
+                f"Expected '{char}' at offset {self.pos}, got '{self.buf[self.pos]}'"
+            )
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        read_size = self.block_size
+        while True:
+            try:
+                val, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A value touching the end of the buffer may be a truncated
+                # number or literal, so only accept it once more data is seen
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads geometrically so large values stay linear to decode
+            self._fill(read_size)
+            read_size *= 2
+
+
+# Top-level keys the chunker needs before the first endpoint
+HEADER_KEYS = ("info", "servers", "components")
+
+
+def _walk(openapi_file, block_size, spec, stream_paths):
+    """
+    One pass over the top level of a spec. Every key except `paths` is
+    decoded into `spec`. When `paths` is reached, `stream_paths(spec)`
+    decides whether its items are yielded as (path, methods) or decoded one
+    at a time and dropped. Returns True if they were dropped.
+    """
+
+    with open(openapi_file, "r", encoding="utf-8") as f:
+        reader = _IncrementalReader(f, block_size)
+        skipped = False
+
+        reader.expect("{")
+        if reader.peek() == "}":
+            return skipped
+
+        while True:
+            key = reader.value()
+            reader.expect(":")
+
+            if key == "paths" and reader.peek() == "{":
+                emit = stream_paths(spec)
+                skipped = not emit
+                reader.expect("{")
+                if reader.peek() != "}":
+                    while True:
+                        path = reader.value()
+                        reader.expect(":")
+                        methods = reader.value()
+                        if emit:
+                            yield path, methods
+                        if reader.peek() != ",":
+                            break
+                        reader.expect(",")
+                reader.expect("}")
+            else:
+                spec[key] = reader.value()
+
+            if reader.peek() != ",":
+                break
+            reader.expect(",")
+
+        reader.expect("}")
+        return skipped
+
+
+def _with_spec(spec, walk):
+    """Yield (spec, path, methods) from a _walk and return its result."""
+
+    while True:
+        try:
+            path, methods = next(walk)
+        except StopIteration as stop:
+            return stop.value
+        yield spec, path, methods
+
+
+def iter_openapi_paths(openapi_file, block_size=64 * 1024):
+    """
+    Stream an OpenAPI spec one path item at a time.
+
+    Yields (spec, path, methods) where `spec` holds the top-level keys
+    (info, servers, components, ...). Documents usually list those before
+    `paths`, and then one pass suffices. JSON does not guarantee key order,
+    though: if any of HEADER_KEYS is missing when `paths` is reached, the
+    first pass skips the paths and reads the rest of the header, and a
+    second pass yields them. Either way the header is complete by the first
+    yield and only one path item is held in memory at a time.
+    """
+
+    spec = {}
+
+    def header_complete(spec):
+        return all(key in spec for key in HEADER_KEYS)
+
+    skipped = yield from _with_spec(spec, _walk(openapi_file, block_size, spec, header_complete))
+    if skipped:
+        yield from _with_spec(spec, _walk(openapi_file, block_size, {}, lambda _: True))
+
+
+def write_chunks_jsonl(chunks, output_file):
+    """
+    Write chunks as JSON Lines, one chunk per line, as they are produced.
+    Returns the number of chunks written.
+    """
+
+    count = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def read_chunks_jsonl(input_file):
+    """Yield chunks back from a JSON Lines file."""
+
+    with open(input_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,53 @@
+import pytest
+
+from artifact import ChunkArtifact, write_artifact
+
+CHUNKS = [
+    {
+        "text": "API: Orders\nEndpoint: POST /v3/create-order/",
+        "metadata": {
+            "endpoint": "POST /v3/create-order/",
+            "method": "POST",
+            "path": "/v3/create-order/",
+            "api": "Orders",
+            "summary": "",
+            "part": 2,
+            "parts": 3,
+            "sections": ["request_example:MPS Forward"],
+        },
+    },
+    {
+        # Non-string values in column fields keep their type
+        "text": "Meta codes — ✅ unicode",
+        "metadata": {"source": "errors.md", "section": None, "api": 7, "path": ["/a", "/b"], "duplicates": [{"path": ""}]},
+    },
+    {"text": "", "metadata": {}},
+]
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = str(tmp_path / "chunks.cpchunks")
+    assert write_artifact(CHUNKS, path) == len(CHUNKS)
+    with ChunkArtifact(path) as artifact:
+        yield artifact
+
+
+def test_round_trip_is_exact(artifact):
+    assert list(artifact) == CHUNKS
+
+
+def test_empty_strings_and_types_survive(artifact):
+    assert artifact[0]["metadata"]["summary"] == ""
+    assert artifact[0]["metadata"]["part"] == 2
+    assert artifact[1]["metadata"]["section"] is None
+    assert artifact[1]["metadata"]["api"] == 7
+    assert artifact[1]["metadata"]["path"] == ["/a", "/b"]
+    assert "summary" not in artifact[1]["metadata"]
+
+
+def test_indexing(artifact):
+    assert len(artifact) == 3
+    assert artifact[-1] == CHUNKS[-1]
+    with pytest.raises(IndexError):
+        artifact[3]
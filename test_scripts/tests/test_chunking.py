@@ -0,0 +1,110 @@
+import glob
+import os
+
+import pytest
+
+from chunking import MIN_PIECE_TOKENS, estimate_tokens, split_sections
+from parser import iter_openapi_chunks
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+SPECS = sorted(glob.glob(os.path.join(DATA_DIR, "*.json")))
+
+HEADER = ["API: Test", "Endpoint: POST /orders", "Full URL: https://api.test/orders", ""]
+
+
+def _sections(header, body):
+    """header lines plus (name, context, lines) body sections."""
+
+    sections = [{"name": "header", "context": [], "lines": header}]
+    sections += [{"name": name, "context": context, "lines": lines} for name, context, lines in body]
+    return sections
+
+
+def _body(chunks, sections, prefix):
+    """
+    Undo the packing for overlap_tokens=0: drop the repeated header prefix
+    and the parent context a section repeats when it opens a sub-chunk.
+    """
+
+    contexts = {section["name"]: section["context"] for section in sections}
+    lines = []
+    for chunk in chunks:
+        part = chunk["text"].split("\n")
+        assert part[: len(prefix)] == prefix
+        part = part[len(prefix) :]
+        context = contexts[chunk["metadata"]["sections"][0]]
+        if context and part[: len(context)] == context:
+            part = part[len(context) :]
+        lines += part
+    return "\n".join(lines)
+
+
+def test_small_endpoint_is_one_unchanged_chunk():
+    sections = _sections(HEADER, [("parameters", [], ["Parameters:", "  - id"])])
+
+    [chunk] = split_sections(sections, {"endpoint": "POST /orders"}, max_tokens=512)
+
+    assert chunk["text"] == "\n".join(HEADER + ["Parameters:", "  - id"])
+    assert "part" not in chunk["metadata"]
+
+
+def test_parts_fit_and_join_back():
+    body = [
+        ("parameters", [], [f"  - param_{i} (query, optional, string): value {i}" for i in range(40)]),
+        ("responses", ["Responses:"], ["  Status 200: OK"] + [f"    field_{i}: {i}" for i in range(60)]),
+    ]
+    sections = _sections(HEADER, body)
+
+    chunks = split_sections(sections, {}, max_tokens=64)
+
+    assert len(chunks) > 2
+    assert all(estimate_tokens(chunk["text"]) <= 64 for chunk in chunks)
+    assert _body(chunks, sections, HEADER) == "\n".join(
+        line for section in sections[1:] for line in section["lines"]
+    )
+
+
+def test_long_lines_are_cut_into_whole_pieces():
+    line = "".join(f"{i:04d}" for i in range(600))
+    sections = _sections(HEADER, [("request_example", ["Request Body:"], [line])])
+
+    chunks = split_sections(sections, {}, max_tokens=96)
+
+    assert all(estimate_tokens(chunk["text"]) <= 96 for chunk in chunks)
+    pieces = _body(chunks, sections, HEADER).split("\n")
+    assert "".join(pieces) == line
+    # No shredding: every piece but the last fills most of a sub-chunk
+    assert min(estimate_tokens(piece) for piece in pieces[:-1]) >= MIN_PIECE_TOKENS
+
+
+def test_long_header_is_packed_as_a_section():
+    header = HEADER + ["Summary: Create", "Description: " + "words " * 400, ""]
+    body = [("parameters", [], [f"  - param_{i}" for i in range(20)])]
+    sections = _sections(header, body)
+
+    chunks = split_sections(sections, {}, max_tokens=128)
+
+    assert all(estimate_tokens(chunk["text"]) <= 128 for chunk in chunks)
+    assert all(chunk["text"].startswith("\n".join(HEADER[:3])) for chunk in chunks)
+    assert chunks[0]["metadata"]["sections"] == ["header"]
+    joined = _body(chunks, sections, HEADER[:3])
+    original = "\n".join(header[3:] + body[0][2])
+    assert joined.replace("\n", "") == original.replace("\n", "")
+
+
+@pytest.mark.parametrize("max_tokens,overlap", [(128, 0), (128, 32), (256, 64), (512, 0)])
+def test_real_specs_respect_the_budget(max_tokens, overlap):
+    assert SPECS
+    for spec in SPECS:
+        for chunk in iter_openapi_chunks(spec, max_tokens, overlap):
+            assert estimate_tokens(chunk["text"]) <= max_tokens, chunk["metadata"]
+
+
+def test_overlap_does_not_shred_large_endpoints():
+    spec = os.path.join(DATA_DIR, "clickpost_openapi_doc.json")
+    without = [c for c in iter_openapi_chunks(spec, 128, 0) if c["metadata"]["endpoint"] == "POST /v3/create-order/"]
+    overlapped = [c for c in iter_openapi_chunks(spec, 128, 32) if c["metadata"]["endpoint"] == "POST /v3/create-order/"]
+
+    assert without
+    # Overlap repeats a few lines per part; it must not multiply the part count
+    assert len(overlapped) <= 3 * len(without)
@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+from dedup import dedup_chunks, intern_payloads
+from facets import FacetIndex
+from hybrid import IdentifierIndex
+from example_render import decode_payload, render_compact
+from ingest import DEFAULT_DATA_DIR, chunk_file, ingest
+
+OPENAPI_DOC = os.path.join(DEFAULT_DATA_DIR, "clickpost_openapi_doc.json")
+# The "SPS Response" example that GET /v3/create-order/ and GET /v4/create-order/ share
+CREATE_ORDER_REF = "example:9fc148ce4bc9"
+
+
+@pytest.mark.parametrize("style", ["compact", "json"])
+def test_shared_spec_payload_is_interned(style):
+    chunks = chunk_file(OPENAPI_DOC, example_style=style, with_payloads=True)
+
+    interned, references = intern_payloads(chunks)
+
+    by_endpoint = {c["metadata"]["endpoint"]: c for c in interned}
+    for endpoint in ("GET /v3/create-order/", "GET /v4/create-order/"):
+        assert f"[{CREATE_ORDER_REF}]" in by_endpoint[endpoint]["text"]
+        assert CREATE_ORDER_REF in by_endpoint[endpoint]["metadata"]["examples"]
+
+    reference = next(r for r in references if r["metadata"]["example"] == CREATE_ORDER_REF)
+    with open(OPENAPI_DOC, encoding="utf-8") as f:
+        spec = json.load(f)
+    examples = spec["paths"]["/v3/create-order/"]["get"]["responses"]["200"]["content"]
+    value = decode_payload(examples["application/json"]["examples"]["SPS Response"]["value"])
+    assert render_compact(value) in reference["text"]
+    assert all("payloads" not in c for c in interned)
+
+
+@pytest.mark.parametrize("style", ["compact", "json"])
+def test_corpus_interns_payloads_across_sources(style):
+    chunks, report = dedup_chunks(
+        ingest(DEFAULT_DATA_DIR, workers=1, example_style=style, with_payloads=True)
+    )
+
+    assert report["interned_payloads"] > 0
+    assert report["chars_after"] < report["chars_before"]
+    assert all("payloads" not in c for c in chunks)
+
+
+def test_exact_and_near_duplicates_collapse():
+    body = "Endpoint: POST /v1/cancel-order/\n" + " ".join(f"field{i} is described here" for i in range(40))
+    cancel = {"method": "POST", "path": "/v1/cancel-order/", "endpoint": "POST /v1/cancel-order/"}
+    chunks = [
+        {"text": "API: One\n" + body, "metadata": dict(cancel, source="a.json")},
+        {"text": "API: Two\n" + body, "metadata": dict(cancel, source="b.json")},
+        {"text": "API: One\n" + body + " extra", "metadata": dict(cancel, source="c.md", path="/api/v1/cancel-order/")},
+        {"text": "Something else entirely", "metadata": {"source": "d.json"}},
+    ]
+
+    result, report = dedup_chunks(chunks)
+
+    assert report["exact_duplicates"] == 1
+    assert report["near_duplicates"] == 1
+    assert [c["metadata"]["source"] for c in result] == ["c.md", "d.json"]
+    assert {d["source"] for d in result[0]["metadata"]["duplicates"]} == {"a.json", "b.json"}
+
+
+def test_near_duplicates_need_the_same_endpoint_and_part_from_another_source():
+    body = " ".join(f"field{i} is described here" for i in range(40))
+    chunks = [
+        # Two endpoints of one spec that differ only in path and summary
+        {"text": "Summary: India\n" + body, "metadata": {"source": "a.json", "method": "GET", "path": "/v3/x/"}},
+        {"text": "Summary: World\n" + body, "metadata": {"source": "a.json", "method": "GET", "path": "/v4/x/"}},
+        # The same endpoint elsewhere, but a different part of it
+        {"text": "Part two\n" + body, "metadata": {"source": "b.json", "method": "GET", "path": "/v3/x/", "part": 2}},
+    ]
+
+    result, report = dedup_chunks(chunks)
+
+    assert report["near_duplicates"] == 0
+    assert len(result) == 3
+
+
+@pytest.mark.parametrize("max_tokens", [None, 128])
+def test_every_endpoint_and_part_survives_corpus_dedup(max_tokens):
+    chunks = list(ingest(DEFAULT_DATA_DIR, workers=1, max_tokens=max_tokens, with_payloads=True))
+
+    def parts(chunks):
+        return {
+            (c["metadata"].get("endpoint"), c["metadata"].get("part"))
+            for c in chunks
+            if c["metadata"].get("endpoint")
+        }
+
+    before = parts(chunks)
+    result, _ = dedup_chunks(chunks)
+
+    assert parts(result) == before
+    assert any("Fetch Order Details: India" in c["text"] for c in result)
+
+
+def test_absorbed_duplicates_stay_findable_by_path_and_facets():
+    body = " ".join(f"field{i} is described here" for i in range(40))
+    chunks = [
+        {
+            "text": body,
+            "metadata": {"source": "a.json", "section": "X", "method": "GET", "path": "/v3/x/", "version": "v3"},
+        },
+        # The longer copy survives, and names no path of its own
+        {"text": body + " and more", "metadata": {"source": "b.md", "section": "X", "geo": "india"}},
+    ]
+
+    result, report = dedup_chunks(chunks)
+
+    assert report["near_duplicates"] == 1
+    (survivor,) = result
+    assert survivor["metadata"]["source"] == "b.md"
+    assert survivor["metadata"]["duplicates"][0]["path"] == "/v3/x/"
+    facets = FacetIndex(result)
+    assert facets.rows({"version": "v3"}) == [0]
+    assert facets.rows({"version": "v2"}) == []
+    assert IdentifierIndex(result).lookup("what does /v3/x/ return?") == [0]
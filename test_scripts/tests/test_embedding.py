@@ -0,0 +1,79 @@
+import numpy as np
+
+from embedding import EmbeddingCache, EmbeddingScheduler
+from manifest import content_hash
+from vector_index import HashingEmbedder
+
+CHUNKS = [{"text": f"chunk {i}: cancel order {i} for courier {i % 5}"} for i in range(40)]
+
+
+class RecordingEmbedder(HashingEmbedder):
+    """HashingEmbedder that records the size of every batch it is called with."""
+
+    def __init__(self, fail_over=None):
+        super().__init__(64)
+        self.batches = []
+        self.fail_over = fail_over
+
+    def __call__(self, texts):
+        if self.fail_over is not None and len(texts) > self.fail_over:
+            raise RuntimeError("batch too large")
+        self.batches.append(len(texts))
+        return super().__call__(texts)
+
+
+def _warm(cache, embedder, chunks):
+    for chunk in chunks:
+        cache.put(content_hash(chunk["text"].encode("utf-8")), embedder([chunk["text"]])[0])
+
+
+def test_results_keep_input_order_and_hits_skip_the_embedder(tmp_path):
+    embedder = RecordingEmbedder()
+    cache = EmbeddingCache(str(tmp_path), embedder.name)
+    _warm(cache, HashingEmbedder(64), CHUNKS[::2])
+    scheduler = EmbeddingScheduler(embedder, cache, max_batch_size=4)
+
+    results = list(scheduler.embed(CHUNKS))
+
+    assert [chunk for chunk, _ in results] == CHUNKS
+    expected = HashingEmbedder(64)([chunk["text"] for chunk in CHUNKS])
+    np.testing.assert_allclose(np.stack([vector for _, vector in results]), expected, rtol=1e-6)
+    assert scheduler.stats["cache_hits"] == 20
+    assert sum(embedder.batches) == scheduler.stats["embedded"] == 20
+    assert max(embedder.batches) <= 4
+
+
+def test_miss_at_the_head_does_not_hold_back_the_hits(tmp_path):
+    embedder = RecordingEmbedder()
+    cache = EmbeddingCache(str(tmp_path), embedder.name)
+    _warm(cache, HashingEmbedder(64), CHUNKS[1:])
+    scheduler = EmbeddingScheduler(embedder, cache, max_pending=8)
+
+    pulled = 0
+
+    def stream():
+        nonlocal pulled
+        for chunk in CHUNKS:
+            pulled += 1
+            yield chunk
+
+    results = scheduler.embed(stream())
+    first, _ = next(results)
+
+    assert first is CHUNKS[0]
+    # The lone miss went out as soon as a hit queued behind it
+    assert embedder.batches == [1]
+    assert pulled <= 9
+    assert len(list(results)) == len(CHUNKS) - 1
+
+
+def test_failing_batches_are_split_and_retried():
+    embedder = RecordingEmbedder(fail_over=3)
+    scheduler = EmbeddingScheduler(embedder, max_batch_size=16)
+
+    results = list(scheduler.embed(CHUNKS))
+
+    assert [chunk for chunk, _ in results] == CHUNKS
+    assert max(embedder.batches) <= 3
+    assert scheduler.stats["failed_calls"] > 0
+    assert scheduler.stats["embedded"] == len(CHUNKS)
@@ -0,0 +1,146 @@
+import json
+import os
+
+import pytest
+
+from example_render import decode_payload, field_names, render_compact, render_examples, savings_report
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+SPEC = os.path.join(DATA_DIR, "clickpost_openapi_doc.json")
+
+
+def _string_payloads(value):
+    """Every string in a spec that looks like an embedded JSON document."""
+
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _string_payloads(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _string_payloads(item)
+    elif isinstance(value, str) and value.strip()[:1] in ("{", "["):
+        yield value
+
+
+def _malformed_payloads():
+    with open(SPEC, encoding="utf-8") as f:
+        spec = json.load(f)
+    malformed = []
+    for text in _string_payloads(spec):
+        try:
+            json.loads(text)
+        except ValueError:
+            malformed.append(text)
+    return malformed
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("plain text", "plain text"),
+        ("true", '"true"'),
+        ("No", '"No"'),
+        ("null", '"null"'),
+        ("~", '"~"'),
+        ("316", '"316"'),
+        ("-1.5e3", '"-1.5e3"'),
+        ("- dash", '"- dash"'),
+        ("key: value", '"key: value"'),
+        ("trailing ", '"trailing "'),
+        ("line one\n", '"line one\\n"'),
+        ("", '""'),
+        (316, "316"),
+        (True, "true"),
+        (None, "null"),
+    ],
+)
+def test_scalars_are_quoted_when_they_would_read_differently(value, expected):
+    assert render_compact({"k": value}) == f"k: {expected}"
+
+
+def test_trailing_newline_stays_inside_the_value():
+    assert render_compact({"a": "line one\n", "b": 1}) == 'a: "line one\\n"\nb: 1'
+    assert render_compact({"a\n": 1}) == '"a\\n": 1'
+
+
+def test_elided_list_items_keep_their_field_names():
+    payload = {"items": [{"sku": "A1", "qty": 1}, {"sku": "B2", "qty": 2, "hsn": "6109"}] * 3}
+
+    text = render_compact(payload)
+
+    assert "# 6 items, first shown" in text
+    assert field_names(payload) <= set(text.replace(":", " ").split())
+
+
+def test_spec_examples_keep_every_field_name():
+    report = savings_report([SPEC])
+
+    assert report["chunks"] > 0
+    assert [row["endpoint"] for row in report["rows"] if row["missing_fields"]] == []
+
+
+def test_similar_scenarios_are_printed_as_a_diff():
+    base = {"order": {"id": "ORD1", "weight": 500, "fragile": False}, "courier": "bluedart", "notes": "ring bell"}
+    changed = {"order": {"id": "ORD1", "weight": 750, "fragile": False}, "courier": "bluedart"}
+
+    blocks = render_examples([("Domestic", base), ("Heavy", changed), ("Empty", {})])
+
+    assert [(name, label) for name, label, _, _ in blocks] == [
+        ("Domestic", "Scenario: Domestic"),
+        ("Heavy", "Scenario: Heavy (changes from Domestic)"),
+    ]
+    _, _, text, payload = blocks[1]
+    assert text == "order:\n  weight: 750\n# without: notes"
+    # Only full renderings are interned
+    assert payload is None
+    assert blocks[0][3] == base
+
+
+def test_json_style_keeps_the_original_rendering():
+    payload = '{"a": 1,}'
+
+    ((_, label, text, decoded),) = render_examples([("A", payload)], style="json")
+
+    assert (label, text) == ("Scenario: A", json.dumps(payload, indent=2))
+    assert decoded == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": [1, 2,], "b": {"c": 1,},}', {"a": [1, 2], "b": {"c": 1}}),
+        ('{"a": 1,, "b": 2}', {"a": 1, "b": 2}),
+        ('{"id": 000, "n": -007, "f": 0.5, "s": "007, 000"}', {"id": 0, "n": -7, "f": 0.5, "s": "007, 000"}),
+        ('{\n  "a": "x"\n  "b": 2\n  "c": [1]\n  "d": "y, }"\n}', {"a": "x", "b": 2, "c": [1], "d": "y, }"}),
+        ("{'awb': '', 'ok': True}", {"awb": "", "ok": True}),
+        ("['a', 'b']", ["a", "b"]),
+    ],
+)
+def test_common_json_slips_are_repaired(text, expected):
+    assert decode_payload(text) == expected
+
+
+def test_unparseable_strings_are_left_alone():
+    assert decode_payload("{not json at all") == "{not json at all"
+    assert decode_payload("plain") == "plain"
+
+
+def test_malformed_spec_examples_decode():
+    malformed = _malformed_payloads()
+
+    assert len(malformed) >= 4
+    for text in malformed:
+        decoded = decode_payload(text)
+        assert isinstance(decoded, (dict, list)), text[:60]
+        # Rendered as a payload, not one escaped line
+        assert render_compact(text) == render_compact(decoded)
+        assert not render_compact(text).startswith('"')
+
+
+def test_return_poll_example_renders_compactly():
+    (text,) = [text for text in _malformed_payloads() if '"return_reference_number"' in text]
+
+    rendered = render_compact(text)
+
+    assert "return_phone_number: 9999999999" in rendered.replace('"', "")
+    assert len(rendered) < len(json.dumps(text)) * 0.7
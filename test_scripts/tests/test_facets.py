@@ -0,0 +1,47 @@
+import pytest
+
+from facets import FacetIndex, infer_filters
+
+CHUNKS = [
+    {"metadata": {"geo": "india", "type": "mps"}},
+    {"metadata": {"geo": "row", "type": "sps"}},
+    {"metadata": {}},
+    {"metadata": {"geo": "india", "type": "sps"}},
+] * 300
+
+
+def test_rows_match_a_per_row_filter(tmp_path):
+    index = FacetIndex(CHUNKS)
+
+    for filters in ({"geo": "india"}, {"geo": "row", "type": "sps"}, {"type": ["mps", "qc"]}):
+        expected = [
+            row
+            for row, chunk in enumerate(CHUNKS)
+            if all(
+                chunk["metadata"].get(facet) in ([values] if isinstance(values, str) else values)
+                or facet not in chunk["metadata"]
+                for facet, values in filters.items()
+            )
+        ]
+        assert index.rows(filters) == expected
+
+    assert index.rows({}) is None
+    assert index.counts()["geo"] == {"india": 600, "row": 300}
+
+    index.save(tmp_path / "facets.json")
+    loaded = FacetIndex.load(tmp_path / "facets.json")
+    assert loaded.rows({"geo": "row"}) == index.rows({"geo": "row"})
+
+
+@pytest.mark.parametrize(
+    "question, geo",
+    [
+        ("Create an order for RoW", "row"),
+        ("ROW shipping rates", "row"),
+        ("Rest of the world order creation", "row"),
+        ("Which row of the error table is 301?", None),
+        ("Create an MPS order in India", "india"),
+    ],
+)
+def test_geo_inference(question, geo):
+    assert infer_filters(question).get("geo") == geo
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fetcher import fetch_specs, load_state
+
+SPEC = {"openapi": "3.0.0", "info": {"title": "Stand-in"}, "paths": {}}
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Per-path scripted status codes, consumed one request at a time; once
+    # a script runs out the path serves SPEC (or 304 for a matching ETag)
+    scripts = {}
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        script = self.scripts.get(self.path)
+        status = script.pop(0) if script else 200
+
+        if status == 200 and self.headers.get("If-None-Match") == ETAG:
+            status = 304
+        if status == 200:
+            body = b"not json" if self.path == "/garbage" else json.dumps(SPEC).encode()
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.scripts = {}
+    _Handler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _fetch(base_url, tmp_path, path, **kwargs):
+    specs = {"spec": (base_url + path, "spec.json")}
+    kwargs.setdefault("backoff", 0)
+    [result] = fetch_specs(specs, str(tmp_path), state_file=str(tmp_path / "state.json"), **kwargs)
+    return result
+
+
+def test_retries_transient_503(server, tmp_path):
+    _Handler.scripts["/spec"] = [503, 503]
+
+    result = _fetch(server, tmp_path, "/spec")
+
+    assert result["status"] == "updated"
+    assert len(_Handler.requests_seen) == 3
+    with open(tmp_path / "spec.json", encoding="utf-8") as f:
+        assert json.load(f) == SPEC
+
+
+def test_gives_up_after_retries(server, tmp_path):
+    _Handler.scripts["/spec"] = [503] * 5
+
+    result = _fetch(server, tmp_path, "/spec", retries=2)
+
+    assert result["status"] == "failed"
+    assert "503" in result["error"]
+    assert len(_Handler.requests_seen) == 3
+    assert not os.path.exists(tmp_path / "spec.json")
+
+
+def test_etag_round_trip_gives_304(server, tmp_path):
+    assert _fetch(server, tmp_path, "/spec")["status"] == "updated"
+    assert load_state(str(tmp_path / "state.json"))["spec"]["etag"] == ETAG
+
+    result = _fetch(server, tmp_path, "/spec")
+
+    assert result["status"] == "unchanged"
+    assert _Handler.requests_seen[-1] == ("/spec", ETAG)
+
+
+def test_etag_not_sent_without_local_copy(server, tmp_path):
+    _fetch(server, tmp_path, "/spec")
+    os.remove(tmp_path / "spec.json")
+
+    assert _fetch(server, tmp_path, "/spec")["status"] == "updated"
+    assert _Handler.requests_seen[-1] == ("/spec", None)
+
+
+def test_client_error_is_not_retried(server, tmp_path):
+    _Handler.scripts["/spec"] = [404]
+
+    result = _fetch(server, tmp_path, "/spec")
+
+    assert result["status"] == "failed"
+    assert len(_Handler.requests_seen) == 1
+
+
+def test_invalid_body_keeps_previous_file(server, tmp_path):
+    (tmp_path / "spec.json").write_text("previous", encoding="utf-8")
+
+    result = _fetch(server, tmp_path, "/garbage")
+
+    assert result["status"] == "failed"
+    assert (tmp_path / "spec.json").read_text(encoding="utf-8") == "previous"
+
+
+def test_connection_refused_fails(tmp_path):
+    result = _fetch("http://127.0.0.1:9", tmp_path, "/spec", retries=1)
+
+    assert result["status"] == "failed"
@@ -0,0 +1,95 @@
+import pytest
+
+from hybrid import HybridRetriever, query_identifiers
+
+CHUNKS = [
+    {"text": "Meta codes\n| **316** | Shipment already registered |", "metadata": {"section": "Error codes"}},
+    {"text": "Serviceability for 250 pincodes per request", "metadata": {"path": "/v1/serviceability/"}},
+    {"text": "Track an order by AWB", "metadata": {"path": "/v2/track-order/"}},
+    {"text": "Send the body as application/json for SPS/MPS orders", "metadata": {"section": "Headers"}},
+]
+
+
+@pytest.mark.parametrize(
+    "question,codes",
+    [
+        ("What does meta status 316 mean?", {"316"}),
+        ("Error 302 invalid courier partner id", {"302"}),
+        ("HTTP status code 503 on create order", {"503"}),
+        ("got a 404 error", {"404"}),
+        ("status: 400", {"400"}),
+        ("check 250 pincodes at once", set()),
+        ("top 100 couriers by volume", set()),
+        ("pincode 110 area", set()),
+    ],
+)
+def test_codes_need_an_error_context(question, codes):
+    assert query_identifiers(question)[1] == codes
+
+
+@pytest.mark.parametrize(
+    "question,paths",
+    [
+        ("what does /v2/track-order/ return?", {"v2/track-order"}),
+        ("call v2/track-order with the AWB", {"v2/track-order"}),
+        ("POST https://api.clickpost.in/api/v1/cancel-order/?key=x fails", {"v1/cancel-order"}),
+        ("use api/v3/create-order/ for India", {"v3/create-order"}),
+        ("should I send the body as application/json or form data?", set()),
+        ("difference between SPS/MPS order creation", set()),
+        ("cancel and/or reattempt", set()),
+    ],
+)
+def test_only_path_shaped_tokens_are_paths(question, paths):
+    assert query_identifiers(question)[0] == paths
+
+
+class _CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        return [[0.0]]
+
+
+class _NoVectors:
+    def search(self, query_vector, k, rows=None):
+        return []
+
+
+def _retriever():
+    embedder = _CountingEmbedder()
+    return HybridRetriever(CHUNKS, _NoVectors(), embedder, facets=None), embedder
+
+
+def test_bare_number_keeps_vector_search():
+    retriever, embedder = _retriever()
+
+    retriever.search("check 250 pincodes at once", filters={})
+
+    assert embedder.calls == 1
+
+
+def test_error_code_is_answered_exactly():
+    retriever, embedder = _retriever()
+
+    results = retriever.search("what does meta status 316 mean", filters={})
+
+    assert results[0][0] == 0
+    assert embedder.calls == 0
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "should I send the body as application/json or form data?",
+        "difference between SPS/MPS order creation",
+    ],
+)
+def test_slashes_in_prose_keep_vector_search(question):
+    retriever, embedder = _retriever()
+
+    retriever.search(question, filters={})
+
+    assert not retriever.identifiers.lookup(question)
+    assert embedder.calls == 1
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+import manifest as manifest_module
+from manifest import content_hash, diff_chunks, incremental_update, load_manifest
+from spec_stream import read_chunks_jsonl
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Orders"},
+    "servers": [{"url": "https://api.test"}],
+    "paths": {
+        "/v1/orders/": {"get": {"summary": "List orders"}, "post": {"summary": "Create order"}},
+        "/v1/cancel/": {"post": {"summary": "Cancel order"}},
+    },
+}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(SPEC), encoding="utf-8")
+    docs = [tmp_path / "tracking.md", tmp_path / "returns.md"]
+    for doc in docs:
+        doc.write_text(f"# {doc.stem}\n\nOverview.\n", encoding="utf-8")
+    return tmp_path, spec_file, docs
+
+
+def _update(tmp_path, spec_file, docs):
+    """Run one incremental update; returns (summary, {key: op} of the delta)."""
+
+    delta_file = tmp_path / "delta.jsonl"
+    summary = incremental_update(
+        [str(spec_file)], [str(doc) for doc in docs], str(tmp_path / "manifest.json"), str(delta_file)
+    )
+    return summary, {delta["key"]: delta["op"] for delta in read_chunks_jsonl(str(delta_file))}
+
+
+def test_diff_chunks_classifies_adds_changes_and_deletes():
+    def chunk(endpoint, text):
+        return {"text": text, "metadata": {"api": "Orders", "endpoint": endpoint}}
+
+    kept, edited = chunk("GET /a", "a"), chunk("GET /b", "b2")
+    old = {
+        "Orders::GET /a": content_hash(kept),
+        "Orders::GET /b": content_hash(chunk("GET /b", "b")),
+        "Orders::GET /gone": content_hash(chunk("GET /gone", "gone")),
+    }
+    new = {}
+
+    deltas = list(diff_chunks([kept, edited, chunk("GET /c", "c")], old, new))
+
+    assert [(delta["op"], delta["key"]) for delta in deltas] == [
+        ("change", "Orders::GET /b"),
+        ("add", "Orders::GET /c"),
+        ("delete", "Orders::GET /gone"),
+    ]
+    assert deltas[0]["chunk"] is edited
+    assert set(new) == {"Orders::GET /a", "Orders::GET /b", "Orders::GET /c"}
+
+
+def test_first_run_adds_everything_and_a_rerun_is_empty(sources):
+    summary, ops = _update(*sources)
+
+    assert summary == {"add": 5, "change": 0, "delete": 0}
+    assert ops == {
+        "Orders::GET /v1/orders/": "add",
+        "Orders::POST /v1/orders/": "add",
+        "Orders::POST /v1/cancel/": "add",
+        "tracking.md": "add",
+        "returns.md": "add",
+    }
+
+    assert _update(*sources) == ({"add": 0, "change": 0, "delete": 0}, {})
+
+
+def test_edits_and_removals_are_the_only_deltas(sources):
+    tmp_path, spec_file, docs = sources
+    _update(*sources)
+
+    spec = json.loads(json.dumps(SPEC))
+    spec["paths"]["/v1/orders/"]["post"]["summary"] = "Create a forward order"
+    del spec["paths"]["/v1/cancel/"]
+    spec_file.write_text(json.dumps(spec), encoding="utf-8")
+    docs[0].write_text("# tracking\n\nPoll every 30 minutes.\n", encoding="utf-8")
+
+    summary, ops = _update(*sources)
+
+    assert summary == {"add": 0, "change": 2, "delete": 1}
+    assert ops == {"Orders::POST /v1/orders/": "change", "Orders::POST /v1/cancel/": "delete", "tracking.md": "change"}
+
+
+def test_removed_markdown_file_is_deleted(sources):
+    tmp_path, spec_file, docs = sources
+    _update(*sources)
+
+    summary, ops = _update(tmp_path, spec_file, docs[:1])
+
+    assert summary == {"add": 0, "change": 0, "delete": 1}
+    assert ops == {"returns.md": "delete"}
+
+
+def test_manifest_is_only_saved_after_the_delta_is_written(sources, monkeypatch):
+    tmp_path, spec_file, docs = sources
+    _update(*sources)
+    saved = (tmp_path / "manifest.json").read_text(encoding="utf-8")
+    docs[0].write_text("# tracking\n\nChanged.\n", encoding="utf-8")
+
+    def failing_write(chunks, output_file):
+        next(iter(chunks))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(manifest_module, "write_chunks_jsonl", failing_write)
+    with pytest.raises(OSError):
+        _update(*sources)
+    monkeypatch.undo()
+
+    assert (tmp_path / "manifest.json").read_text(encoding="utf-8") == saved
+    # The change is still pending on the next run
+    assert _update(*sources)[1] == {"tracking.md": "change"}
+
+
+def test_manifest_from_another_version_rebuilds_everything(sources):
+    tmp_path = sources[0]
+    _update(*sources)
+    manifest_file = tmp_path / "manifest.json"
+    manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    manifest["version"] = 0
+    manifest_file.write_text(json.dumps(manifest), encoding="utf-8")
+
+    assert load_manifest(str(manifest_file))["chunks"] == {}
+    summary, _ = _update(*sources)
+    assert summary == {"add": 5, "change": 0, "delete": 0}
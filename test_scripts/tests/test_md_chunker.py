@@ -0,0 +1,95 @@
+import glob
+import os
+
+import pytest
+
+from chunking import estimate_tokens
+from md_chunker import chunk_markdown, split_markdown
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+DOCS = sorted(glob.glob(os.path.join(DATA_DIR, "*.md")))
+
+TWO_ENDPOINTS = """# Orders API
+
+Create and cancel orders.
+
+## Create Order
+
+**Method:** `POST`
+**URL:** `https://www.clickpost.in/api/v3/create-order/`
+
+### Request Body
+
+| field | type |
+|---|---|
+| pickup_pincode | string |
+
+## Cancel Order
+
+**Method:** `GET`
+**URL:** `https://www.clickpost.in/api/v1/cancel-order/`
+
+### Query Parameters
+
+Pass `waybill` and `cp_id`.
+"""
+
+ONE_ENDPOINT = """# Tracking
+
+Overview of polling.
+
+## Endpoint Details
+
+**Method:** `GET`
+**URL:** `https://api.clickpost.in/api/v2/track-order/`
+
+## Response
+
+Status fields.
+"""
+
+
+def _endpoints(tmp_path, text):
+    md_file = tmp_path / "doc.md"
+    md_file.write_text(text, encoding="utf-8")
+    return {c["metadata"]["section"]: c["metadata"].get("endpoint") for c in chunk_markdown(str(md_file))}
+
+
+def test_each_section_gets_its_own_endpoint(tmp_path):
+    endpoints = _endpoints(tmp_path, TWO_ENDPOINTS)
+
+    assert endpoints == {
+        "Orders API": None,
+        "Orders API > Create Order": "POST /api/v3/create-order/",
+        "Orders API > Create Order > Request Body": "POST /api/v3/create-order/",
+        "Orders API > Cancel Order": "GET /api/v1/cancel-order/",
+        "Orders API > Cancel Order > Query Parameters": "GET /api/v1/cancel-order/",
+    }
+
+
+def test_single_endpoint_doc_tags_every_section(tmp_path):
+    endpoints = _endpoints(tmp_path, ONE_ENDPOINT)
+
+    assert set(endpoints.values()) == {"GET /api/v2/track-order/"}
+
+
+def _blocks(md_file):
+    """Every block of a doc, as it appears in chunk text."""
+
+    with open(md_file, encoding="utf-8") as f:
+        sections = split_markdown(f.read())
+    return {"\n".join(section["lines"][start:end]) for section in sections for start, end in section["blocks"]}
+
+
+@pytest.mark.parametrize("md_file", DOCS, ids=os.path.basename)
+def test_parts_fit_the_budget_with_their_heading(md_file):
+    max_tokens = 128
+    blocks = _blocks(md_file)
+
+    for chunk in chunk_markdown(md_file, max_tokens=max_tokens):
+        if estimate_tokens(chunk["text"]) <= max_tokens:
+            continue
+        # Only a single oversized block may run over, under its heading
+        body = chunk["text"].split("\n\n", 1)[1]
+        heading, _, rest = body.partition("\n\n")
+        assert body in blocks or (heading.startswith("#") and rest in blocks), chunk["metadata"]["section"]
@@ -0,0 +1,14 @@
+import json
+
+import pytest
+
+from sanitize import GOLDEN_FILE, apply
+
+with open(GOLDEN_FILE, "r", encoding="utf-8") as f:
+    GOLDEN_CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", GOLDEN_CASES, ids=[case["name"] for case in GOLDEN_CASES])
+def test_golden_case(case):
+    # The worker's sanitize.spec.js runs the same cases against sanitize.js
+    assert apply(case) == case["expected"]
@@ -0,0 +1,98 @@
+from schema_resolver import SchemaResolver
+
+
+def _ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _names(fields):
+    return [name for name, _, _, _ in fields]
+
+
+CYCLIC = {
+    "components": {
+        "schemas": {
+            "A": {"type": "object", "properties": {"b": _ref("B"), "x": {"type": "string"}}},
+            "B": {"type": "object", "properties": {"a": _ref("A"), "y": {"type": "string"}}},
+        }
+    }
+}
+
+
+def test_expands_refs_all_of_and_arrays():
+    spec = {
+        "components": {
+            "schemas": {
+                "Address": {
+                    "type": "object",
+                    "required": ["pincode"],
+                    "properties": {"pincode": {"type": "string", "description": "PIN"}},
+                },
+                "Order": {
+                    "allOf": [
+                        {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}},
+                        {"properties": {"drop": _ref("Address"), "items": {"type": "array", "items": _ref("Address")}}},
+                    ]
+                },
+            }
+        }
+    }
+
+    fields = SchemaResolver(spec).fields(_ref("Order"))
+
+    assert fields == [
+        ("id", "integer", True, ""),
+        ("drop", "object", False, ""),
+        ("drop.pincode", "string", True, "PIN"),
+        ("items", "array", False, ""),
+        ("items[].pincode", "string", True, "PIN"),
+    ]
+
+
+def test_one_of_variants_are_optional():
+    spec = {
+        "components": {
+            "schemas": {
+                "Pay": {
+                    "oneOf": [
+                        {"required": ["cod"], "properties": {"cod": {"type": "number"}}},
+                        {"required": ["upi"], "properties": {"upi": {"type": "string"}}},
+                    ]
+                }
+            }
+        }
+    }
+
+    fields = SchemaResolver(spec).fields(_ref("Pay"))
+
+    assert fields == [("cod", "number", False, ""), ("upi", "string", False, "")]
+
+
+def test_cycle_is_cut():
+    assert _names(SchemaResolver(CYCLIC).fields(_ref("A"))) == ["b", "b.a", "b.y", "x"]
+
+
+def test_cycle_cut_is_not_cached():
+    resolver = SchemaResolver(CYCLIC)
+    resolver.fields(_ref("A"))
+
+    # B was only expanded inside A, where the cycle cut its "a" field short
+    assert resolver.fields(_ref("B")) == SchemaResolver(CYCLIC).fields(_ref("B"))
+    assert _names(resolver.fields(_ref("B"))) == ["a", "a.b", "a.x", "y"]
+
+
+def test_depth_cutoff_is_not_cached():
+    # Chain L0 -> L1 -> ... -> L5, each level one nested object deeper
+    schemas = {f"L{i}": {"type": "object", "properties": {"next": _ref(f"L{i + 1}")}} for i in range(5)}
+    schemas["L5"] = {"type": "object", "properties": {"leaf": {"type": "string"}}}
+    spec = {"components": {"schemas": schemas}}
+
+    resolver = SchemaResolver(spec, max_depth=3)
+    resolver.fields(_ref("L0"))
+
+    for i in range(1, 6):
+        fresh = SchemaResolver(spec, max_depth=3).fields(_ref(f"L{i}"))
+        assert resolver.fields(_ref(f"L{i}")) == fresh
+    # Cached results are reused only where the depth limit still allows them
+    resolver.fields(_ref("L4"))
+    assert resolver.fields(_ref("L0")) == SchemaResolver(spec, max_depth=3).fields(_ref("L0"))
@@ -0,0 +1,34 @@
+import pytest
+
+from semantic_cache import SemanticCache, same_entities, simulate
+from vector_index import HashingEmbedder
+
+
+@pytest.mark.parametrize(
+    "a,b,same",
+    [
+        ("How do I track an order?", "tracking order", True),
+        ("Cancellation URL for Shiprocket", "shiprocket cancel urls", True),
+        ("cancellation url for shiprocket", "cancellation url for delhivery", False),
+        ("what does meta status 316 mean", "what does meta status 317 mean", False),
+        ("create order for bluedart", "create order", False),
+    ],
+)
+def test_same_entities_matches_the_worker(a, b, same):
+    assert same_entities(a, b) is same
+
+
+def test_similar_vectors_do_not_cross_carriers():
+    cache = SemanticCache(threshold=0.9)
+    cache.set("cancellation url for shiprocket", [1.0, 0.0], "shiprocket answer", 0)
+
+    assert cache.get_similar("cancellation url for delhivery", [1.0, 0.0], 1) is None
+    assert cache.get_similar("shiprocket cancellation url?", [1.0, 0.0], 1) == "shiprocket answer"
+
+
+def test_simulate_counts_hits():
+    queries = [(0, "Cancellation URL for Shiprocket?"), (1, "cancellation url for shiprocket"), (2, "cancellation url for delhivery")]
+
+    report = simulate(queries, HashingEmbedder(64))
+
+    assert (report["exact"], report["miss"]) == (1, 2)
@@ -0,0 +1,61 @@
+import json
+
+from parser import iter_openapi_chunks, parse_openapi_to_chunks
+from spec_stream import iter_openapi_paths
+
+SPEC = {
+    "openapi": "3.0.0",
+    "paths": {
+        "/orders": {
+            "post": {
+                "summary": "Create order",
+                "requestBody": {
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Order"}}}
+                },
+            }
+        },
+        "/orders/{id}": {"get": {"summary": "Get order"}},
+    },
+    "info": {"title": "Orders API"},
+    "servers": [{"url": "https://api.example.com"}],
+    "components": {
+        "schemas": {"Order": {"type": "object", "properties": {"order_id": {"type": "string"}}}}
+    },
+}
+
+
+def write_spec(tmp_path, spec):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def test_header_after_paths_is_complete_at_first_yield(tmp_path):
+    spec_file = write_spec(tmp_path, SPEC)
+
+    items = [(dict(spec), path) for spec, path, _ in iter_openapi_paths(spec_file, block_size=16)]
+
+    assert [path for _, path in items] == ["/orders", "/orders/{id}"]
+    for spec, _ in items:
+        assert spec["info"]["title"] == "Orders API"
+        assert "components" in spec
+
+
+def test_streamed_chunks_match_full_parse_when_header_is_last(tmp_path):
+    spec_file = write_spec(tmp_path, SPEC)
+
+    streamed = list(iter_openapi_chunks(spec_file))
+
+    assert streamed == parse_openapi_to_chunks(spec_file)
+    assert "API: Orders API" in streamed[0]["text"]
+    assert "Full URL: https://api.example.com/orders" in streamed[0]["text"]
+    assert "order_id" in streamed[0]["text"]
+
+
+def test_header_first_spec_streams_in_one_pass(tmp_path):
+    ordered = {key: SPEC[key] for key in ("openapi", "info", "servers", "components", "paths")}
+    spec_file = write_spec(tmp_path, ordered)
+
+    paths = [path for _, path, _ in iter_openapi_paths(spec_file)]
+
+    assert paths == ["/orders", "/orders/{id}"]
@@ -0,0 +1,29 @@
+import pstats
+
+from ingest import DEFAULT_DATA_DIR, ingest
+from tracing import Tracer
+
+
+def _endpoint_calls(tmp_path, workers):
+    tracer = Tracer(profile=["resolve"], profile_dir=str(tmp_path / str(workers)))
+    with tracer.activate():
+        chunks = list(ingest(DEFAULT_DATA_DIR, workers=workers))
+    (path,) = tracer.dump_profiles()
+
+    stats = pstats.Stats(path).stats
+    calls = sum(
+        stat[1] for (filename, _, function), stat in stats.items()
+        if filename.endswith("parser.py") and function == "build_endpoint_sections"
+    )
+    return calls, tracer.records["resolve"].calls, len(chunks)
+
+
+def test_worker_profiles_are_merged_into_one_file(tmp_path):
+    single = _endpoint_calls(tmp_path, 1)
+    pooled = _endpoint_calls(tmp_path, 2)
+
+    # Every endpoint of every file is in the profile, not just the last
+    # file each worker ran
+    assert pooled == single
+    assert single[0] == single[1] > 0
+    assert sorted(p.name for p in (tmp_path / "2").iterdir()) == ["resolve.prof"]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import vector_index
+from vector_index import HashingEmbedder, VectorIndex, build_index
+
+CHUNKS = [
+    {"text": f"Endpoint {i}: cancel order {i} for courier {i % 7}", "metadata": {"endpoint": f"GET /v{i}/"}}
+    for i in range(50)
+]
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_blocked_scores_match_a_full_product(tmp_path, monkeypatch, dtype):
+    embedder = HashingEmbedder(64)
+    build_index(CHUNKS, embedder, str(tmp_path), dtype=dtype)
+    index = VectorIndex(str(tmp_path))
+    query = embedder(["cancel order 7"])[0]
+
+    expected = np.asarray(index.vectors, dtype=np.float32) @ query
+    if index.scales is not None:
+        expected *= index.scales
+
+    # Blocks smaller than the corpus, with a ragged last block
+    monkeypatch.setattr(vector_index, "SCORE_BLOCK_ROWS", 16)
+    np.testing.assert_allclose(index.scores(query), expected, rtol=1e-6)
+
+    rows = [49, 3, 17, 3, 0]
+    np.testing.assert_allclose(index.scores(query, rows), expected[rows], rtol=1e-6)
+    assert index.scores(query, []).shape == (0,)
+    assert index.search(query, k=1)[0][0] == int(np.argmax(expected))
@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import pytest
+
+import watcher as watcher_module
+from ingest import DEFAULT_DATA_DIR
+from watcher import IndexWatcher
+
+SOURCES = ("clickpost-order-cancellation.md", "clickpost-custom-fields.md")
+
+
+@pytest.fixture
+def live(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name in SOURCES:
+        shutil.copy(os.path.join(DEFAULT_DATA_DIR, name), data_dir / name)
+    watcher = IndexWatcher(str(data_dir), str(tmp_path / "index"), cache_dir=None, fetch=False, keep=1)
+    watcher.rebuild()
+    return watcher, data_dir
+
+
+def _touch(data_dir):
+    with open(data_dir / SOURCES[0], "a", encoding="utf-8") as f:
+        f.write("\n## Notes\n\nCancellation is idempotent.\n")
+
+
+def test_change_during_a_build_keeps_its_timestamp(live, monkeypatch):
+    watcher, data_dir = live
+    build_index = watcher_module.build_index
+
+    def build_with_a_late_change(*args, **kwargs):
+        # Noticed after the build read the sources
+        watcher._note_change(200.0)
+        return build_index(*args, **kwargs)
+
+    monkeypatch.setattr(watcher_module, "build_index", build_with_a_late_change)
+    _touch(data_dir)
+    watcher._note_change(100.0)
+
+    summary = watcher.rebuild()
+
+    assert summary["files_changed"] == [SOURCES[0]]
+    assert watcher._changed_at == 200.0
+    assert len([n for n in os.listdir(watcher.index_root) if n.startswith("gen-")]) == 1
+
+
+def test_failed_build_gives_its_timestamp_back(live, monkeypatch):
+    watcher, data_dir = live
+
+    def failing_build(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(watcher_module, "build_index", failing_build)
+    _touch(data_dir)
+    watcher._note_change(100.0)
+
+    with pytest.raises(RuntimeError):
+        watcher.rebuild()
+    assert watcher._changed_at == 100.0
@@ -0,0 +1,308 @@
+import cProfile
+import json
+import marshal
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Pipeline stages in order, for reports
+STAGES = ("fetch", "parse", "resolve", "chunk", "dedup", "embed", "index")
+METRIC_PREFIX = "clickpost_pipeline"
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far (0 if unavailable)."""
+
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def merge_stats(target, stats):
+    """Fold a raw pstats table (function -> stats tuple) into `target`."""
+
+    for func, stat in stats.items():
+        target[func] = pstats.add_func_stats(target[func], stat) if func in target else stat
+
+
+class StageRecord:
+    """Accumulated cost and counters for one stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes = 0
+        self.traced_peak_bytes = 0
+        self.counters = {}
+
+    def add(self, **counters):
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def merge(self, data):
+        self.calls += data["calls"]
+        self.wall_seconds += data["wall_seconds"]
+        self.cpu_seconds += data["cpu_seconds"]
+        self.peak_rss_bytes = max(self.peak_rss_bytes, data["peak_rss_bytes"])
+        self.traced_peak_bytes = max(self.traced_peak_bytes, data["traced_peak_bytes"])
+        self.add(**data["counters"])
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "traced_peak_bytes": self.traced_peak_bytes,
+            "counters": dict(self.counters),
+        }
+
+
+class Tracer:
+    """
+    Per-stage wall time, CPU time, counters (chunks, bytes_in, bytes_out,
+    ...) and peak RSS, for the fetch -> parse -> resolve -> chunk -> dedup
+    -> embed -> index pipeline.
+
+    Stages accumulate across calls, so a stage entered once per endpoint
+    reports its total. Times are exclusive: when stages nest (a generator
+    stage pulling from another), the inner stage's time is charged to the
+    inner stage only. `profile` names stages to run under cProfile (dumped
+    to <profile_dir>/<stage>.prof, merged across worker processes);
+    `trace_memory` records each stage's tracemalloc peak. Both cost real
+    time, so they are opt-in.
+    """
+
+    enabled = True
+
+    def __init__(self, profile=(), trace_memory=False, profile_dir="."):
+        self.profile = set(profile)
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.records = {}
+        self._profilers = {}
+        # pstats tables merged in from worker processes, per stage
+        self._worker_stats = {}
+        self._profiling = False
+        # [child wall, child cpu] per open stage, for exclusive times
+        self._stack = []
+        self._started = time.perf_counter()
+
+    def config(self):
+        """Constructor arguments, for building a matching tracer in a worker."""
+
+        return {
+            "profile": sorted(self.profile),
+            "trace_memory": self.trace_memory,
+            "profile_dir": self.profile_dir,
+        }
+
+    def record(self, name):
+        if name not in self.records:
+            self.records[name] = StageRecord(name)
+        return self.records[name]
+
+    @contextmanager
+    def stage(self, name, **counters):
+        """Time the enclosed block as one call of stage `name`."""
+
+        record = self.record(name)
+        record.add(**counters)
+
+        profiler = None
+        # Only one profiler can be active at a time, so nested stages share it
+        if name in self.profile and not self._profiling:
+            profiler = self._profilers.setdefault(name, cProfile.Profile())
+            self._profiling = True
+            profiler.enable()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        children = [0.0, 0.0]
+        self._stack.append(children)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += wall
+                self._stack[-1][1] += cpu
+            record.wall_seconds += wall - children[0]
+            record.cpu_seconds += cpu - children[1]
+            record.calls += 1
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            if self.trace_memory:
+                record.traced_peak_bytes = max(
+                    record.traced_peak_bytes, tracemalloc.get_traced_memory()[1]
+                )
+            record.peak_rss_bytes = max(record.peak_rss_bytes, peak_rss_bytes())
+
+    def wrap(self, name, iterable, **counters):
+        """
+        Yield from `iterable`, charging only the time spent producing each
+        item to stage `name`. Lets generator stages be measured separately
+        even when their work interleaves with the consumer's.
+        """
+
+        self.record(name).add(**counters)
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as record:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                record.add(items=1)
+            yield item
+
+    def merge(self, records, profiles=None):
+        """
+        Fold in to_dict()-style records and profile_stats() tables, e.g.
+        from a worker process.
+        """
+
+        for name, data in records.items():
+            self.record(name).merge(data)
+        for name, stats in (profiles or {}).items():
+            merge_stats(self._worker_stats.setdefault(name, {}), stats)
+
+    def profile_stats(self):
+        """Raw pstats table per profiled stage, picklable for merge()."""
+
+        tables = {}
+        for name, profiler in self._profilers.items():
+            profiler.create_stats()
+            tables[name] = profiler.stats
+        return tables
+
+    def report(self):
+        names = [name for name in STAGES if name in self.records]
+        names += sorted(name for name in self.records if name not in STAGES)
+        return {
+            "total_wall_seconds": round(time.perf_counter() - self._started, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": {name: self.records[name].to_dict() for name in names},
+        }
+
+    def to_prometheus(self):
+        """Render the report in the Prometheus text exposition format."""
+
+        report = self.report()
+        # metric: (report field, type, help)
+        metrics = {
+            "stage_wall_seconds_total": ("wall_seconds", "counter", "Wall time spent in each stage"),
+            "stage_cpu_seconds_total": ("cpu_seconds", "counter", "CPU time spent in each stage"),
+            "stage_calls_total": ("calls", "counter", "Times each stage ran"),
+            "stage_peak_rss_bytes": ("peak_rss_bytes", "gauge", "Process peak RSS after each stage"),
+            "stage_traced_peak_bytes": ("traced_peak_bytes", "gauge", "tracemalloc peak in each stage"),
+        }
+
+        lines = []
+        for metric, (field, kind, help_text) in metrics.items():
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+            for name, stage in report["stages"].items():
+                lines.append(f'{METRIC_PREFIX}_{metric}{{stage="{name}"}} {stage[field]}')
+
+        counter_names = sorted({c for stage in report["stages"].values() for c in stage["counters"]})
+        for counter in counter_names:
+            lines.append(f"# TYPE {METRIC_PREFIX}_{counter}_total counter")
+            for name, stage in report["stages"].items():
+                if counter in stage["counters"]:
+                    value = stage["counters"][counter]
+                    lines.append(f'{METRIC_PREFIX}_{counter}_total{{stage="{name}"}} {value}')
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_peak_rss_bytes gauge")
+        lines.append(f"{METRIC_PREFIX}_peak_rss_bytes {report['peak_rss_bytes']}")
+        return "\n".join(lines) + "\n"
+
+    def dump_profiles(self):
+        """
+        Write one .prof file per profiled stage, covering this process and
+        every worker merged in; returns their paths.
+        """
+
+        tables = {name: dict(stats) for name, stats in self._worker_stats.items()}
+        for name, stats in self.profile_stats().items():
+            merge_stats(tables.setdefault(name, {}), stats)
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        paths = []
+        for name, stats in sorted(tables.items()):
+            path = os.path.join(self.profile_dir, f"{name}.prof")
+            # The format cProfile.Profile.dump_stats writes
+            with open(path, "wb") as f:
+                marshal.dump(stats, f)
+            paths.append(path)
+        return paths
+
+    def write(self, report_file):
+        """Write the report as Prometheus text (.prom/.txt) or JSON."""
+
+        if report_file.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.report(), indent=2)
+        with open(report_file, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    @contextmanager
+    def activate(self):
+        """Make this the tracer returned by current() for the enclosed block."""
+
+        global _current
+        previous, _current = _current, self
+        try:
+            yield self
+        finally:
+            _current = previous
+
+
+class NullTracer:
+    """Default tracer: same interface, records nothing."""
+
+    enabled = False
+
+    @contextmanager
+    def stage(self, name, **counters):
+        yield _NULL_RECORD
+
+    def wrap(self, name, iterable, **counters):
+        return iterable
+
+    def config(self):
+        return None
+
+
+class _NullRecord:
+    def add(self, **counters):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+_current = NullTracer()
+
+
+def current():
+    """The active tracer (a NullTracer unless one was activated)."""
+
+    return _current
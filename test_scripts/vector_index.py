@@ -0,0 +1,284 @@
+import json
+import os
+import re
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from artifact import ChunkArtifact, write_artifact
+from embedding import DEFAULT_CACHE_DIR, EmbeddingCache, EmbeddingScheduler
+from facets import FacetIndex
+from tracing import current as current_tracer
+
+INDEX_VERSION = 3
+# Rows converted to float32 at a time when scoring a query
+SCORE_BLOCK_ROWS = 4096
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedder: hashed word unigrams and bigrams,
+    L2-normalised. Deterministic, so it is also the reference model for
+    offline tests and benchmarks.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                # Low bits pick the column, one high bit picks the sign
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Wraps a sentence-transformers model, e.g. 'all-MiniLM-L6-v2'."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+
+    def __call__(self, texts):
+        vectors = self.model.encode(list(texts), convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+
+def load_embedder(name="hashing-512"):
+    """Return the embedder recorded in an index (or requested on the CLI)."""
+
+    if name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]))
+    return SentenceTransformerEmbedder(name)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors, dtype):
+    """
+    Convert float32 vectors to the on-disk dtype.
+    int8 uses one scale per row; returns (matrix, scales or None).
+    """
+
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        matrix = np.round(vectors / scales[:, None]).astype(np.int8)
+        return matrix, scales.astype(np.float32)
+    raise ValueError(f"Unsupported index dtype: {dtype}")
+
+
+def build_index(chunks, embedder, index_dir, dtype="float16", batch_size=64, scheduler=None):
+    """
+    Embed `chunks` and write a compact index to `index_dir`:
+
+      vectors.npy   (n, dim) float16 or int8 matrix, rows L2-normalised
+      scales.npy    (n,) float32 per-row scales (int8 only)
+      chunks.cpchunks compiled chunk text + metadata, row-aligned with vectors
+      facets.json   geo/type/version bitmaps over the same rows
+      index.json    model name, dtype, dimensions
+
+    Embedding goes through `scheduler` (an EmbeddingScheduler, e.g. with an
+    on-disk cache); by default an uncached one with `batch_size` batches.
+    Vectors are quantized every `batch_size` rows so float32 copies of the
+    whole corpus are never held at once. Returns the number of chunks indexed.
+    """
+
+    os.makedirs(index_dir, exist_ok=True)
+    if scheduler is None:
+        scheduler = EmbeddingScheduler(embedder, max_batch_size=batch_size)
+    tracer = current_tracer()
+
+    matrices, scale_parts, records = [], [], []
+    batch = []
+
+    def flush():
+        with tracer.stage("index", vectors=len(batch)):
+            matrix, scales = quantize(np.stack(batch), dtype)
+            matrices.append(matrix)
+            if scales is not None:
+                scale_parts.append(scales)
+            batch.clear()
+
+    for chunk, vector in tracer.wrap("embed", scheduler.embed(chunks)):
+        records.append(chunk)
+        batch.append(vector)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if not records:
+        raise ValueError("No chunks to index")
+
+    with tracer.stage("index") as stage:
+        np.save(os.path.join(index_dir, "vectors.npy"), np.concatenate(matrices))
+        if scale_parts:
+            np.save(os.path.join(index_dir, "scales.npy"), np.concatenate(scale_parts))
+
+        write_artifact(records, os.path.join(index_dir, "chunks.cpchunks"))
+        FacetIndex(records).save(os.path.join(index_dir, "facets.json"))
+
+        with open(os.path.join(index_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "model": embedder.name,
+                    "dtype": dtype,
+                    "count": len(records),
+                    "dim": int(matrices[0].shape[1]),
+                },
+                f,
+                indent=2,
+            )
+        stage.add(
+            chunks=len(records),
+            bytes_out=sum(
+                os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir)
+            ),
+        )
+
+    return len(records)
+
+
+class VectorIndex:
+    """
+    Read side of build_index. The vector matrix and the chunk artifact are
+    both memory-mapped, so opening is constant-time and only the pages
+    touched by a search become resident.
+    """
+
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, "index.json"), "r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        if self.info.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version in {index_dir}")
+
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.scales = None
+        if self.info["dtype"] == "int8":
+            self.scales = np.load(os.path.join(index_dir, "scales.npy"), mmap_mode="r")
+
+        self.chunks = ChunkArtifact(os.path.join(index_dir, "chunks.cpchunks"))
+        self.facets = FacetIndex.load(os.path.join(index_dir, "facets.json"))
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def scores(self, query_vector, rows=None):
+        """
+        Cosine similarity of the query against every row (or only `rows`).
+
+        Rows are widened to float32 SCORE_BLOCK_ROWS at a time, so a query
+        never copies the whole memory-mapped matrix.
+        """
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        count = len(self.vectors) if rows is None else len(rows)
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, count)
+            block = slice(start, end) if rows is None else rows[start:end]
+            np.matmul(self.vectors[block].astype(np.float32), query, out=scores[start:end])
+            if self.scales is not None:
+                scores[start:end] *= self.scales[block]
+        return scores
+
+    def search(self, query_vector, k=5, rows=None):
+        """
+        Return the top-k [(row, score)] by cosine similarity, best first.
+        `rows` restricts the search to a candidate subset.
+        """
+
+        scores = self.scores(query_vector, rows)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            rows = np.asarray(rows)
+            return [(int(rows[i]), float(scores[i])) for i in top]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage:
+    #   python vector_index.py build [data_dir] [--out DIR] [--dtype int8] [--model NAME]
+    #                                [--cache DIR|none] [--workers N]
+    #   python vector_index.py query "question" [--out DIR]
+    args = sys.argv[1:]
+    options = {
+        "--out": "clickpost_index",
+        "--dtype": "float16",
+        "--model": "hashing-512",
+        "--cache": DEFAULT_CACHE_DIR,
+        "--workers": "2",
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+    command = args[0] if args else "build"
+
+    if command == "build":
+        from ingest import DEFAULT_DATA_DIR, ingest
+
+        data_dir = args[1] if len(args) > 1 else DEFAULT_DATA_DIR
+        print(f"Building {options['--dtype']} index from {data_dir}...")
+        embedder = load_embedder(options["--model"])
+        cache = None
+        if options["--cache"] != "none":
+            cache = EmbeddingCache(options["--cache"], embedder.name)
+        scheduler = EmbeddingScheduler(embedder, cache, workers=int(options["--workers"]))
+
+        start = time.perf_counter()
+        count = build_index(
+            ingest(data_dir), embedder, options["--out"], options["--dtype"], scheduler=scheduler
+        )
+        elapsed = time.perf_counter() - start
+        stats = scheduler.stats
+        print(f"\n✅ Indexed {count} chunks in {elapsed:.2f}s")
+        print(
+            f"🧮 Embedding: {stats['cache_hits']} cached, {stats['embedded']} embedded "
+            f"in {stats['calls']} calls"
+        )
+        print(f"📄 Saved to: {options['--out']}")
+
+    elif command == "query":
+        index = VectorIndex(options["--out"])
+        embedder = load_embedder(index.info["model"])
+        question = " ".join(args[1:])
+
+        start = time.perf_counter()
+        results = index.search(embedder([question])[0], k=5)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"Top {len(results)} for: {question} ({elapsed_ms:.2f} ms)")
+        for row, score in results:
+            meta = index.chunks[row]["metadata"]
+            label = meta.get("section") or meta.get("endpoint", "")
+            print(f"  {score:.3f}  {meta.get('source', '')}  {label}")
@@ -0,0 +1,456 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import struct
+import sys
+import threading
+import time
+
+from dedup import dedup_chunks
+from embedding import DEFAULT_CACHE_DIR, EmbeddingCache, EmbeddingScheduler
+from ingest import DEFAULT_DATA_DIR, chunk_file, discover_sources
+from manifest import file_hash
+from vector_index import VectorIndex, build_index, load_embedder
+
+# Long-running corpus watcher: polls the upstream OpenAPI specs, watches the
+# data directory, and rebuilds the index in the background when anything
+# changes. Only changed files are re-chunked, and the embedding cache means
+# only new chunk text is embedded. Each build goes to a fresh generation
+# directory, and the CURRENT pointer is swapped atomically once it is
+# complete, so readers never see a partial index.
+
+DEFAULT_INDEX_ROOT = "clickpost_live_index"
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+# inotify(7) event masks
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def current_generation(index_root):
+    """Path of the generation CURRENT points at, or None before the first build."""
+
+    try:
+        with open(os.path.join(index_root, CURRENT_FILE), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(index_root, name) if name else None
+
+
+def open_current(index_root):
+    """Open the published index, for readers in other processes."""
+
+    generation = current_generation(index_root)
+    if generation is None:
+        raise FileNotFoundError(f"No index published under {index_root}")
+    return VectorIndex(generation)
+
+
+class LiveIndex:
+    """
+    The index readers in this process should query. `get()` returns the
+    current VectorIndex without locking; `publish()` points CURRENT at a
+    finished generation and swaps the reference in one assignment, so a
+    search that already holds the old index finishes on it undisturbed.
+    """
+
+    def __init__(self, index_root=DEFAULT_INDEX_ROOT):
+        self.index_root = index_root
+        self.generation = current_generation(index_root)
+        self._index = VectorIndex(self.generation) if self.generation else None
+
+    def get(self):
+        return self._index
+
+    def publish(self, generation):
+        # Open first: a generation that fails to load is never published
+        index = VectorIndex(generation)
+        tmp_file = os.path.join(self.index_root, CURRENT_FILE + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(generation))
+        os.replace(tmp_file, os.path.join(self.index_root, CURRENT_FILE))
+        self.generation = generation
+        self._index = index
+        return index
+
+
+class InotifyWatcher:
+    """Change notifications for one directory via Linux inotify (ctypes, no dependency)."""
+
+    mode = "inotify"
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+
+    def wait(self, timeout):
+        """Names of files that changed within `timeout` seconds (empty set if none)."""
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback where inotify is unavailable: compare (mtime, size) snapshots."""
+
+    mode = "polling"
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            names = {
+                name
+                for name in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(name) != self._snapshot.get(name)
+            }
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if names or remaining <= 0:
+                return names
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def directory_watcher(path, polling_interval=1.0):
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError):
+        return PollingWatcher(path, polling_interval)
+
+
+def _is_source(name):
+    return name.endswith(".json") or name.endswith(".md")
+
+
+class IndexWatcher:
+    """
+    Keep `index_root` in step with `data_dir`.
+
+    A watcher thread polls the upstream specs every `poll_seconds` (through
+    fetcher.fetch_specs, which writes changed specs into `data_dir`) and
+    waits on directory events; once changes have been quiet for
+    `debounce_seconds` it wakes a builder thread. Changes that arrive
+    during a build trigger one more build afterwards.
+
+    A build re-chunks only files whose content hash changed (chunks of
+    unchanged files are kept in memory), runs dedup over the merged corpus,
+    embeds through the on-disk cache and writes a new generation, then
+    publishes it via `live` and removes all but the newest `keep`.
+    """
+
+    def __init__(
+        self,
+        data_dir=DEFAULT_DATA_DIR,
+        index_root=DEFAULT_INDEX_ROOT,
+        model="hashing-512",
+        dtype="float16",
+        cache_dir=DEFAULT_CACHE_DIR,
+        dedup=True,
+        max_tokens=None,
+        fetch=True,
+        poll_seconds=900.0,
+        debounce_seconds=2.0,
+        keep=2,
+    ):
+        self.data_dir = data_dir
+        self.index_root = index_root
+        self.dtype = dtype
+        self.dedup = dedup
+        self.max_tokens = max_tokens
+        self.fetch = fetch
+        self.poll_seconds = poll_seconds
+        self.debounce_seconds = debounce_seconds
+        self.keep = keep
+
+        os.makedirs(index_root, exist_ok=True)
+        self.embedder = load_embedder(model)
+        self.cache = EmbeddingCache(cache_dir, self.embedder.name) if cache_dir else None
+        self.live = LiveIndex(index_root)
+        self.history = []
+
+        # basename -> (content hash, chunks)
+        self._files = {}
+        # When the oldest change not yet covered by a build was noticed;
+        # written by the watcher thread, taken by the builder
+        self._changed_at = None
+        self._changed_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _next_generation(self):
+        numbers = [
+            int(name[len(GENERATION_PREFIX) :])
+            for name in os.listdir(self.index_root)
+            if name.startswith(GENERATION_PREFIX) and name[len(GENERATION_PREFIX) :].isdigit()
+        ]
+        return os.path.join(self.index_root, f"{GENERATION_PREFIX}{max(numbers, default=0) + 1:06d}")
+
+    def _prune(self):
+        generations = sorted(
+            name for name in os.listdir(self.index_root) if name.startswith(GENERATION_PREFIX)
+        )
+        current = os.path.basename(self.live.generation or "")
+        for name in generations[: max(len(generations) - self.keep, 0)]:
+            if name != current:
+                # Readers in other processes may still have the files mapped;
+                # that is fine on POSIX, and elsewhere the next prune retries
+                shutil.rmtree(os.path.join(self.index_root, name), ignore_errors=True)
+
+    def _note_change(self, now):
+        with self._changed_lock:
+            if self._changed_at is None:
+                self._changed_at = now
+
+    def _take_changed_at(self):
+        with self._changed_lock:
+            changed_at, self._changed_at = self._changed_at, None
+        return changed_at
+
+    def _restore_changed_at(self, changed_at):
+        if changed_at is None:
+            return
+        with self._changed_lock:
+            if self._changed_at is None or changed_at < self._changed_at:
+                self._changed_at = changed_at
+
+    def rebuild(self, force=False):
+        """
+        Bring the index up to date now. Returns a summary dict, or None when
+        no source changed (and an index is already published).
+
+        The build covers the changes noticed before it read the sources;
+        changes noticed while it runs keep their time for the next build,
+        and a failed build gives its own back.
+        """
+
+        start = time.perf_counter()
+        changed_at = self._take_changed_at()
+        try:
+            return self._rebuild(start, changed_at, force)
+        except BaseException:
+            self._restore_changed_at(changed_at)
+            raise
+
+    def _rebuild(self, start, changed_at, force):
+        sources = {os.path.basename(path): path for path in discover_sources(self.data_dir)}
+
+        changed = []
+        for name, path in sources.items():
+            digest = file_hash(path)
+            if self._files.get(name, (None,))[0] != digest:
+                changed.append((name, path, digest))
+        removed = sorted(self._files.keys() - sources.keys())
+        if not changed and not removed and self.live.get() is not None and not force:
+            return None
+
+        # Only the affected files are parsed and chunked again
+        for name, path, digest in changed:
+            self._files[name] = (digest, chunk_file(path, self.max_tokens, with_payloads=self.dedup))
+        for name in removed:
+            del self._files[name]
+
+        # Same order as ingest(): sorted by file name
+        chunks = [chunk for name in sorted(self._files) for chunk in self._files[name][1]]
+        if self.dedup:
+            chunks, _ = dedup_chunks(chunks)
+
+        generation = self._next_generation()
+        scheduler = EmbeddingScheduler(self.embedder, self.cache)
+        try:
+            count = build_index(chunks, self.embedder, generation, self.dtype, scheduler=scheduler)
+            self.live.publish(generation)
+        except BaseException:
+            shutil.rmtree(generation, ignore_errors=True)
+            raise
+        self._prune()
+
+        summary = {
+            "generation": os.path.basename(generation),
+            "files_changed": [name for name, _, _ in changed],
+            "files_removed": removed,
+            "chunks": count,
+            "cache_hits": scheduler.stats["cache_hits"],
+            "embedded": scheduler.stats["embedded"],
+            "seconds": round(time.perf_counter() - start, 3),
+            # From the first change noticed to the new index being live
+            "lag_seconds": round(time.monotonic() - changed_at, 3) if changed_at else None,
+        }
+        self.history.append(summary)
+        return summary
+
+    def _poll_upstream(self):
+        from fetcher import fetch_specs
+
+        try:
+            results = fetch_specs(output_dir=self.data_dir)
+        except Exception as e:
+            print(f"❌ Upstream poll failed: {e}")
+            return
+        for result in results:
+            if result["status"] == "failed":
+                print(f"❌ {result['name']}: {result['error']}")
+
+    def _watch_loop(self, watcher):
+        next_poll = time.monotonic() if self.fetch else float("inf")
+        last_event = None
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= next_poll:
+                # Updated specs land in data_dir and show up as file events
+                self._poll_upstream()
+                next_poll = time.monotonic() + self.poll_seconds
+
+            timeout = min(1.0, max(0.0, next_poll - time.monotonic()))
+            names = {name for name in watcher.wait(timeout) if _is_source(name)}
+            now = time.monotonic()
+            if names:
+                self._note_change(now)
+                last_event = now
+            if last_event is not None and now - last_event >= self.debounce_seconds:
+                last_event = None
+                self._wake.set()
+
+    def _build_loop(self):
+        while not self._stop.is_set():
+            if not self._wake.wait(0.5):
+                continue
+            self._wake.clear()
+            try:
+                summary = self.rebuild()
+            except Exception as e:
+                # Keep serving the last good generation; the next change retries
+                print(f"❌ Rebuild failed, still serving {self.live.generation}: {e}")
+                continue
+            if summary:
+                print(_describe(summary))
+
+    def start(self):
+        """Build if needed, then watch and rebuild in background threads."""
+
+        summary = self.rebuild()
+        if summary:
+            print(_describe(summary))
+        watcher = directory_watcher(self.data_dir)
+        print(f"👀 Watching {self.data_dir} ({watcher.mode}); serving {self.live.generation}")
+        self._threads = [
+            threading.Thread(target=self._watch_loop, args=(watcher,), daemon=True),
+            threading.Thread(target=self._build_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+def _describe(summary):
+    changed = len(summary["files_changed"]) + len(summary["files_removed"])
+    lag = f", lag {summary['lag_seconds']:.1f}s" if summary["lag_seconds"] is not None else ""
+    return (
+        f"🔄 {summary['generation']}: {changed} files changed, {summary['chunks']} chunks "
+        f"({summary['cache_hits']} cached, {summary['embedded']} embedded) "
+        f"in {summary['seconds']:.2f}s{lag}"
+    )
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python watcher.py [data_dir] [--out DIR] [--poll SECONDS] [--debounce SECONDS]
+    #                          [--model NAME] [--cache DIR|none] [--keep N] [--no-fetch]
+    #                          [--no-dedup] [--once]
+    args = sys.argv[1:]
+    flags = {name: name in args for name in ("--no-fetch", "--no-dedup", "--once")}
+    args = [a for a in args if a not in flags]
+    options = {
+        "--out": DEFAULT_INDEX_ROOT,
+        "--poll": "900",
+        "--debounce": "2",
+        "--model": "hashing-512",
+        "--cache": DEFAULT_CACHE_DIR,
+        "--keep": "2",
+    }
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2 :]
+    data_dir = args[0] if args else DEFAULT_DATA_DIR
+
+    watcher = IndexWatcher(
+        data_dir,
+        options["--out"],
+        model=options["--model"],
+        cache_dir=None if options["--cache"] == "none" else options["--cache"],
+        dedup=not flags["--no-dedup"],
+        fetch=not flags["--no-fetch"],
+        poll_seconds=float(options["--poll"]),
+        debounce_seconds=float(options["--debounce"]),
+        keep=int(options["--keep"]),
+    )
+
+    if flags["--once"]:
+        summary = watcher.rebuild(force=True)
+        print(_describe(summary))
+        print(f"📄 Published: {watcher.live.generation}")
+        sys.exit(0)
+
+    watcher.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        watcher.stop()